@@ -0,0 +1,271 @@
+"""Headless JSON API over the build engine, independent of the Streamlit page.
+
+One asyncio loop owns every client connection; the build work itself runs on a bounded
+thread pool, and requests beyond MAX_PENDING are turned away with 503 instead of queueing
+without limit. Each request (and every item of a batch) is answered from one catalog
+snapshot.
+
+    python api_server.py --port 8080 --workers 4 [--db tech_data.db]
+
+    GET  /health
+    GET  /metrics
+    POST /build                 {"budget": 80000, "include_gpu": true, "fixed_cpu_id": 12, "mode": "optimal"}
+    POST /builds                {"mode": "greedy", "requests": [{"budget": 60000}, ...]}
+    POST /cpu-matrix            {"budget": 90000, "include_gpu": true, "mode": "optimal", "limit": 50}
+    GET  /gpu-recommendations   ?cpu_id=12   (or ?cpu_price=18000)
+    GET  /alternatives          ?table=gpus&price=40000&search=rtx
+    POST /power                 {"parts": {"CPU": 12, "Graphics Card": 7}}
+    POST /rebalance             {"budget": 80000, "parts": {"CPU": 12, ...}, "pinned": ["Graphics Card"], "swapped": ["Graphics Card"]}
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import metrics
+from build_engine import BUILD_MODES, generate_pc_build, get_alternatives, get_gpu_recommendations
+from build_solver import SLOT_TABLES, rebalance_build
+from cpu_matrix import cpu_build_matrix
+from catalog import DATABASE_NAME, TABLES, get_catalog
+from part_rules import calculate_power_breakdown
+
+# --- CONFIGURATION ---
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+MAX_PENDING = 256          # requests admitted at once, queued or running
+MAX_BATCH = 500            # build requests per /builds call
+MAX_BODY = 1 << 20
+IDLE_TIMEOUT = 30          # seconds a keep-alive connection may sit between requests
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               408: 'Request Timeout', 413: 'Payload Too Large', 500: 'Internal Server Error',
+               503: 'Service Unavailable'}
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# --- REQUEST PARSING ---
+def _number(value, name, kind=float):
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' must be a number")
+    if number <= 0: raise ApiError(400, f"'{name}' must be positive")
+    return number
+
+def _build_args(spec, catalog, default_mode):
+    if not isinstance(spec, dict): raise ApiError(400, "each build request must be an object")
+    budget = _number(spec.get('budget'), 'budget', int)
+    mode = spec.get('mode', default_mode)
+    if mode not in BUILD_MODES: raise ApiError(400, f"unknown mode '{mode}'")
+    fixed_cpu = None
+    if spec.get('fixed_cpu_id') is not None:
+        fixed_cpu = catalog.by_id('processors', spec['fixed_cpu_id'])
+        if fixed_cpu is None: raise ApiError(404, f"no processor with id {spec['fixed_cpu_id']}")
+    return budget, bool(spec.get('include_gpu', True)), fixed_cpu, mode
+
+def _build_result(result):
+    parts, total, remaining, power, gpu_required, advice = result
+    if parts is None: return {'parts': None, 'advice': advice or "Budget too low for a complete build."}
+    return {'parts': {slot: dict(part) for slot, part in parts.items()}, 'total': total, 'remaining': remaining,
+            'power': power, 'gpu_required': gpu_required, 'advice': advice}
+
+# --- HANDLERS (run on the worker pool) ---
+def handle_build(catalog, body, query):
+    budget, include_gpu, fixed_cpu, mode = _build_args(body, catalog, 'optimal')
+    result = generate_pc_build(budget, include_gpu, fixed_cpu, mode, catalog)
+    return dict(_build_result(result), catalog_version=catalog.version)
+
+def handle_builds(catalog, body, query):
+    """Many builds against one snapshot; identical requests in a batch are solved once."""
+    specs = body.get('requests')
+    if not isinstance(specs, list) or not specs: raise ApiError(400, "'requests' must be a non-empty list")
+    if len(specs) > MAX_BATCH: raise ApiError(413, f"at most {MAX_BATCH} requests per batch")
+    default_mode = body.get('mode', 'optimal')
+    solved, results = {}, []
+    for spec in specs:
+        try:
+            budget, include_gpu, fixed_cpu, mode = _build_args(spec, catalog, default_mode)
+        except ApiError as e:
+            results.append({'error': str(e), 'status': e.status})
+            continue
+        key = (budget, include_gpu, fixed_cpu['id'] if fixed_cpu else None, mode)
+        if key not in solved:
+            solved[key] = _build_result(generate_pc_build(budget, include_gpu, fixed_cpu, mode, catalog))
+        else:
+            metrics.count('api.batch.deduped')
+        results.append(solved[key])
+    return {'results': results, 'catalog_version': catalog.version}
+
+def handle_cpu_matrix(catalog, body, query):
+    """Best build for every processor at one budget, best first."""
+    budget, include_gpu, _, mode = _build_args(body, catalog, 'optimal')
+    limit = _number(body.get('limit', 50), 'limit', int)
+    matrix = cpu_build_matrix(budget, include_gpu, mode, catalog)
+    builds = [dict(_build_result((row['parts'], row['total'], row['remaining'], row['power'], row['gpu_required'], row['advice'])),
+                   value=row['value']) for row in matrix[:limit]]
+    return {'builds': builds, 'cpus': len(matrix), 'catalog_version': catalog.version}
+
+def handle_gpu_recommendations(catalog, body, query):
+    if query.get('cpu_id') is not None:
+        cpu = catalog.by_id('processors', _number(query['cpu_id'], 'cpu_id', int))
+        if cpu is None: raise ApiError(404, f"no processor with id {query['cpu_id']}")
+    else:
+        # Older clients send a price: judge by the best processor it buys.
+        cpu = catalog.best('processors', _number(query.get('cpu_price'), 'cpu_price')) or catalog.cheapest('processors')
+        if cpu is None: raise ApiError(404, "no processors in the catalog")
+    preferred, risky = get_gpu_recommendations(cpu, catalog)
+    return {'preferred': [dict(gpu) for gpu in preferred], 'risky': [dict(gpu) for gpu in risky], 'catalog_version': catalog.version}
+
+def handle_alternatives(catalog, body, query):
+    table = query.get('table')
+    if table not in TABLES: raise ApiError(400, f"'table' must be one of {', '.join(TABLES)}")
+    alternatives = get_alternatives(table, _number(query.get('price'), 'price'), query.get('search'), catalog)
+    return {'alternatives': [dict(row) for row in alternatives], 'catalog_version': catalog.version}
+
+def _parts(catalog, body):
+    slots = body.get('parts')
+    if not isinstance(slots, dict): raise ApiError(400, "'parts' must be an object of slot -> id")
+    parts = {}
+    for slot, part in slots.items():
+        if slot not in SLOT_TABLES: raise ApiError(400, f"unknown slot '{slot}'")
+        row = catalog.by_id(SLOT_TABLES[slot], part)
+        if row is None: raise ApiError(404, f"no {SLOT_TABLES[slot]} row with id {part}")
+        parts[slot] = row
+    return parts
+
+def handle_power(catalog, body, query):
+    """Power breakdown for parts given as {slot: id}."""
+    return {'power': calculate_power_breakdown(_parts(catalog, body)), 'catalog_version': catalog.version}
+
+def handle_rebalance(catalog, body, query):
+    """Re-solve a build after swaps, keeping the pinned slots; see build_solver.rebalance_build."""
+    budget = _number(body.get('budget'), 'budget', int)
+    parts = _parts(catalog, body)
+    if 'CPU' not in parts: raise ApiError(400, "'parts' must include a CPU")
+    pinned, swapped = body.get('pinned', []), body.get('swapped', [])
+    if not isinstance(pinned, list) or not isinstance(swapped, list): raise ApiError(400, "'pinned' and 'swapped' must be lists of slots")
+    rank = 'performance' if body.get('mode') == 'performance' else 'price'
+    result = rebalance_build(catalog, budget, parts, pinned, swapped, rank=rank)
+    return dict(_build_result(result), catalog_version=catalog.version)
+
+ROUTES = {
+    ('POST', '/build'): handle_build,
+    ('POST', '/builds'): handle_builds,
+    ('POST', '/cpu-matrix'): handle_cpu_matrix,
+    ('GET', '/gpu-recommendations'): handle_gpu_recommendations,
+    ('GET', '/alternatives'): handle_alternatives,
+    ('POST', '/power'): handle_power,
+    ('POST', '/rebalance'): handle_rebalance,
+}
+
+# --- HTTP SERVER ---
+class ApiServer:
+    def __init__(self, db_path=DATABASE_NAME, workers=DEFAULT_WORKERS, max_pending=MAX_PENDING):
+        self.db_path = db_path
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+        self.max_pending = max_pending
+        self.pending = 0
+
+    def run_handler(self, handler, body, query):
+        return handler(get_catalog(self.db_path), body, query)
+
+    async def dispatch(self, method, target, body):
+        """(status, payload, content_type) for one request."""
+        url = urlsplit(target)
+        if url.path == '/health': return 200, {'status': 'ok'}, None
+        if url.path == '/metrics': return 200, metrics.prometheus_text(), 'text/plain; version=0.0.4'
+        handler = ROUTES.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in ROUTES): raise ApiError(405, f"{method} not allowed on {url.path}")
+            raise ApiError(404, f"no route {url.path}")
+        if method == 'POST':
+            try:
+                body = json.loads(body or b'{}')
+            except ValueError:
+                raise ApiError(400, "body is not valid JSON")
+            if not isinstance(body, dict): raise ApiError(400, "body must be a JSON object")
+        if self.pending >= self.max_pending:
+            metrics.count('api.rejected')
+            raise ApiError(503, "server busy, retry shortly")
+        self.pending += 1
+        try:
+            with metrics.timer('api.request', label=url.path):
+                payload = await asyncio.get_running_loop().run_in_executor(
+                    self.pool, self.run_handler, handler, body, dict(parse_qsl(url.query)))
+        finally:
+            self.pending -= 1
+        return 200, payload, None
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line: break
+                method, target, version = (request_line.decode('latin-1').split() + ['', '', ''])[:3]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''): break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                if length > MAX_BODY:
+                    status, payload, content_type = 413, {'error': 'body too large'}, None
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    try:
+                        status, payload, content_type = await self.dispatch(method, target, body)
+                    except ApiError as e:
+                        status, payload, content_type = e.status, {'error': str(e)}, None
+                    except Exception as e:
+                        metrics.count('api.errors')
+                        status, payload, content_type = 500, {'error': f"{type(e).__name__}: {e}"}, None
+                metrics.count(f'api.status.{status}')
+                writer.write(_response(status, payload, content_type, keep_alive))
+                await writer.drain()
+                if not keep_alive: break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+def _response(status, payload, content_type, keep_alive):
+    if content_type is None:
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode()
+        content_type = 'application/json; charset=utf-8'
+    else:
+        body = payload.encode()
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+async def serve(host, port, db_path=DATABASE_NAME, workers=DEFAULT_WORKERS):
+    api = ApiServer(db_path, workers)
+    get_catalog(db_path)  # load the snapshot before the first client waits on it
+    server = await asyncio.start_server(api.handle_connection, host, port, backlog=1024)
+    print(f"🚀 Build API on http://{host}:{port} ({workers} workers)")
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless JSON build API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--db", default=DATABASE_NAME)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.db, args.workers))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,135 @@
+"""Runs generate_pc_build over a file of build requests and streams the results as JSONL.
+
+Input is JSONL or CSV (by extension) with one request per line or row:
+
+    budget        required
+    include_gpu   default true (CSV: 1/0, true/false, yes/no)
+    fixed_cpu     optional processor id or name; names that don't match exactly use search
+    mode          default 'optimal'
+
+    python batch_build.py requests.csv --out builds.jsonl [--workers 8]
+    python batch_build.py requests.csv --out builds.jsonl --resume   # skip lines already written
+
+Every output line carries the input's `index` (0-based line/row number), so a resumed
+run only computes what an interrupted one did not finish.
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from build_engine import BUILD_MODES, generate_pc_build
+from catalog import DATABASE_NAME, Catalog
+from search_index import search_products
+
+# --- CONFIGURATION ---
+CHUNK_SIZE = 25
+TRUE_WORDS = ('1', 'true', 'yes', 'y')
+
+# --- INPUT ---
+def read_requests(path):
+    """[(index, request dict)] from a .jsonl or .csv file; blank lines keep their index."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.csv'):
+            return [(index, row) for index, row in enumerate(csv.DictReader(f)) if any(row.values())]
+        return [(index, json.loads(line)) for index, line in enumerate(f) if line.strip()]
+
+def completed_indexes(out_path):
+    """Indexes already in an output file, truncating a half-written last line from a crash."""
+    if not os.path.exists(out_path): return set()
+    done, good_bytes = set(), 0
+    with open(out_path, 'rb') as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)['index'])
+            except (ValueError, KeyError):
+                break
+            good_bytes += len(line)
+    with open(out_path, 'r+b') as f: f.truncate(good_bytes)
+    return done
+
+# --- WORKERS ---
+_worker = {}
+
+def _init_worker(db_path):
+    conn = sqlite3.connect(db_path)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+    _worker['catalog'] = Catalog.load(db_path, version=version)
+
+def _resolve_cpu(catalog, value):
+    if value in (None, ''): return None
+    text = str(value).strip()
+    if text.isdigit():
+        cpu = catalog.by_id('processors', int(text))
+        if cpu: return cpu
+    cpu = catalog.by_name('processors', text)
+    if cpu: return cpu
+    hits = search_products(text, ['processors'], limit=1, catalog=catalog)
+    if not hits: raise ValueError(f"no processor matches {text!r}")
+    return catalog.by_id('processors', hits[0][1])
+
+def _include_gpu(value):
+    if value in (None, ''): return True
+    if isinstance(value, bool): return value
+    return str(value).strip().lower() in TRUE_WORDS
+
+def run_request(catalog, index, request):
+    result = {'index': index, 'request': request}
+    try:
+        budget = int(float(request['budget']))
+        mode = request.get('mode') or 'optimal'
+        if mode not in BUILD_MODES: raise ValueError(f"unknown mode {mode!r}")
+        fixed_cpu = _resolve_cpu(catalog, request.get('fixed_cpu'))
+        parts, total, remaining, power, gpu_required, advice = generate_pc_build(
+            budget, _include_gpu(request.get('include_gpu')), fixed_cpu, mode, catalog)
+    except (KeyError, ValueError, TypeError) as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+    if parts is None:
+        result.update(parts=None, advice="Budget too low for a complete build.")
+        return result
+    result.update(parts={slot: {'id': p['id'], 'name': p['name'], 'price': p['price']} for slot, p in parts.items()},
+                  total=total, remaining=remaining, power=power, gpu_required=gpu_required, advice=advice)
+    return result
+
+def _run_chunk(chunk):
+    catalog = _worker['catalog']
+    return [dict(run_request(catalog, index, request), catalog_version=catalog.version) for index, request in chunk]
+
+# --- DRIVER ---
+def batch_build(in_path, out_path, db_path=DATABASE_NAME, workers=None, resume=False):
+    requests = read_requests(in_path)
+    done = completed_indexes(out_path) if resume else set()
+    pending = [item for item in requests if item[0] not in done]
+    chunks = [pending[i:i + CHUNK_SIZE] for i in range(0, len(pending), CHUNK_SIZE)]
+    print(f"🧮 {len(pending)} of {len(requests)} requests to build ({len(done)} already done)", file=sys.stderr)
+
+    started, written, errors = time.perf_counter(), 0, 0
+    with open(out_path, 'a' if resume else 'w', encoding='utf-8') as out:
+        if chunks:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(db_path,)) as pool:
+                for results in pool.map(_run_chunk, chunks):
+                    for result in results:
+                        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                        errors += 'error' in result
+                    out.flush()
+                    written += len(results)
+    elapsed = time.perf_counter() - started
+    rate = written / elapsed if elapsed else 0
+    print(f"✅ {written} builds ({errors} errors) in {elapsed:.1f}s, {rate:.0f}/s", file=sys.stderr)
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("requests", help="JSONL or CSV file of build requests")
+    parser.add_argument("--out", required=True, help="JSONL output file")
+    parser.add_argument("--db", default=DATABASE_NAME)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--resume", action="store_true", help="Append to --out, skipping requests it already has")
+    args = parser.parse_args()
+    batch_build(args.requests, args.out, args.db, args.workers, args.resume)
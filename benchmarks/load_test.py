@@ -0,0 +1,137 @@
+"""Load generator for api_server.py: N keep-alive clients for a fixed duration.
+
+Starts its own server (in a child process) unless --url points at a running one, then
+reports requests/sec and latency percentiles per endpoint as JSON.
+
+    python benchmarks/load_test.py --clients 32 --duration 10
+    python benchmarks/load_test.py --url http://127.0.0.1:8080 --mix build
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from suite import summarize  # noqa: E402
+
+BUDGETS = list(range(30000, 400001, 5000))
+MIXES = {
+    'build': [('build', 1)],
+    'batch': [('builds', 1)],
+    'swap': [('alternatives', 3), ('gpu', 1)],
+    'mixed': [('build', 4), ('builds', 1), ('alternatives', 4), ('gpu', 2), ('power', 1)],
+}
+BATCH_SIZE = 20
+
+def make_request(kind, rng, cpus):
+    """(method, path, body) for one request of the given kind."""
+    if kind == 'build':
+        spec = {'budget': rng.choice(BUDGETS), 'include_gpu': rng.random() < 0.8}
+        if cpus and rng.random() < 0.3: spec['fixed_cpu_id'] = rng.choice(cpus)['id']
+        return 'POST', '/build', spec
+    if kind == 'builds':
+        return 'POST', '/builds', {'mode': 'greedy', 'requests': [{'budget': rng.choice(BUDGETS)} for _ in range(BATCH_SIZE)]}
+    if kind == 'alternatives':
+        table = rng.choice(['processors', 'gpus', 'rams', 'ssds', 'psus'])
+        return 'GET', f"/alternatives?table={table}&price={rng.randrange(3000, 90000, 500)}", None
+    if kind == 'gpu':
+        return 'GET', (f"/gpu-recommendations?cpu_id={rng.choice(cpus)['id']}" if cpus else "/gpu-recommendations?cpu_price=20000"), None
+    return 'POST', '/power', {'parts': {'CPU': rng.choice(cpus)['id']}} if cpus else {'parts': {}}
+
+async def request(reader, writer, host, method, path, body):
+    data = json.dumps(body).encode() if body is not None else b''
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(data)}\r\n\r\n").encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''): break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length': length = int(value)
+    payload = await reader.readexactly(length)
+    return status, payload
+
+async def client(host, port, kinds, weights, deadline, seed, cpus, samples, statuses):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            method, path, body = make_request(kind, rng, cpus)
+            started = time.perf_counter()
+            status, _ = await request(reader, writer, host, method, path, body)
+            samples.setdefault(kind, []).append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+async def run(host, port, clients, duration, mix, cpus):
+    kinds, weights = zip(*MIXES[mix])
+    samples, statuses = {}, {}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(client(host, port, kinds, weights, deadline, seed, cpus, samples, statuses)
+                           for seed in range(clients)))
+    elapsed = time.perf_counter() - started
+    total = sum(len(s) for s in samples.values())
+    return {'clients': clients, 'mix': mix, 'seconds': round(elapsed, 2), 'requests': total,
+            'requests_per_sec': round(total / elapsed, 1), 'statuses': statuses,
+            'endpoints': {kind: summarize(s) for kind, s in samples.items()}}
+
+async def wait_for_server(host, port, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            status, _ = await request(reader, writer, host, 'GET', '/health', None)
+            writer.close()
+            if status == 200: return
+        except OSError:
+            if time.perf_counter() > deadline: raise
+        await asyncio.sleep(0.2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Existing server; by default one is started for the run')
+    parser.add_argument('--db', help='Catalog DB for the spawned server (default: the repo\'s tech_data.db)')
+    parser.add_argument('--workers', type=int, help='Worker threads for the spawned server')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--mix', choices=sorted(MIXES), default='mixed')
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = '127.0.0.1', 18080
+        command = [sys.executable, os.path.join(ROOT, 'api_server.py'), '--port', str(port)]
+        if args.workers: command += ['--workers', str(args.workers)]
+        if args.db: command += ['--db', os.path.abspath(args.db)]
+        server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL)
+
+    try:
+        from catalog import Catalog
+        db_path = args.db or os.path.join(ROOT, 'tech_data.db')
+        cpus = Catalog.load(db_path).table('processors').items if os.path.exists(db_path) else []
+        asyncio.run(wait_for_server(host, port))
+        print(f"⏱ {args.clients} clients, {args.duration}s, mix={args.mix}...", file=sys.stderr)
+        report = asyncio.run(run(host, port, args.clients, args.duration, args.mix, cpus))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Offline listing-page parse benchmark.
+
+Runs every installed extractor backend over the saved StarTech fixtures, checks that
+each one yields exactly the records of the reference bs4 backend, and reports
+pages/sec and products/sec.
+
+    python benchmarks/parse_bench.py [--rounds 20] [--json]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from extractors import available_backends, extract_records  # noqa: E402
+
+FIXTURE_DIR = os.path.join(ROOT, 'fixtures', 'startech')
+FIXTURE_CATEGORY = {'processor': 'CPU', 'graphics-card': 'GPU', 'power-supply': 'PSU', 'ssd': 'SSD',
+                    'motherboard': 'Motherboard', 'ram': 'RAM', 'casing': 'Casing'}
+
+def load_fixtures():
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.html'))):
+        key = os.path.basename(path).rsplit('_page', 1)[0]
+        with open(path, encoding='utf-8') as f:
+            pages.append((FIXTURE_CATEGORY.get(key, 'General'), f.read()))
+    return pages
+
+def bench_backend(backend, pages, rounds):
+    products = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for category, html in pages:
+            products += len(extract_records(html, category, backend)[1])
+    elapsed = time.perf_counter() - started
+    return {'backend': backend, 'pages_per_sec': round(rounds * len(pages) / elapsed, 1),
+            'products_per_sec': round(products / elapsed, 1), 'seconds': round(elapsed, 3)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--backends', nargs='*', default=None)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    pages = load_fixtures()
+    if not pages: sys.exit(f"No fixtures found in {FIXTURE_DIR}")
+    backends = args.backends or available_backends()
+    reference_backend = 'bs4' if 'bs4' in backends else backends[0]
+    reference = [extract_records(html, category, reference_backend) for category, html in pages]
+
+    results = []
+    for backend in backends:
+        output = [extract_records(html, category, backend) for category, html in pages]
+        if output != reference:
+            sys.exit(f"❌ {backend} disagrees with {reference_backend}; not benchmarking it.")
+        results.append(bench_backend(backend, pages, args.rounds))
+
+    if args.json:
+        print(json.dumps({'pages': len(pages), 'rounds': args.rounds, 'results': results}, indent=2))
+        return
+    print(f"{len(pages)} fixture pages x {args.rounds} rounds (records verified against {reference_backend})")
+    for r in results:
+        print(f"  {r['backend']:<10} {r['pages_per_sec']:>9} pages/s {r['products_per_sec']:>11} products/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Per-session memory of the web app's build state: full part dicts vs part ids.
+
+Simulates many sessions that each build a PC and swap two parts, once the way the app
+used to keep them (a dict copy per part, swaps copied in) and once as it does now (ids
+plus the catalog version, resolved against the shared catalog on render). Also compares
+the catalog's rows as plain dicts vs Part records. Results are JSON.
+
+    python benchmarks/session_bench.py --db /tmp/tech_100k.db --sessions 5000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from build_engine import generate_pc_build, get_alternatives  # noqa: E402
+from build_solver import SLOT_TABLES  # noqa: E402
+from catalog import TABLES, Catalog, Part, _fill_attributes  # noqa: E402
+from part_rules import calculate_power_breakdown  # noqa: E402
+
+SWAP_SLOTS = ('Graphics Card', 'Storage')
+
+def retained(make):
+    """(value, bytes still allocated after make() returns)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = make()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, after - before
+
+# --- CATALOG ROWS ---
+def raw_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        tables = {}
+        for table in TABLES:
+            rows = [dict(row) for row in conn.execute(f"SELECT * FROM {table} WHERE active = 1 AND price > 0")]
+            _fill_attributes(table, rows)
+            tables[table] = rows
+        return tables
+    finally:
+        conn.close()
+
+def bench_rows(db_path):
+    rows, dict_bytes = retained(lambda: raw_rows(db_path))
+    count = sum(len(table_rows) for table_rows in rows.values())
+    del rows
+    _, part_bytes = retained(lambda: {table: [Part(row) for row in table_rows] for table, table_rows in raw_rows(db_path).items()})
+    return {'rows': count, 'dict_bytes_per_row': round(dict_bytes / count), 'part_bytes_per_row': round(part_bytes / count)}
+
+# --- SESSIONS ---
+def plan_sessions(catalog, sessions, seed):
+    """[(parts, gpu_forced, advice, {slot: replacement})] for each simulated session."""
+    rng = random.Random(seed)
+    plans = []
+    for _ in range(sessions):
+        parts, _, _, _, gpu_forced, advice = generate_pc_build(rng.randrange(40000, 400001, 5000), True, None, 'greedy', catalog)
+        if parts is None: continue
+        swaps = {}
+        for slot in SWAP_SLOTS:
+            if slot not in parts: continue
+            alternatives = get_alternatives(SLOT_TABLES[slot], parts[slot]['price'], catalog=catalog)
+            if alternatives: swaps[slot] = rng.choice(alternatives)
+        plans.append((parts, gpu_forced, advice, swaps))
+    return plans
+
+def dict_sessions(plans):
+    states = []
+    for parts, gpu_forced, advice, swaps in plans:
+        copies = {slot: dict(item) for slot, item in parts.items()}
+        state = {'parts': copies, 'total': sum(p['price'] for p in copies.values()), 'saved': 0,
+                 'watts': calculate_power_breakdown(copies), 'gpu_forced': gpu_forced, 'advice': advice}
+        for slot, item in swaps.items(): state['parts'][slot] = dict(item)
+        states.append(state)
+    return states
+
+def id_sessions(plans, catalog):
+    states = []
+    for parts, gpu_forced, advice, swaps in plans:
+        state = {'part_ids': {slot: item['id'] for slot, item in parts.items()}, 'catalog_version': catalog.version,
+                 'gpu_forced': gpu_forced, 'advice': advice}
+        for slot, item in swaps.items(): state['part_ids'][slot] = item['id']
+        states.append(state)
+    return states
+
+# --- RERUN ---
+def render_dicts(state, catalog):
+    parts = state['parts']
+    alternatives = get_alternatives('gpus', parts['Graphics Card']['price'], catalog=catalog) if 'Graphics Card' in parts else []
+    labels = [f"{a['name'][:40]}... ({a['price']} ৳)" for a in alternatives]
+    return sum(p['price'] for p in parts.values()), calculate_power_breakdown(parts), labels
+
+def render_ids(state, catalog):
+    parts = {slot: catalog.by_id(SLOT_TABLES[slot], row_id) for slot, row_id in state['part_ids'].items()}
+    alternatives = get_alternatives('gpus', parts['Graphics Card']['price'], catalog=catalog) if 'Graphics Card' in parts else []
+    labels = [a.short_label for a in alternatives]
+    return sum(p['price'] for p in parts.values()), calculate_power_breakdown(parts), labels
+
+def bench_reruns(render, states, catalog):
+    for state in states: render(state, catalog)   # warm the alternatives cache and labels
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for state in states: render(state, catalog)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'rerun_us': round(elapsed * 1e6 / len(states), 1), 'peak_alloc_bytes': peak}
+
+def main(db_path, sessions, seed):
+    results = {'db': db_path, 'catalog_rows': bench_rows(db_path)}
+    catalog = Catalog.load(db_path, version=1)
+    plans = plan_sessions(catalog, sessions, seed)
+    dict_states, dict_bytes = retained(lambda: dict_sessions(plans))
+    id_states, id_bytes = retained(lambda: id_sessions(plans, catalog))
+    results['sessions'] = len(plans)
+    results['dict_state_bytes_per_session'] = round(dict_bytes / len(plans))
+    results['id_state_bytes_per_session'] = round(id_bytes / len(plans))
+    results['dict_reruns'] = bench_reruns(render_dicts, dict_states, catalog)
+    results['id_reruns'] = bench_reruns(render_ids, id_states, catalog)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=os.path.join(ROOT, 'tech_data.db'))
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="Also write the JSON results here")
+    args = parser.parse_args()
+    results = main(args.db, args.sessions, args.seed)
+    print(json.dumps(results, indent=2))
+    if args.out:
+        with open(args.out, 'w') as f: json.dump(results, f, indent=2)
@@ -0,0 +1,176 @@
+"""Offline benchmark suite: builds, swaps and the scraper's parse-and-insert path.
+
+Each catalog size runs in its own process against a synthetic tech_data.db, so peak
+RSS is per size. Results are JSON, for comparing commits.
+
+    python benchmarks/suite.py                          # 1k, 20k, 100k and 1M products
+    python benchmarks/suite.py --sizes 1000 --out bench.json
+"""
+import argparse
+import glob
+import json
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from parse_bench import FIXTURE_CATEGORY, FIXTURE_DIR  # noqa: E402
+
+# 20k products is 2,000 CPUs and 3,000 SKUs in every other category, the "thousands of SKUs
+# per category" the solver's time budget is meant for; prices are still spread out enough
+# at that size that few listings collapse into one candidate.
+DEFAULT_SIZES = [1000, 20000, 100000, 1000000]
+BUDGET_STEP = 5000
+FIXED_CPU_SAMPLE = 20
+SWAP_SAMPLE = 500
+
+def summarize(samples_ms):
+    """p50/p95/p99 and throughput for a list of per-call latencies."""
+    ordered = sorted(samples_ms)
+    def pct(p): return round(ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))], 4)
+    total_s = sum(ordered) / 1000.0
+    return {'calls': len(ordered), 'p50_ms': pct(50), 'p95_ms': pct(95), 'p99_ms': pct(99),
+            'max_ms': round(ordered[-1], 4), 'per_sec': round(len(ordered) / total_s, 1) if total_s else None}
+
+def timed(fn, args_list):
+    samples = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024, 1)
+
+# --- ONE SIZE (runs in a child process) ---
+def bench_catalog(db_path):
+    from build_engine import generate_pc_build, get_alternatives, get_gpu_recommendations
+    from build_solver import solve
+    from catalog import Catalog
+    from precompute_builds import BUDGET_MAX, BUDGET_MIN
+    from snapshot import Snapshot, load_snapshot, write_snapshot
+    from watchlist import diff_snapshots
+
+    started = time.perf_counter()
+    catalog = Catalog.load(db_path, version=1)
+    results = {'catalog_load_ms': round((time.perf_counter() - started) * 1000, 1)}
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        manifest = write_snapshot(db_path, snapshot_dir)
+        results['snapshot_bytes'] = manifest['bytes']
+        started = time.perf_counter()
+        load_snapshot(snapshot_dir)
+        results['snapshot_load_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        snapshot = Snapshot(os.path.join(snapshot_dir, manifest['file']))
+        started = time.perf_counter()
+        diff_snapshots(snapshot, snapshot)
+        results['snapshot_diff_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    budgets = list(range(BUDGET_MIN, BUDGET_MAX + 1, BUDGET_STEP))
+    cpus = catalog.table('processors').items
+    fixed = [cpus[i * len(cpus) // FIXED_CPU_SAMPLE] for i in range(FIXED_CPU_SAMPLE)] if cpus else []
+
+    for mode in ('optimal', 'greedy'):
+        first = timed(generate_pc_build, [(budgets[len(budgets) // 2], True, None, mode, catalog)])[0]
+        results[f'build_{mode}_first_call_ms'] = round(first, 2)
+        results[f'build_{mode}'] = summarize(timed(generate_pc_build, [(b, gpu, None, mode, catalog) for b in budgets for gpu in (True, False)]))
+        results[f'build_{mode}_fixed_cpu'] = summarize(timed(generate_pc_build, [(b, True, cpu, mode, catalog) for b in budgets[::4] for cpu in fixed]))
+    # Solves cut short by the time budget; anything above zero means builds worse than the optimum.
+    results['solver_timeouts'] = sum(solve(catalog, b, gpu, igpu_only=not gpu).timed_out for b in budgets for gpu in (True, False))
+
+    swaps = []
+    for table in ('processors', 'gpus', 'rams', 'psus'):
+        items = catalog.table(table).items
+        step = max(1, len(items) // (SWAP_SAMPLE // 4))
+        swaps += [(table, row['price'], None, catalog) for row in items[::step]]
+    results['get_alternatives'] = summarize(timed(get_alternatives, swaps))
+    results['get_gpu_recommendations'] = summarize(timed(get_gpu_recommendations, [(row, catalog) for row in cpus[::max(1, len(cpus) // 200)]]))
+    return results
+
+def bench_scrape(rounds=5):
+    """Parse every fixture page and upsert its records into a scratch DB, timed per page."""
+    from scrape_ultimate_v2 import parse_listing, setup_database, upsert_category
+
+    table_for = {'CPU': 'processors', 'GPU': 'gpus', 'PSU': 'psus', 'SSD': 'ssds', 'Motherboard': 'motherboards',
+                 'RAM': 'rams', 'Casing': 'casings'}
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.html'))):
+        key = os.path.basename(path).rsplit('_page', 1)[0]
+        with open(path, encoding='utf-8') as f: pages.append((FIXTURE_CATEGORY.get(key, 'General'), f.read()))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, 'scrape.db'), isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        setup_database(conn)
+        parse_ms, insert_ms, products = [], [], 0
+        for round_num in range(rounds):
+            for category, html in pages:
+                started = time.perf_counter()
+                _, records = parse_listing(html, category)
+                parsed = time.perf_counter()
+                # Shift prices each round so every upsert has real writes to do.
+                records = [(name, price + round_num, tag, url, image) for name, price, tag, url, image in records]
+                conn.execute("BEGIN IMMEDIATE")
+                upsert_category(conn, table_for[category], records, complete=False)
+                conn.execute("COMMIT")
+                parse_ms.append((parsed - started) * 1000)
+                insert_ms.append((time.perf_counter() - parsed) * 1000)
+                products += len(records)
+        conn.close()
+    total_s = (sum(parse_ms) + sum(insert_ms)) / 1000.0
+    return {'pages': len(pages) * rounds, 'parse': summarize(parse_ms), 'insert': summarize(insert_ms),
+            'products_per_sec': round(products / total_s, 1) if total_s else None}
+
+def run_one(size, data_dir):
+    from synth_catalog import generate
+
+    db_path = os.path.join(data_dir, f'tech_{size}.db')
+    if not os.path.exists(db_path):
+        started = time.perf_counter()
+        generate(db_path, size)
+        print(f"  generated {size} products in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    results = {'products': size}
+    results.update(bench_catalog(db_path))
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+# --- DRIVER ---
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'bd_pc_builder_bench'),
+                        help='Where synthetic catalogs are cached between runs')
+    parser.add_argument('--out', help='Write the JSON report here as well as to stdout')
+    parser.add_argument('--one', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    if args.one is not None:
+        print(json.dumps(run_one(args.one, args.data_dir)))
+        return
+
+    report = {'python': sys.version.split()[0], 'sizes': []}
+    for size in args.sizes:
+        print(f"⏱ {size} products...", file=sys.stderr)
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), '--one', str(size), '--data-dir', args.data_dir],
+                               stdout=subprocess.PIPE, check=True, universal_newlines=True)
+        report['sizes'].append(json.loads(child.stdout))
+    print("⏱ scraper parse + insert...", file=sys.stderr)
+    report['scrape'] = bench_scrape()
+    report['scrape']['peak_rss_mb'] = peak_rss_mb()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, 'w') as f: f.write(text + "\n")
+
+if __name__ == '__main__':
+    main()
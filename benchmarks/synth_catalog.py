@@ -0,0 +1,119 @@
+"""Synthetic tech_data.db generator.
+
+Writes a catalog with the scraper's schema, indexes and spec columns, filled with names
+and prices shaped like the real StarTech listings (brand/model/tier mixes per table).
+
+    python benchmarks/synth_catalog.py --products 100000 --out /tmp/tech_100k.db
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from perf_model import PERF_TABLES, score_table  # noqa: E402
+from scrape_ultimate_v2 import TABLES, setup_database  # noqa: E402
+from spec_rules import ATTRIBUTE_COLUMNS, TABLE_CATEGORIES, classify  # noqa: E402
+
+# Share of the catalog each table gets; processors are the smallest listing on the site.
+TABLE_SHARE = {'processors': 0.10, 'motherboards': 0.15, 'rams': 0.15, 'ssds': 0.15, 'gpus': 0.15,
+               'psus': 0.15, 'casings': 0.15}
+
+def _price(rng, base):
+    return max(500, int(base * rng.lognormvariate(0, 0.18)) // 50 * 50)
+
+def _cpu(rng):
+    if rng.random() < 0.5:
+        if rng.random() < 0.15:
+            tier = rng.choice([5, 7, 9])
+            return f"Intel Core Ultra {tier} {tier}{rng.choice([25, 45, 65])}K Processor", 25000 + tier * 6000
+        tier = rng.choice([3, 5, 5, 7, 9])
+        gen = rng.choice([12, 13, 14])
+        suffix = rng.choice(["", "F", "K", "KF"])
+        return f"Intel Core i{tier}-{gen}{rng.randint(1, 9)}00{suffix} Processor", 9000 + tier * 5500 + (gen - 12) * 2500
+    tier = rng.choice([3, 5, 5, 7, 9])
+    series = rng.choice([5, 5, 7, 8, 9])
+    suffix = rng.choice(["", "X", "G", "X3D"]) if series != 8 else "G"
+    return f"AMD Ryzen {tier} {series}{tier}00{suffix} Processor", 8000 + tier * 5000 + (series - 5) * 2500
+
+MOBO_CHIPSETS = {'H610': 9000, 'B660': 14000, 'B760': 16000, 'Z790': 32000, 'A520': 8000, 'B550': 13000,
+                 'X570': 24000, 'A620': 11000, 'B650': 19000, 'X670': 38000}
+
+def _mobo(rng):
+    chipset = rng.choice(list(MOBO_CHIPSETS))
+    brand = rng.choice(["MSI", "ASUS", "Gigabyte", "ASRock"])
+    line = rng.choice(["PRO", "TUF Gaming", "AORUS Elite", "Steel Legend", "Prime"])
+    ram = " DDR4" if chipset in ('B660', 'B760', 'H610', 'Z790') and rng.random() < 0.5 else ""
+    return f"{brand} {line} {chipset}M{ram} WIFI Motherboard", MOBO_CHIPSETS[chipset]
+
+def _ram(rng):
+    gen = rng.choice(["DDR4", "DDR5"])
+    size = rng.choice([8, 16, 16, 32])
+    speed = rng.choice([3200, 3600]) if gen == "DDR4" else rng.choice([5200, 6000])
+    return f"{rng.choice(['Corsair Vengeance', 'G.Skill Ripjaws', 'Kingston Fury', 'TeamGroup T-Force'])} {size}GB {gen} {speed}MHz RAM", size * (380 if gen == "DDR4" else 520)
+
+def _ssd(rng):
+    size = rng.choice([256, 512, 1000, 2000])
+    kind = rng.choice(["NVMe", "M.2 NVMe", "SATA"])
+    return f"{rng.choice(['Samsung', 'Kingston', 'WD', 'Lexar', 'Transcend'])} {size}GB {kind} SSD", size * (9 if kind == "SATA" else 11) + 1500
+
+GPU_MODELS = {'RTX 3050': 28000, 'RTX 3060': 36000, 'RTX 4060': 38000, 'RTX 4060 Ti': 48000, 'RTX 4070': 66000,
+              'RTX 4070 SUPER': 76000, 'RTX 4070 Ti': 90000, 'RTX 4080': 130000, 'RTX 4090': 230000,
+              'RX 6600': 27000, 'RX 6700 XT': 42000, 'RX 7700 XT': 52000, 'RX 7800 XT': 62000, 'RX 7900 XTX': 120000}
+
+def _gpu(rng):
+    model = rng.choice(list(GPU_MODELS))
+    brand = rng.choice(["MSI", "ASUS", "Gigabyte", "Zotac"]) if model.startswith("RTX") else rng.choice(["Sapphire", "PowerColor", "XFX"])
+    maker = "GeForce" if model.startswith("RTX") else "Radeon"
+    return f"{brand} {maker} {model} {rng.choice(['Gaming OC', 'Ventus 2X', 'Pulse', 'Eagle'])} Graphics Card", GPU_MODELS[model]
+
+def _psu(rng):
+    watts = rng.choice([450, 550, 650, 650, 750, 850, 1000, 1200])
+    rating = rng.choice(["80 Plus Bronze", "80 Plus Gold", "80 Plus Platinum"])
+    return f"{rng.choice(['Corsair', 'Antec', 'DeepCool', 'Thermaltake', 'MSI'])} {watts}W {rating} Power Supply", watts * 9
+
+def _casing(rng):
+    return f"{rng.choice(['Lian Li', 'NZXT', 'Corsair', 'DeepCool', 'Montech'])} {rng.choice(['H5', 'Lancool 216', 'Air 903', 'CH560', '4000D'])} Casing", rng.choice([3500, 5500, 8000, 12000])
+
+GENERATORS = {'processors': _cpu, 'motherboards': _mobo, 'rams': _ram, 'ssds': _ssd, 'gpus': _gpu,
+              'psus': _psu, 'casings': _casing}
+
+def generate(path, products, seed=0):
+    """Writes a fresh synthetic catalog of about `products` rows to path."""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix): os.remove(path + suffix)
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    setup_database(conn)
+    columns = ', '.join(ATTRIBUTE_COLUMNS)
+    placeholders = ', '.join('?' * (4 + len(ATTRIBUTE_COLUMNS)))
+    conn.execute("BEGIN")
+    for table in TABLES:
+        category = TABLE_CATEGORIES[table]
+        count = max(5, int(products * TABLE_SHARE[table]))
+        rows = []
+        for i in range(count):
+            name, base = GENERATORS[table](rng)
+            attrs = classify(name, category)
+            rows.append((name, _price(rng, base), attrs['spec_tag'], f"https://synthetic.test/{table}/{i}")
+                        + tuple(attrs[c] for c in ATTRIBUTE_COLUMNS))
+        conn.executemany(f"INSERT INTO {table} (name, price, spec_tag, url, {columns}) VALUES ({placeholders})", rows)
+        if table in PERF_TABLES: score_table(conn, table)
+    conn.execute("PRAGMA user_version = 1")
+    conn.execute("COMMIT")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    return path
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate(args.out, args.products, args.seed)
+    print(f"✅ Wrote {args.products} synthetic products to {args.out}")
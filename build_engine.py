@@ -0,0 +1,224 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+from build_solver import solve_build
+from catalog import get_catalog
+from metrics import Phases, count, timer
+from part_rules import (PSU_HEADROOM, calculate_power_breakdown, check_bottleneck, get_cpu_type, get_perf_score,
+                        get_ram_type, is_gpu_mandatory)
+from perf_model import BALANCE
+
+# 'performance' is the optimal solver ranking CPUs and GPUs by benchmark score per taka instead of price.
+BUILD_MODES = ('optimal', 'greedy', 'performance')
+ALTERNATIVES_CACHE_SIZE = 512
+
+# --- SWAP-LIST CACHE ---
+class LRUCache:
+    """Small thread-safe LRU tied to one catalog snapshot; a newly published catalog empties it."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._catalog = None
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, catalog, key, compute):
+        with self._lock:
+            if self._catalog is None or self._catalog() is not catalog:
+                self._data.clear()
+                self._catalog = weakref.ref(catalog)
+            if key in self._data:
+                self._data.move_to_end(key)
+                count('cache.alternatives.hit')
+                return self._data[key]
+        value = compute()
+        count('cache.alternatives.miss')
+        with self._lock:
+            if self._catalog() is catalog:
+                self._data[key] = value
+                if len(self._data) > self.maxsize: self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock: self._data.clear()
+
+_alternatives_cache = LRUCache(ALTERNATIVES_CACHE_SIZE)
+
+# --- NEW HELPER: GPU RECOMMENDATIONS ---
+def get_gpu_recommendations(cpu, catalog=None):
+    """GPUs balanced with this CPU's performance, and the rest; best performance per taka first."""
+    catalog = catalog or get_catalog()
+    cpu_score = get_perf_score(cpu, 'processors')
+    preferred, risky = _alternatives_cache.get_or_compute(catalog, ('gpu_recommendations', cpu_score), lambda: _gpu_recommendations(catalog, cpu_score))
+    return list(preferred), list(risky)
+
+def _gpu_recommendations(catalog, cpu_score):
+    gpus = catalog.perf("gpus")
+    ratio = gpus.scores / cpu_score
+    balanced = (ratio >= BALANCE[0]) & (ratio <= BALANCE[1])
+    # Limit lists to avoid UI clutter
+    return gpus.best_value(balanced, 10), gpus.best_value(~balanced, 10)
+
+# --- CATALOG FETCHERS ---
+def get_best_item(catalog, table, max_price, spec_constraint=None, min_watts=0):
+    return catalog.best(table, max_price, spec_constraint, min_watts)
+
+def get_cheapest_item(catalog, table, min_watts=0):
+    return catalog.cheapest(table, min_watts=min_watts)
+
+# --- SWAP HELPER ---
+def get_alternatives(table, current_price, name_search=None, catalog=None):
+    """Up to 50 parts priced 0.5x-3x the current one, most expensive first, one per name."""
+    catalog = catalog or get_catalog()
+    min_price, max_price = current_price * 0.5, current_price * 3.0
+    key = ('alternatives', table, min_price, max_price, (name_search or '').lower())
+    rows = _alternatives_cache.get_or_compute(catalog, key, lambda: _load_alternatives(catalog, table, min_price, max_price, name_search))
+    return list(rows)
+
+def _load_alternatives(catalog, table, min_price, max_price, name_search):
+    count('catalog.alternatives')
+    unique, seen = [], set()
+    for row in catalog.between(table, min_price, max_price, name_search, limit=50):
+        if row['name'] not in seen:
+            unique.append(row)
+            seen.add(row['name'])
+    return tuple(unique)
+
+# --- GREEDY STRATEGY ---
+def greedy_build(catalog, budget, include_gpu=True, fixed_cpu=None):
+    """Fixed budget fractions per part, then a sweeper that upgrades leftovers one part at a time."""
+    remaining = budget
+    parts = {}
+    phases = Phases('build.greedy')
+    
+    # --- PHASE 1: CPU ---
+    cpu = None
+    if fixed_cpu:
+        cpu = fixed_cpu
+    else:
+        cpu = get_best_item(catalog, "processors", budget * 0.30) or get_cheapest_item(catalog, "processors")
+    phases.mark('cpu_pick')
+
+    if cpu: 
+        if remaining - cpu['price'] < 5000:
+            return None, 0, 0, 0, False, None
+        remaining -= cpu['price']
+        parts['CPU'] = cpu
+        
+        cpu_type = get_cpu_type(cpu)
+        gpu_required = is_gpu_mandatory(cpu)
+        
+        # --- PHASE 2: BUDGET ALLOCATION ---
+        cash_left = remaining
+        mobo_alloc = 0.20
+        ram_alloc = 0.10
+        ssd_alloc = 0.10
+        
+        should_buy_gpu = include_gpu or gpu_required
+        if should_buy_gpu and cash_left < 45000:
+             mobo_alloc = 0.25 
+             ram_alloc = 0.10
+             ssd_alloc = 0.10
+        
+        if fixed_cpu:
+            mobo_budget = cash_left * mobo_alloc
+            ram_budget = cash_left * ram_alloc
+            ssd_budget = cash_left * ssd_alloc
+        else:
+            mobo_budget = budget * 0.20
+            ram_budget = budget * 0.10
+            ssd_budget = budget * 0.10
+        phases.mark('allocation')
+
+        # --- MOTHERBOARD & RAM ---
+        mobo = None
+        if cpu_type: mobo = get_best_item(catalog, "motherboards", mobo_budget, cpu_type)
+        if not mobo: mobo = get_best_item(catalog, "motherboards", mobo_budget) or get_cheapest_item(catalog, "motherboards")
+            
+        if mobo:
+            remaining -= mobo['price']
+            parts['Motherboard'] = mobo
+            ram_type = get_ram_type(mobo)
+            
+            ram = get_best_item(catalog, "rams", ram_budget, ram_type) or get_best_item(catalog, "rams", ram_budget, "DDR4") or get_cheapest_item(catalog, "rams")
+            if ram: remaining -= ram['price']; parts['RAM'] = ram
+        phases.mark('mobo_ram')
+    
+    # --- PHASE 3: STORAGE & CASING ---
+    ssd = get_best_item(catalog, "ssds", ssd_budget) or get_cheapest_item(catalog, "ssds")
+    if ssd: remaining -= ssd['price']; parts['Storage'] = ssd
+    
+    casing = get_best_item(catalog, "casings", 5000) or get_cheapest_item(catalog, "casings")
+    if casing: remaining -= casing['price']; parts['Casing'] = casing
+    phases.mark('storage_casing')
+
+    # --- PHASE 4: GPU & PSU ---
+    advice_msg = None 
+
+    if should_buy_gpu:
+        if budget < 60000: psu_reserve = 3500 
+        elif budget < 100000: psu_reserve = 5000 
+        else: psu_reserve = budget * 0.10
+
+        gpu = None
+        gpu_budget = remaining - psu_reserve 
+        
+        if gpu_budget > 5000:
+            gpu = get_best_item(catalog, "gpus", gpu_budget)
+            if gpu: 
+                remaining -= gpu['price']
+                parts['Graphics Card'] = gpu
+        else:
+            if gpu_required:
+                needed = 15000 - gpu_budget 
+                advice_msg = f"❌ **Budget Crisis:** Cannot afford a dedicated GPU for this CPU! **Please add ~{int(needed)} BDT** to your budget."
+            else:
+                advice_msg = "💡 **Advisor:** Budget is too tight for a decent GPU. We skipped it. Use the CPU's Integrated Graphics and save up!"
+
+    breakdown_data = calculate_power_breakdown(parts) 
+    estimated_watts = breakdown_data['Total']
+    recommended_psu_watts = estimated_watts + PSU_HEADROOM
+    
+    psu = get_best_item(catalog, "psus", remaining, min_watts=recommended_psu_watts)
+    if not psu: psu = get_cheapest_item(catalog, "psus", min_watts=recommended_psu_watts)
+    if not psu: psu = get_best_item(catalog, "psus", remaining) 
+    if psu: remaining -= psu['price']; parts['Power Supply'] = psu
+    phases.mark('gpu_psu')
+
+    # --- PHASE 5: SWEEPER ---
+    if should_buy_gpu:
+        upgrade_order = [('Graphics Card', 'gpus', None), ('RAM', 'rams', ram_type), ('Storage', 'ssds', None)]
+        if not fixed_cpu:
+            upgrade_order.insert(1, ('CPU', 'processors', None)) 
+            
+        for part_name, table, constraint in upgrade_order:
+            if part_name in parts and remaining > 1000:
+                current_item = parts[part_name]
+                current_price = current_item['price']
+                potential_budget = current_price + remaining
+                better_item = get_best_item(catalog, table, potential_budget, constraint)
+                if better_item and better_item['price'] > current_price:
+                    cost_diff = better_item['price'] - current_price
+                    parts[part_name] = better_item
+                    remaining -= cost_diff
+    phases.mark('sweeper')
+    
+    # --- PHASE 6: BOTTLENECK CHECK ---
+    if 'Graphics Card' in parts and 'CPU' in parts:
+        if not advice_msg:
+             advice_msg = check_bottleneck(parts['CPU'], parts['Graphics Card'])
+
+    final_breakdown = calculate_power_breakdown(parts)
+    phases.mark('bottleneck')
+    return parts, sum(p['price'] for p in parts.values()), remaining, final_breakdown, gpu_required, advice_msg
+
+# --- MASTER BUILD LOGIC ---
+def generate_pc_build(budget, include_gpu=True, fixed_cpu=None, mode='optimal', catalog=None):
+    """Returns (parts, total, remaining, power_breakdown, gpu_required, advice)."""
+    if mode not in BUILD_MODES: raise ValueError(f"Unknown build mode: {mode}")
+    catalog = catalog or get_catalog()
+    with timer(f'build.{mode}'):
+        greedy = greedy_build(catalog, budget, include_gpu, fixed_cpu)
+        if mode == 'greedy': return greedy
+        return solve_build(catalog, budget, include_gpu, fixed_cpu, rank='performance' if mode == 'performance' else 'price', greedy=greedy)
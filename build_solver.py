@@ -0,0 +1,452 @@
+import heapq
+import math
+import threading
+import time
+import weakref
+from bisect import bisect_right
+
+from metrics import count, observe
+from part_rules import (PSU_HEADROOM, calculate_power_breakdown, check_bottleneck, compatibility_issues, get_cpu_type,
+                        get_cpu_watts, get_gpu_watts, get_perf_score, get_ram_type, get_wattage, is_gpu_mandatory,
+                        part_attr)
+
+# --- CONFIGURATION ---
+# A build's utility is sum(weight * log(price)) over its parts. Under a fixed budget that
+# splits spending in proportion to the weights (what the greedy fractions aim for), and
+# branch-and-bound then fills the leftover with the best combination of upgrades.
+WEIGHTS_WITH_GPU = {'CPU': 0.22, 'Motherboard': 0.15, 'RAM': 0.09, 'Storage': 0.09, 'Casing': 0.04,
+                    'Graphics Card': 0.33, 'Power Supply': 0.08}
+WEIGHTS_NO_GPU = {'CPU': 0.33, 'Motherboard': 0.22, 'RAM': 0.14, 'Storage': 0.14, 'Casing': 0.06,
+                  'Power Supply': 0.11}
+SLOT_TABLES = {'CPU': 'processors', 'Motherboard': 'motherboards', 'RAM': 'rams', 'Storage': 'ssds',
+               'Casing': 'casings', 'Graphics Card': 'gpus', 'Power Supply': 'psus'}
+# Coupled parts first, so their choices narrow the later slots.
+SEARCH_ORDER = ['CPU', 'Graphics Card', 'Motherboard', 'RAM', 'Power Supply', 'Storage', 'Casing']
+# Display order, as the greedy builder produces it.
+PART_ORDER = ['CPU', 'Motherboard', 'RAM', 'Storage', 'Casing', 'Graphics Card', 'Power Supply']
+DEFAULT_TIME_BUDGET_MS = 50
+# rank='performance' scores these slots by weight * log(benchmark score) instead of price.
+PERF_SLOTS = {'CPU': 'processors', 'Graphics Card': 'gpus'}
+# A swap leaves these slots to re-solve: the ones whose compatibility or sizing is tied to it,
+# both ways (a new board may need another CPU, new RAM another board).
+DEPENDENT_SLOTS = {'CPU': ('Motherboard', 'Power Supply'), 'Motherboard': ('RAM', 'CPU'), 'RAM': ('Motherboard',),
+                   'Graphics Card': ('Power Supply',)}
+# Branches that cannot beat the incumbent by more than this are pruned. 1e-4 of utility is
+# roughly a 0.05% price difference on one part, and it keeps near-ties from exploding the search.
+UTILITY_TOLERANCE = 1e-4
+
+# --- CANDIDATE LISTS ---
+class Candidates:
+    """One slot's items, price ascending, keeping a single item per (price, compatibility class).
+
+    With `value`, utility follows value(item) instead of price, and an item that is no
+    better than a cheaper one of its class is dropped. Utility is then no longer monotone
+    in price across classes (`monotone` is False) and the search scans the whole list.
+    `groups` holds the indexes of each class, since each narrows the later slots its own way.
+    """
+
+    def __init__(self, items, weight, key=None, keep_max=None, value=None):
+        keep_max = keep_max or value
+        best = {}
+        for item in items:
+            k = (item['price'], key(item) if key else None)
+            if k not in best: best[k] = item
+            elif keep_max and keep_max(item) > keep_max(best[k]): best[k] = item
+        items = sorted(best.values(), key=lambda r: (r['price'], r['id']))
+        if value:
+            frontier, top = [], {}
+            for item in items:
+                k = key(item) if key else None
+                if value(item) > top.get(k, 0):
+                    frontier.append(item)
+                    top[k] = value(item)
+            items = frontier
+        self.items = items
+        groups = {}
+        for i, item in enumerate(items): groups.setdefault(key(item) if key else None, []).append(i)
+        self.groups = list(groups.values())
+        self.prices = [r['price'] for r in self.items]
+        self.utils = [weight * math.log(value(r) if value else r['price']) for r in self.items]
+        self.monotone = value is None
+        self._hull = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def best_util(self, cap):
+        idx = bisect_right(self.prices, cap) - 1
+        return self.utils[idx] if idx >= 0 else None
+
+    def min_price(self):
+        return self.prices[0] if self.prices else None
+
+    def hull_segments(self):
+        """Upgrade steps along the upper concave hull of (price, utility): (slope, cost, gain),
+        steepest first. Worked out once per list, since every bound over it reuses them."""
+        if self._hull is None:
+            hull = []
+            for p, u in zip(self.prices, self.utils):
+                if hull and u <= hull[-1][1]: continue
+                while len(hull) >= 2:
+                    (p1, u1), (p2, u2) = hull[-2], hull[-1]
+                    if (u2 - u1) * (p - p1) <= (u - u1) * (p2 - p1): hull.pop()
+                    else: break
+                hull.append((p, u))
+            self._hull = [((u2 - u1) / (p2 - p1), p2 - p1, u2 - u1) for (p1, u1), (p2, u2) in zip(hull, hull[1:])]
+        return self._hull
+
+class LPBound:
+    """LP relaxation of the multiple-choice knapsack over a fixed set of slots.
+
+    Every slot starts at its cheapest item; hull upgrades are then bought in order of
+    utility per taka, the last one fractionally. That is an upper bound for any integer pick.
+    """
+
+    def __init__(self, lists):
+        self.base_cost = sum(c.prices[0] for c in lists)
+        self.base_util = sum(c.utils[0] for c in lists)
+        segments = list(heapq.merge(*(c.hull_segments() for c in lists), reverse=True))
+        self.slopes = [seg[0] for seg in segments]
+        self.cum_cost = [0]
+        self.cum_util = [0.0]
+        for _, cost, gain in segments:
+            self.cum_cost.append(self.cum_cost[-1] + cost)
+            self.cum_util.append(self.cum_util[-1] + gain)
+
+    def __call__(self, remaining):
+        spare = remaining - self.base_cost
+        if spare < 0: return None
+        k = bisect_right(self.cum_cost, spare) - 1
+        util = self.base_util + self.cum_util[k]
+        if k < len(self.slopes): util += (spare - self.cum_cost[k]) * self.slopes[k]
+        return util
+
+def _cpu_class(row):
+    return get_cpu_type(row), get_cpu_watts(row), is_gpu_mandatory(row)
+
+class CandidateState:
+    """Pruned candidate lists for one catalog and GPU mode, built on first use and then reused.
+
+    Variants narrow a slot: CPU by (board vendor, integrated graphics required), Motherboard
+    by (CPU vendor, RAM generation), RAM by generation, Power Supply by minimum wattage.
+    None means the whole table.
+    """
+
+    def __init__(self, catalog, include_gpu, rank='price'):
+        self.catalog = catalog
+        self.rank = rank
+        self.weights = WEIGHTS_WITH_GPU if include_gpu else WEIGHTS_NO_GPU
+        self._cache = {}
+        self._bounds = {}
+
+    def lp_bound(self, lists):
+        key = tuple(c for c in lists if len(c) > 1)
+        if key not in self._bounds: self._bounds[key] = LPBound(key)
+        singles = [c for c in lists if len(c) == 1]
+        return self._bounds[key], sum(c.prices[0] for c in singles), sum(c.utils[0] for c in singles)
+
+    def get(self, slot, variant=None):
+        key = (slot, variant)
+        if key not in self._cache: self._cache[key] = self._build(slot, variant)
+        return self._cache[key]
+
+    def value(self, slot):
+        if self.rank != 'performance' or slot not in PERF_SLOTS: return None
+        table = PERF_SLOTS[slot]
+        return lambda item: get_perf_score(item, table)
+
+    def pinned(self, slot, item):
+        return Candidates([item], self.weights.get(slot, 0.0), value=self.value(slot))
+
+    def _build(self, slot, variant):
+        catalog = self.catalog
+        table = SLOT_TABLES[slot]
+        weight = self.weights.get(slot, 0.0)
+        items = catalog.table(table).items
+        if slot == 'CPU':
+            vendor, igpu = variant or (None, False)
+            if vendor: items = [r for r in items if get_cpu_type(r) in (vendor, None)]
+            if igpu: items = [r for r in items if not is_gpu_mandatory(r)]
+            return Candidates(items, weight, key=_cpu_class, value=self.value(slot))
+        # Only what compatibility_issues() accepts, rows with the spec unknown included. A
+        # variant nothing fits gets an empty list, so the search prunes that branch rather
+        # than pick a part that does not fit.
+        if slot == 'Motherboard':
+            vendor, ram_gen = variant or (None, None)
+            if vendor: items = [*catalog.attribute(table, 'vendor', vendor).items, *catalog.attribute(table, 'vendor', None).items]
+            if ram_gen: items = [r for r in items if get_ram_type(r) == ram_gen]
+            return Candidates(items, weight, key=get_ram_type)
+        if slot == 'RAM':
+            if variant: items = [*catalog.attribute(table, 'ram_gen', variant).items, *catalog.attribute(table, 'ram_gen', None).items]
+            return Candidates(items, weight)
+        if slot == 'Graphics Card':
+            return Candidates(items, weight, key=get_gpu_watts, value=self.value(slot))
+        if slot == 'Power Supply':
+            # The whole-table list already keeps the strongest unit at each price, so a floor
+            # only has to filter it.
+            if variant: items = [r for r in self.get(slot).items if get_wattage(r) >= variant]
+            return Candidates(items, weight, keep_max=get_wattage)
+        return Candidates(items, weight)
+
+_states = weakref.WeakKeyDictionary()
+_states_lock = threading.Lock()
+
+def get_state(catalog, include_gpu, rank='price'):
+    """Candidate state shared by every solve against the same catalog snapshot."""
+    with _states_lock:
+        per_catalog = _states.setdefault(catalog, {})
+        key = (include_gpu, rank)
+        if key not in per_catalog: per_catalog[key] = CandidateState(catalog, include_gpu, rank)
+        return per_catalog[key]
+
+# --- BRANCH AND BOUND ---
+def best_first(keys, score):
+    """(score(j), keys[j]) highest first, stopping at -inf, when score is unimodal in j
+    (and -inf outside the range). Finds the peak by bisection, then walks outwards, always
+    taking the higher side.
+    """
+    lo, hi = 0, len(keys) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if score(mid) < score(mid + 1): lo = mid + 1
+        else: hi = mid
+    left, right = lo - 1, lo + 1
+    j, best = lo, score(lo)
+    left_score, right_score = score(left), score(right)
+    while best > -math.inf:
+        yield best, keys[j]
+        if left_score >= right_score:
+            j, best = left, left_score
+            left -= 1
+            left_score = score(left)
+        else:
+            j, best = right, right_score
+            right += 1
+            right_score = score(right)
+
+class SolveResult:
+    def __init__(self):
+        self.parts = None
+        self.utility = -math.inf
+        self.nodes = 0
+        self.timed_out = False
+        self.elapsed_ms = 0.0
+
+def psu_floor(cpu, gpu):
+    parts = {'CPU': cpu, 'Storage': True}
+    if gpu: parts['Graphics Card'] = gpu
+    return calculate_power_breakdown(parts)['Total'] + PSU_HEADROOM
+
+def solve(catalog, budget, include_gpu=True, fixed_cpu=None, igpu_only=False, pinned=None, state=None,
+          time_budget_ms=DEFAULT_TIME_BUDGET_MS, rank='price', seed=None):
+    """Best compatible build within budget; `pinned` maps slot -> item that must stay.
+
+    Stops at the time budget and returns the best build found so far (result.timed_out).
+    `seed`, a finished build such as the greedy one, starts as that best build when it
+    meets every constraint of this solve, so the result is never worse than it.
+    """
+    state = state or get_state(catalog, include_gpu, rank)
+    pinned = dict(pinned or {})
+    if fixed_cpu: pinned['CPU'] = fixed_cpu
+    slots = [s for s in SEARCH_ORDER if s != 'Graphics Card' or include_gpu]
+    result = SolveResult()
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000.0
+
+    fixed = {s: state.pinned(s, item) for s, item in pinned.items() if s in slots}
+    # Pinned parts narrow the slots searched before them: the CPU to a pinned board's vendor,
+    # the board to pinned RAM's generation.
+    board_vendor = part_attr(pinned['Motherboard'], 'vendor', 'Motherboard') if 'Motherboard' in pinned else None
+    ram_gen = part_attr(pinned['RAM'], 'ram_gen', 'RAM') if 'RAM' in pinned else None
+    if 'CPU' not in fixed and (igpu_only or board_vendor): fixed['CPU'] = state.get('CPU', (board_vendor, igpu_only))
+    # A pinned PSU caps the CPU and GPU instead: past its wattage the PSU slot has no candidates.
+    psu_cap = get_wattage(pinned['Power Supply']) if 'Power Supply' in fixed else None
+    nothing = Candidates([], 0.0)
+
+    def candidates(slot, chosen):
+        """The slot's list as far as the parts chosen so far narrow it; exact once they all are."""
+        if slot == 'Power Supply' and psu_cap is not None and 'CPU' in chosen \
+                and psu_floor(chosen['CPU'], chosen.get('Graphics Card')) > psu_cap:
+            return nothing
+        if slot in fixed: return fixed[slot]
+        if slot == 'Motherboard' and ('CPU' in chosen or ram_gen):
+            return state.get(slot, (get_cpu_type(chosen['CPU']) if 'CPU' in chosen else None, ram_gen))
+        if slot == 'RAM' and 'Motherboard' in chosen: return state.get(slot, get_ram_type(chosen['Motherboard']))
+        # Before the GPU is chosen the floor leaves it out, which only lowers it.
+        if slot == 'Power Supply' and 'CPU' in chosen: return state.get(slot, psu_floor(chosen['CPU'], chosen.get('Graphics Card')))
+        return state.get(slot)
+
+    if any(not candidates(s, {}).prices for s in slots) or compatibility_issues(pinned): return result
+    if seed and set(seed) == set(slots) and all(seed[s]['id'] == item['id'] for s, item in pinned.items()) \
+            and not (igpu_only and is_gpu_mandatory(seed['CPU'])) \
+            and sum(p['price'] for p in seed.values()) <= budget and not compatibility_issues(seed):
+        result.parts, result.utility = dict(seed), build_utility(seed, include_gpu, rank)
+
+    def suffix_bound(depth, chosen):
+        """(bound(remaining), min cost) of slots[depth:] given the parts chosen so far."""
+        lists = [candidates(s, chosen) for s in slots[depth:]]
+        if not all(c.prices for c in lists): return (lambda remaining: None), math.inf
+        lp, single_cost, single_util = state.lp_bound(lists)
+        def bound(remaining):
+            util = lp(remaining - single_cost)
+            return None if util is None else util + single_util
+        return bound, lp.base_cost + single_cost
+
+    chosen = {}
+
+    def search(depth, remaining, utility):
+        result.nodes += 1
+        if result.nodes & 255 == 0 and time.perf_counter() > deadline: result.timed_out = True
+        if result.timed_out: return
+        if depth == len(slots):
+            if utility > result.utility and not (pinned and compatibility_issues(chosen)):
+                result.utility = utility
+                result.parts = dict(chosen)
+            return
+        slot = slots[depth]
+        cands = candidates(slot, chosen)
+        top = bisect_right(cands.prices, remaining - suffix_bound(depth + 1, chosen)[1]) - 1
+        if top < 0: return
+
+        # The later slots are bounded with the lists this class leaves them (a CPU's vendor
+        # and wattage, a GPU's wattage, a board's RAM generation), so each class gets its own
+        # bound. Items lie on the concave curve weight*log(price) and the LP value of the
+        # remaining slots is concave in what is left, so within a class the score is unimodal
+        # in price and best_first() yields it best-bound first; merging the classes keeps that
+        # order, and the first candidate that cannot beat the incumbent ends this node.
+        walks = []
+        for group in cands.groups:
+            group = group[:bisect_right(group, top)]
+            if not group: continue
+            bound = suffix_bound(depth + 1, {**chosen, slot: cands.items[group[0]]})[0]
+
+            def score(j, group=group, bound=bound):
+                if j < 0 or j >= len(group): return -math.inf
+                rest = bound(remaining - cands.prices[group[j]])
+                return -math.inf if rest is None else cands.utils[group[j]] + rest
+
+            if cands.monotone: walks.append(best_first(group, score))
+            else: walks.append(sorted(((score(j), group[j]) for j in range(len(group))), reverse=True))
+
+        for best, idx in heapq.merge(*walks, reverse=True):
+            if utility + best <= result.utility + UTILITY_TOLERANCE: break
+            chosen[slot] = cands.items[idx]
+            search(depth + 1, remaining - cands.prices[idx], utility + cands.utils[idx])
+            del chosen[slot]
+            if result.timed_out: return
+
+    search(0, budget, 0.0)
+    result.elapsed_ms = (time.perf_counter() - started) * 1000
+    observe('solver.solve', result.elapsed_ms / 1000)
+    count('solver.nodes', result.nodes)
+    if result.timed_out: count('solver.timeouts')
+    return result
+
+def build_utility(parts, include_gpu=True, rank='price'):
+    """The solver's objective for a finished build, to compare builds of one request.
+
+    Weights follow what was asked for, so a build that had to skip (or add) a GPU scores lower.
+    """
+    weights = WEIGHTS_WITH_GPU if include_gpu else WEIGHTS_NO_GPU
+    utility = 0.0
+    for slot, item in parts.items():
+        value = get_perf_score(item, PERF_SLOTS[slot]) if rank == 'performance' and slot in PERF_SLOTS else item['price']
+        utility += weights.get(slot, 0.0) * math.log(max(value, 1))
+    return utility
+
+# --- BUILD ENTRY POINT ---
+def solve_build(catalog, budget, include_gpu=True, fixed_cpu=None, time_budget_ms=DEFAULT_TIME_BUDGET_MS, rank='price', greedy=None):
+    """Optimal counterpart of the greedy builder, with the same return shape.
+
+    `greedy`, the greedy builder's result for the same request, seeds every solve; if the
+    time budget runs out before any build is found it is returned as it is.
+    """
+    advice_msg = None
+    seed = greedy[0] if greedy else None
+    with_gpu = include_gpu or (fixed_cpu is not None and is_gpu_mandatory(fixed_cpu))
+    if with_gpu:
+        result = solve(catalog, budget, True, fixed_cpu, time_budget_ms=time_budget_ms, rank=rank, seed=seed)
+    else:
+        # No GPU asked for: stay on CPUs with integrated graphics when the budget allows.
+        result = solve(catalog, budget, False, fixed_cpu, igpu_only=True, time_budget_ms=time_budget_ms, rank=rank, seed=seed)
+        if result.parts is None and not fixed_cpu:
+            with_gpu = True
+            result = solve(catalog, budget, True, time_budget_ms=time_budget_ms, rank=rank, seed=seed)
+
+    if result.parts is None and result.timed_out:
+        # Out of time, which says nothing about the budget: no "skip the GPU" advice.
+        count('solver.fallback')
+        return greedy or (None, 0, 0, 0, False, None)
+    if result.parts is None and with_gpu:
+        result = solve(catalog, budget, False, fixed_cpu, time_budget_ms=time_budget_ms, rank=rank, seed=seed)
+        if result.parts is not None:
+            leftover = budget - sum(p['price'] for p in result.parts.values())
+            if is_gpu_mandatory(result.parts['CPU']):
+                cheapest_gpu = catalog.cheapest('gpus')
+                needed = (cheapest_gpu['price'] if cheapest_gpu else 15000) - leftover
+                advice_msg = f"❌ **Budget Crisis:** Cannot afford a dedicated GPU for this CPU! **Please add ~{int(needed)} BDT** to your budget."
+            else:
+                advice_msg = "💡 **Advisor:** Budget is too tight for a decent GPU. We skipped it. Use the CPU's Integrated Graphics and save up!"
+    if result.parts is None: return None, 0, 0, 0, False, None
+
+    parts = {slot: result.parts[slot] for slot in PART_ORDER if slot in result.parts}
+    if 'Graphics Card' in parts and not advice_msg:
+        advice_msg = check_bottleneck(parts['CPU'], parts['Graphics Card'])
+    total = sum(p['price'] for p in parts.values())
+    gpu_required = is_gpu_mandatory(parts['CPU'])
+    return parts, total, budget - total, calculate_power_breakdown(parts), gpu_required, advice_msg
+
+# --- INCREMENTAL RE-SOLVE ---
+def affected_slots(swapped):
+    """Slots tied to the swapped ones, transitively (a CPU swap reaches RAM via the motherboard)."""
+    todo, affected = list(swapped), set()
+    while todo:
+        for slot in DEPENDENT_SLOTS.get(todo.pop(), ()):
+            if slot not in affected:
+                affected.add(slot)
+                todo.append(slot)
+    return affected
+
+def rebalance_build(catalog, budget, parts, pinned_slots, swapped, time_budget_ms=DEFAULT_TIME_BUDGET_MS, rank='price'):
+    """Re-solve after manual swaps without undoing them; generate_pc_build's return shape.
+
+    `pinned_slots` (every part the user chose) stay as they are, and only the slots tied to
+    `swapped` are re-optimized with the rest held in place. A build that still fits together
+    and within budget is kept unless that re-solve beats it, so money freed by a cheaper pick
+    goes to those slots. One that does not, and cannot be fixed that way, has every slot the
+    user has not pinned re-solved. All of it runs on the catalog's shared candidate state.
+    parts is None when the pinned parts leave no room for a complete, compatible build; the
+    advice then names the conflict between them, if there is one.
+    """
+    count('solver.rebalance')
+    include_gpu = 'Graphics Card' in parts
+    state = get_state(catalog, include_gpu, rank)
+    pinned = {slot: parts[slot] for slot in pinned_slots if slot in parts}
+    free = affected_slots(swapped) - set(pinned)
+    held = {slot: item for slot, item in parts.items() if slot not in free}
+
+    def resolve(hold):
+        result = solve(catalog, budget, include_gpu, pinned=hold, state=state, time_budget_ms=time_budget_ms, rank=rank)
+        return None if result.parts is None or compatibility_issues(result.parts) else result.parts
+
+    if sum(p['price'] for p in parts.values()) <= budget and not compatibility_issues(parts):
+        result_parts = parts
+        if free:
+            better = resolve(held)
+            if better is not None and build_utility(better, include_gpu, rank) > build_utility(parts, include_gpu, rank) + UTILITY_TOLERANCE:
+                count('solver.rebalance.upgraded')
+                result_parts = better
+    else:
+        result_parts = resolve(held)
+        if result_parts is None and len(held) > len(pinned):
+            count('solver.rebalance.widened')
+            result_parts = resolve(pinned)
+        if result_parts is None:
+            conflicts = compatibility_issues(pinned)
+            return None, 0, 0, 0, False, conflicts[0] if conflicts else None
+
+    parts = {slot: result_parts[slot] for slot in PART_ORDER if slot in result_parts}
+    issues = compatibility_issues(parts)
+    advice_msg = issues[0] if issues else check_bottleneck(parts['CPU'], parts.get('Graphics Card'))
+    total = sum(p['price'] for p in parts.values())
+    return parts, total, budget - total, calculate_power_breakdown(parts), is_gpu_mandatory(parts['CPU']), advice_msg
@@ -0,0 +1,292 @@
+import os
+import sqlite3
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import repeat
+
+from metrics import sql_connect, sql_fetch, timer
+from perf_model import PERF_COLUMNS, PERF_TABLES, PerfIndex, score_products
+from spec_rules import ATTRIBUTE_COLUMNS, TABLE_CATEGORIES, classify
+
+# --- CONFIGURATION ---
+DATABASE_NAME = 'tech_data.db'
+TABLES = ['processors', 'motherboards', 'rams', 'ssds', 'gpus', 'psus', 'casings']
+
+# --- COMPACT PART RECORD ---
+PART_FIELDS = ('id', 'name', 'price', 'spec_tag', 'url', 'active', *ATTRIBUTE_COLUMNS, *PERF_COLUMNS,
+               'store', 'product_key', 'best_price', 'offers', 'image_url', 'thumb')
+_FIELD_SET = frozenset(PART_FIELDS)
+# Text columns with few distinct values (and names, which repeat across stores): one string object each.
+_INTERNED = ('name', 'spec_tag', 'vendor', 'socket', 'ram_gen', 'storage_if', 'store')
+
+class Part:
+    """One catalog row in __slots__ instead of a dict, shared by every build and session that shows it.
+
+    Reads like the dict row it replaces (`part['price']`, `part.get('store')`, `dict(part)`);
+    columns a database lacks read as None. Parts are never modified once loaded.
+    """
+    __slots__ = PART_FIELDS + ('extra', '_label', '_short_label')
+
+    def __init__(self, row):
+        for field in PART_FIELDS: setattr(self, field, row.get(field))
+        for field in _INTERNED:
+            value = getattr(self, field)
+            if type(value) is str: setattr(self, field, sys.intern(value))
+        extra = {key: value for key, value in row.items() if key not in _FIELD_SET}
+        self.extra = extra or None
+        self._label = self._short_label = None
+
+    @classmethod
+    def from_columns(cls, columns, count):
+        """`count` Parts from {field: values}, filled one column at a time (a snapshot's layout)."""
+        parts = [cls.__new__(cls) for _ in range(count)]
+        for field in cls.__slots__:
+            values = columns.get(field) if field in _FIELD_SET else None
+            if values is None: values = repeat(None, count)
+            elif field in _INTERNED: values = [sys.intern(v) if type(v) is str else v for v in values]
+            deque(map(getattr(cls, field).__set__, parts, values), maxlen=0)
+        extra = [(key, values) for key, values in columns.items() if key not in _FIELD_SET]
+        if extra:
+            for i, part in enumerate(parts): part.extra = {key: values[i] for key, values in extra}
+        return parts
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET: return getattr(self, key)
+        if self.extra and key in self.extra: return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in _FIELD_SET or bool(self.extra) and key in self.extra
+
+    def keys(self):
+        return PART_FIELDS + tuple(self.extra or ())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __repr__(self):
+        return f"Part({self.id}, {self.name!r}, {self.price})"
+
+    # Built once per part, not once per rerun of every session that lists it.
+    @property
+    def label(self):
+        if self._label is None: self._label = f"{self.name} ({self.price} ৳)"
+        return self._label
+
+    @property
+    def short_label(self):
+        if self._short_label is None: self._short_label = f"{self.name[:40]}... ({self.price} ৳)"
+        return self._short_label
+
+# --- PRICE-SORTED LIST ---
+class PriceList:
+    """Rows of one table (or one spec_tag slice of it) sorted by price ascending."""
+
+    def __init__(self, rows, watts=False):
+        self.items = sorted(rows, key=lambda r: (r['price'], r['id']))
+        self.prices = [r['price'] for r in self.items]
+        self.watts = [r.get('psu_watts') or 0 for r in self.items] if watts else None
+
+    @classmethod
+    def from_sorted(cls, items, prices, watts=None):
+        """Items already in (price, id) order; prices and watts may be any sequence, e.g. a memoryview."""
+        self = cls.__new__(cls)
+        self.items, self.prices, self.watts = items, prices, watts
+        return self
+
+    def __len__(self):
+        return len(self.items)
+
+    def best(self, max_price, min_watts=0):
+        """Most expensive item priced at or under max_price."""
+        idx = bisect_right(self.prices, max_price) - 1
+        if min_watts > 0 and self.watts is not None:
+            while idx >= 0 and self.watts[idx] < min_watts: idx -= 1
+        return self.items[idx] if idx >= 0 else None
+
+    def cheapest(self, min_watts=0):
+        if min_watts > 0 and self.watts is not None:
+            for idx, watts in enumerate(self.watts):
+                if watts >= min_watts: return self.items[idx]
+            return None
+        return self.items[0] if self.items else None
+
+    def between(self, min_price, max_price):
+        """Items with min_price <= price <= max_price, most expensive first."""
+        lo = bisect_left(self.prices, min_price)
+        hi = bisect_right(self.prices, max_price)
+        return self.items[lo:hi][::-1]
+
+def _fill_attributes(table, rows):
+    # Databases written before the spec columns existed: classify in memory once.
+    category = TABLE_CATEGORIES.get(table)
+    for row in rows:
+        if all(column in row for column in ATTRIBUTE_COLUMNS): continue
+        for column, value in classify(row['name'], category).items(): row.setdefault(column, value)
+
+def _fill_performance(table, rows):
+    # Rows the scraper has not scored yet (older databases): one vectorized pass in memory.
+    if table not in PERF_TABLES: return
+    missing = [row for row in rows if row.get('perf_score') is None]
+    if not missing: return
+    scores, tiers, power = score_products(table, [row['name'] for row in missing], [row['price'] for row in missing])
+    for row, score, tier, watts in zip(missing, scores.tolist(), tiers.tolist(), power.tolist()):
+        row.update(perf_score=score, perf_tier=tier, power_draw=watts)
+
+# --- CATALOG SNAPSHOT ---
+class Catalog:
+    """Immutable in-memory copy of every product table, loaded in one pass; rows are shared Parts."""
+
+    def __init__(self, tables, version=None):
+        self.version = version
+        self.source = None          # ('db', path) or ('snapshot', path): where worker processes reload it from
+        self._tables = {}
+        self._by_tag = {}
+        self._constraint_cache = {}
+        self._attribute_cache = {}
+        self._perf = {}
+        self._by_name = {}
+        self._by_id = {}
+        self._arrays = {}
+        for table, rows in tables.items():
+            rows = [r for r in rows if r['price'] > 0]
+            _fill_attributes(table, rows)
+            _fill_performance(table, rows)
+            self._add_table(table, PriceList([Part(row) for row in rows], watts=(table == 'psus')))
+
+    def _add_table(self, table, price_list):
+        rows = price_list.items
+        with_watts = table == 'psus'
+        self._tables[table] = price_list
+        tags = {}
+        for row in rows: tags.setdefault(row.spec_tag or '', []).append(row)
+        self._by_tag[table] = {}
+        for tag, tag_rows in tags.items():   # slices of a sorted list are already sorted
+            watts = [r.psu_watts or 0 for r in tag_rows] if with_watts else None
+            self._by_tag[table][tag] = PriceList.from_sorted(tag_rows, [r.price for r in tag_rows], watts)
+        self._by_name[table] = {}
+        for row in rows: self._by_name[table].setdefault(row.name, row)
+        self._by_id[table] = {row.id: row for row in rows}
+
+    @classmethod
+    def load(cls, db_path=DATABASE_NAME, version=None):
+        with timer('catalog.load'):
+            conn = sql_connect(db_path)
+            conn.row_factory = sqlite3.Row
+            try:
+                existing = {r[0] for r in sql_fetch(conn, "SELECT name FROM sqlite_master WHERE type = 'table'")}
+                tables = {}
+                for table in TABLES:
+                    if table not in existing: tables[table] = []; continue
+                    columns = {row[1] for row in sql_fetch(conn, f"PRAGMA table_info({table})")}
+                    where = " WHERE active = 1" if 'active' in columns else ""
+                    tables[table] = [dict(row) for row in sql_fetch(conn, f"SELECT * FROM {table}{where}")]
+            finally:
+                conn.close()
+            catalog = cls(tables, version=version)
+            catalog.source = ('db', db_path)
+            return catalog
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Catalog over a mapped snapshot (see snapshot.py): rows are decoded once into Parts, while
+        the price, wattage and score columns stay views into the shared mapping."""
+        catalog = cls({}, version=snapshot.version)
+        catalog.source = ('snapshot', snapshot.path)
+        for table in TABLES:
+            prices = snapshot.column(table, 'price')
+            if prices is None: continue
+            watts = (snapshot.column(table, 'psu_watts') or [0] * len(prices)) if table == 'psus' else None
+            catalog._add_table(table, PriceList.from_sorted(snapshot.parts(table), prices, watts))
+            catalog._arrays[table] = {'price': prices, 'perf_score': snapshot.column(table, 'perf_score')}
+        return catalog
+
+    def table(self, table, spec_constraint=None):
+        """PriceList for a table, optionally narrowed like `spec_tag LIKE '%constraint%'`."""
+        if not spec_constraint: return self._tables.get(table) or PriceList([])
+        key = (table, spec_constraint.lower())
+        cached = self._constraint_cache.get(key)
+        if cached is None:
+            needle = spec_constraint.lower()
+            slices = [pl for tag, pl in self._by_tag.get(table, {}).items() if needle in tag.lower()]
+            if len(slices) == 1: cached = slices[0]
+            else: cached = PriceList([r for pl in slices for r in pl.items], watts=(table == 'psus'))
+            self._constraint_cache[key] = cached
+        return cached
+
+    def attribute(self, table, column, value):
+        """PriceList of the rows whose materialized spec column equals value."""
+        key = (table, column, value)
+        cached = self._attribute_cache.get(key)
+        if cached is None:
+            rows = [r for r in self.table(table).items if r.get(column) == value]
+            cached = self._attribute_cache[key] = PriceList(rows, watts=(table == 'psus'))
+        return cached
+
+    def perf(self, table):
+        """PerfIndex (score and performance-per-taka arrays) over a table's price-sorted rows."""
+        cached = self._perf.get(table)
+        if cached is None:
+            arrays = self._arrays.get(table, {})
+            cached = self._perf[table] = PerfIndex(self.table(table).items, arrays.get('price'), arrays.get('perf_score'))
+        return cached
+
+    def best(self, table, max_price, spec_constraint=None, min_watts=0):
+        return self.table(table, spec_constraint).best(max_price, min_watts)
+
+    def cheapest(self, table, spec_constraint=None, min_watts=0):
+        return self.table(table, spec_constraint).cheapest(min_watts)
+
+    def between(self, table, min_price, max_price, name_search=None, limit=None):
+        """Rows with min_price <= price <= max_price, most expensive first."""
+        rows = self.table(table).between(min_price, max_price)
+        if name_search:
+            needle = name_search.lower()
+            rows = [row for row in rows if needle in row['name'].lower()]
+        return rows if limit is None else rows[:limit]
+
+    def by_name(self, table, name):
+        return self._by_name.get(table, {}).get(name)
+
+    def by_id(self, table, row_id):
+        return self._by_id.get(table, {}).get(row_id)
+
+# --- PROCESS-WIDE CACHE ---
+_lock = threading.Lock()
+_state = {'catalog': None, 'stamp': None, 'conn': None, 'path': None}
+
+def _file_stamp(db_path):
+    stamp = []
+    for suffix in ('', '-wal'):
+        try:
+            st = os.stat(db_path + suffix)
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+def _db_version(db_path):
+    # One long-lived connection: data_version moves whenever another connection commits.
+    if _state['conn'] is None or _state['path'] != db_path:
+        if _state['conn'] is not None: _state['conn'].close()
+        _state['conn'] = sql_connect(db_path, check_same_thread=False)
+        _state['path'] = db_path
+    conn = _state['conn']
+    return sql_fetch(conn, "PRAGMA user_version", one=True)[0], sql_fetch(conn, "PRAGMA data_version", one=True)[0]
+
+def get_catalog(db_path=DATABASE_NAME):
+    """Shared catalog for this process; reloaded when the DB file or its version changes."""
+    with _lock:
+        stamp = (db_path, _file_stamp(db_path), _db_version(db_path))
+        if _state['catalog'] is None or _state['stamp'] != stamp:
+            _state['catalog'] = Catalog.load(db_path, version=stamp[2][0])
+            _state['stamp'] = stamp
+        return _state['catalog']
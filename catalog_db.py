@@ -0,0 +1,70 @@
+"""Indexes behind the scraper's per-store queries, and a check that SQLite uses them.
+
+Builds and swaps read the in-memory Catalog (or a snapshot), never SQLite, so the only
+lookups that hit the product tables at scale are the publish path's: each store's
+existing rows, its live row count, and marking a vanished URL gone. Those statements
+live here so the plan check tests exactly what the scraper runs.
+
+    python catalog_db.py --check [--db tech_data.db]    # EXPLAIN QUERY PLAN must use the indexes
+"""
+import argparse
+import sqlite3
+import sys
+
+from offers import ACTIVE_GONE
+
+# --- CONFIGURATION ---
+DATABASE_NAME = 'tech_data.db'
+TABLES = ['processors', 'motherboards', 'rams', 'ssds', 'gpus', 'psus', 'casings']
+
+# --- QUERIES ---
+QUERIES = {
+    'store_rows': "SELECT id, name, price, spec_tag, url, active, image_url FROM {table} WHERE store = ?",
+    'store_live_count': f"SELECT COUNT(*) FROM {{table}} WHERE store = ? AND active != {ACTIVE_GONE}",
+    'deactivate_url': "UPDATE {table} SET active = 0 WHERE url = ?",
+}
+# Example parameters per query, for EXPLAIN QUERY PLAN.
+QUERY_PARAMS = {'store_rows': ('startech',), 'store_live_count': ('startech',), 'deactivate_url': ('https://example.com/x',)}
+
+def catalog_sql(name, table):
+    return QUERIES[name].format(table=table)
+
+# --- INDEXES ---
+def index_definitions(table):
+    """(name, columns) for every index the queries rely on; the URL index comes with the table."""
+    return [(f"idx_{table}_store", "store, active")]
+
+def ensure_indexes(conn, table):
+    for name, columns in index_definitions(table):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+
+# --- SELF-CHECK ---
+def check_plans(db_path=DATABASE_NAME):
+    """Problems found in the query plans: any full scan or temp sort. Empty means every query is indexed."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    problems = []
+    try:
+        for table in TABLES:
+            for name, params in QUERY_PARAMS.items():
+                plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + catalog_sql(name, table), params)]
+                for detail in plan:
+                    if "TEMP B-TREE" in detail or (detail.startswith("SCAN") and "INDEX" not in detail):
+                        problems.append(f"{table}.{name}: {detail}")
+                if not any("INDEX" in detail or "PRIMARY KEY" in detail for detail in plan):
+                    problems.append(f"{table}.{name}: no index in plan {plan}")
+    finally:
+        conn.close()
+    return problems
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the scraper's query plans")
+    parser.add_argument("--db", default=DATABASE_NAME)
+    parser.add_argument("--check", action="store_true", help="Verify every query plan uses an index")
+    args = parser.parse_args()
+    if args.check:
+        problems = check_plans(args.db)
+        for problem in problems: print(f"❌ {problem}")
+        if problems: sys.exit(1)
+        print(f"✅ All {len(QUERIES) * len(TABLES)} query plans use an index.")
+    else:
+        parser.print_help()
@@ -0,0 +1,133 @@
+"""The best build for every processor at one budget, ranked, in one shared pass.
+
+Every CPU is solved as a fixed-CPU build (what "🎯 I Choose" runs for one CPU) against a
+single candidate state, so the price-sorted lists for motherboards, RAM, SSDs, GPUs and
+PSUs and their LP bounds are built once and reused by all of them. Large matrices are
+split across worker processes that keep their own copy of the catalog between calls;
+workers return part ids, which are resolved against the caller's catalog.
+
+    python cpu_matrix.py --budget 90000 [--no-gpu] [--mode performance] [--top 20]
+"""
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from build_engine import BUILD_MODES, generate_pc_build
+from build_solver import SLOT_TABLES, build_utility, get_state
+from catalog import DATABASE_NAME, Catalog, get_catalog
+from metrics import count, timer
+from part_rules import calculate_power_breakdown
+from snapshot import Snapshot
+
+# --- CONFIGURATION ---
+# A few hundred CPUs solve in-process in ~0.1-0.3 s; only far larger tables are worth the
+# worker round trip (and the one-off start of the pool).
+PARALLEL_MIN_CPUS = 1000
+MAX_WORKERS = 4
+CHUNKS_PER_WORKER = 4
+
+def _rank(mode):
+    return 'performance' if mode == 'performance' else 'price'
+
+def _solve_cpus(catalog, budget, include_gpu, mode, cpus):
+    """[(cpu, parts, total, remaining, gpu_required, advice, value)] for the CPUs that can be built."""
+    rows = []
+    for cpu in cpus:
+        parts, total, remaining, _, gpu_required, advice = generate_pc_build(budget, include_gpu, cpu, mode, catalog)
+        if parts is None: continue
+        rows.append((cpu, parts, total, remaining, gpu_required, advice, build_utility(parts, include_gpu, 'performance')))
+    return rows
+
+def _warm(catalog, include_gpu, mode):
+    # Build the shared whole-table lists once, before any CPU needs them.
+    if mode == 'greedy': return
+    for gpu in {include_gpu, True, False}:
+        state = get_state(catalog, gpu, _rank(mode))
+        for slot in SLOT_TABLES: state.get(slot)
+
+# --- WORKERS ---
+_worker = {}
+
+def _worker_catalog(source, version):
+    if _worker.get('key') != (source, version):
+        kind, path = source
+        catalog = Catalog.from_snapshot(Snapshot(path)) if kind == 'snapshot' else Catalog.load(path, version=version)
+        _worker.update(key=(source, version), catalog=catalog)
+    return _worker['catalog']
+
+def _solve_chunk(source, version, budget, include_gpu, mode, cpu_ids):
+    catalog = _worker_catalog(source, version)
+    cpus = [cpu for cpu in (catalog.by_id('processors', cpu_id) for cpu_id in cpu_ids) if cpu is not None]
+    _warm(catalog, include_gpu, mode)
+    return [(cpu['id'], {slot: item['id'] for slot, item in parts.items()}, total, remaining, gpu_required, advice, value)
+            for cpu, parts, total, remaining, gpu_required, advice, value in _solve_cpus(catalog, budget, include_gpu, mode, cpus)]
+
+_pool_lock = threading.Lock()
+_pool = {'executor': None, 'workers': None}
+
+def _executor(workers):
+    """Process pool kept for the life of the process; spawned, so forking a threaded server is never an issue."""
+    with _pool_lock:
+        if _pool['executor'] is None or _pool['workers'] != workers:
+            if _pool['executor'] is not None: _pool['executor'].shutdown(wait=False)
+            _pool['executor'] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool['workers'] = workers
+        return _pool['executor']
+
+def _resolve(catalog, row):
+    cpu_id, part_ids, total, remaining, gpu_required, advice, value = row
+    parts = {slot: catalog.by_id(SLOT_TABLES[slot], row_id) for slot, row_id in part_ids.items()}
+    if any(item is None for item in parts.values()): return None
+    return parts['CPU'], parts, total, remaining, gpu_required, advice, value
+
+# --- MATRIX ---
+def cpu_build_matrix(budget, include_gpu=True, mode='optimal', catalog=None, workers=None):
+    """Best build for every affordable processor, highest performance score first.
+
+    Returns [{'cpu', 'parts', 'total', 'remaining', 'power', 'gpu_required', 'advice', 'value'}],
+    where value is build_utility(..., 'performance') whatever mode built the rows: the price
+    objective only measures how evenly the budget is spent, which barely separates CPUs.
+    """
+    if mode not in BUILD_MODES: raise ValueError(f"Unknown build mode: {mode}")
+    catalog = catalog or get_catalog()
+    cpus = [cpu for cpu in catalog.table('processors').items if cpu['price'] < budget]
+    workers = workers if workers is not None else min(MAX_WORKERS, os.cpu_count() or 1)
+    with timer('build.cpu_matrix', label=mode):
+        if workers > 1 and len(cpus) >= PARALLEL_MIN_CPUS and catalog.source is not None:
+            # Interleaved chunks: CPUs are price-sorted and dearer ones take longer to solve.
+            n_chunks = workers * CHUNKS_PER_WORKER
+            chunks = [[cpu['id'] for cpu in cpus[i::n_chunks]] for i in range(n_chunks)]
+            pool = _executor(workers)
+            futures = [pool.submit(_solve_chunk, catalog.source, catalog.version, budget, include_gpu, mode, chunk) for chunk in chunks if chunk]
+            rows = [_resolve(catalog, row) for future in futures for row in future.result()]
+            rows = [row for row in rows if row is not None]
+            count('build.cpu_matrix.parallel')
+        else:
+            _warm(catalog, include_gpu, mode)
+            rows = _solve_cpus(catalog, budget, include_gpu, mode, cpus)
+    rows.sort(key=lambda row: (-row[6], row[2], row[0]['id']))
+    return [{'cpu': cpu, 'parts': parts, 'total': total, 'remaining': remaining, 'power': calculate_power_breakdown(parts),
+             'gpu_required': gpu_required, 'advice': advice, 'value': value}
+            for cpu, parts, total, remaining, gpu_required, advice, value in rows]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, required=True)
+    parser.add_argument("--no-gpu", action="store_true")
+    parser.add_argument("--mode", choices=BUILD_MODES, default='optimal')
+    parser.add_argument("--db", default=DATABASE_NAME)
+    parser.add_argument("--workers", type=int, default=None, help=f"Worker processes (default: up to {MAX_WORKERS}; 1 = in process)")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    catalog = get_catalog(args.db)
+    started = time.perf_counter()
+    matrix = cpu_build_matrix(args.budget, not args.no_gpu, args.mode, catalog, args.workers)
+    elapsed = (time.perf_counter() - started) * 1000
+    for row in matrix[:args.top]:
+        gpu = row['parts'].get('Graphics Card')
+        print(f"{row['value']:7.3f}  {row['total']:>7} ৳  {row['cpu']['name'][:45]:45}  {gpu['name'][:35] if gpu else '(integrated)'}")
+    print(f"✅ {len(matrix)} CPU builds in {elapsed:.0f} ms")
@@ -0,0 +1,208 @@
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+from spec_rules import classify
+
+# --- LISTING PAGE EXTRACTORS ---
+# Every backend returns (product_count, cards) where product_count is the number of
+# `div.p-item` cards on the page and cards holds (name, raw_price, url, image_url) for
+# each card that has both a name and a price block. All backends must agree exactly.
+
+def clean_price(price_text):
+    if not price_text or "stock" in price_text.lower(): return 0
+    clean_text = price_text.replace('৳', '').replace(',', '').strip()
+    if clean_text.isdigit(): return int(clean_text)
+    match = re.search(r'\d+', clean_text)
+    if match: return int(match.group())
+    return 0
+
+def get_specs_from_name(name, category):
+    return classify(name, category)['spec_tag']
+
+def _image_src(attrs):
+    # Lazy-loading cards keep a placeholder in src and the real image in data-src.
+    return attrs.get('data-src') or attrs.get('src') or ""
+
+def _soup_cards(products):
+    cards = []
+    for product in products:
+        name_tag = product.find('h4', class_='p-item-name')
+        price_div = product.find('div', class_='p-item-price')
+        link_tag = product.find('a', href=True)
+        img_tag = product.find('img')
+
+        if name_tag and price_div:
+            price_tag = price_div.find('span', class_='price-new')
+            if not price_tag:
+                price_tag = price_div.find('span')
+            raw_price = price_tag.text.strip() if price_tag else "0"
+            url = link_tag['href'] if link_tag else ""
+            cards.append((name_tag.text.strip(), raw_price, url, _image_src(img_tag.attrs) if img_tag else ""))
+    return len(products), cards
+
+def extract_bs4(html):
+    """Reference backend: full html.parser tree, as the scraper always did."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    return _soup_cards(soup.find_all('div', class_='p-item'))
+
+def extract_strainer(html):
+    """html.parser, but only `div.p-item` subtrees are built."""
+    from bs4 import BeautifulSoup, SoupStrainer
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('div', class_='p-item'))
+    return _soup_cards(soup.find_all('div', class_='p-item'))
+
+def extract_lxml(html):
+    """lxml tree builder restricted to `div.p-item` subtrees (needs lxml installed)."""
+    from bs4 import BeautifulSoup, SoupStrainer
+    soup = BeautifulSoup(html, 'lxml', parse_only=SoupStrainer('div', class_='p-item'))
+    return _soup_cards(soup.find_all('div', class_='p-item'))
+
+# --- STREAMING BACKEND ---
+CardSelectors = namedtuple('CardSelectors', 'card name price price_new')
+CardSelectors.__doc__ = """(tag, class) pairs for a product card, its name, its price block and the preferred
+price element in that block. The first element with price_new's tag is the fallback price;
+with price_new None the price block's own text is the price."""
+STARTECH_SELECTORS = CardSelectors(('div', 'p-item'), ('h4', 'p-item-name'), ('div', 'p-item-price'), ('span', 'price-new'))
+
+VOID_TAGS = {'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr', 'image', 'img',
+             'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track', 'wbr'}
+
+class _CardStream(HTMLParser):
+    """Single pass over the page that only keeps state while inside a product card."""
+
+    def __init__(self, selectors=STARTECH_SELECTORS):
+        super().__init__(convert_charrefs=True)
+        self.selectors = selectors
+        self.stack = []          # open tags as (tag, text buffers this element feeds)
+        self.card = None
+        self.card_depth = 0
+        self.product_count = 0
+        self.cards = []
+
+    def handle_starttag(self, tag, attrs):
+        classes = ()
+        href = None
+        for key, value in attrs:
+            if key == 'class' and value: classes = value.split()
+            elif key == 'href': href = value
+        card = self.card
+
+        if card is not None and tag == 'a' and href is not None and card['url'] is None:
+            card['url'] = href
+        if card is not None and tag == 'img' and card['image'] is None:
+            card['image'] = _image_src(dict(attrs))
+        if tag in VOID_TAGS: return
+
+        buffers = []
+        card_sel, name_sel, price_sel, new_sel = self.selectors
+        if tag == card_sel[0] and card_sel[1] in classes:
+            self.product_count += 1
+            if card is None:
+                card = self.card = {'name': None, 'price_depth': None, 'price_new': None, 'span': None, 'url': None, 'image': None}
+                self.card_depth = len(self.stack)
+        if card is not None:
+            if tag == name_sel[0] and card['name'] is None and name_sel[1] in classes:
+                card['name'] = []
+                buffers.append(card['name'])
+            elif tag == price_sel[0] and card['price_depth'] is None and price_sel[1] in classes:
+                card['price_depth'] = len(self.stack) + 1
+                if new_sel is None:
+                    card['span'] = []
+                    buffers.append(card['span'])
+            elif new_sel is not None and tag == new_sel[0] and card['price_depth'] and len(self.stack) >= card['price_depth']:
+                if card['span'] is None:
+                    card['span'] = []
+                    buffers.append(card['span'])
+                if card['price_new'] is None and new_sel[1] in classes:
+                    card['price_new'] = []
+                    buffers.append(card['price_new'])
+        self.stack.append((tag, buffers))
+
+    def handle_endtag(self, tag):
+        for idx in range(len(self.stack) - 1, -1, -1):
+            if self.stack[idx][0] == tag: break
+        else:
+            return
+        del self.stack[idx:]
+        card = self.card
+        if card is None: return
+        if card['price_depth'] and len(self.stack) < card['price_depth']:
+            card['price_depth'] = 0  # price block closed; later spans are not price candidates
+        if len(self.stack) <= self.card_depth: self._finish_card()
+
+    def handle_data(self, data):
+        if self.card is None: return
+        for _, buffers in self.stack:
+            for buffer in buffers: buffer.append(data)
+
+    def _finish_card(self):
+        card = self.card
+        self.card = None
+        if card['name'] is None or card['price_depth'] is None: return
+        price = card['price_new'] if card['price_new'] is not None else card['span']
+        raw_price = ''.join(price).strip() if price is not None else "0"
+        self.cards.append((''.join(card['name']).strip(), raw_price, card['url'] or "", card['image'] or ""))
+
+    def close(self):
+        super().close()
+        if self.card is not None: self._finish_card()
+
+def extract_stream(html, selectors=STARTECH_SELECTORS):
+    """Stdlib streaming parser; no tree is built at all."""
+    parser = _CardStream(selectors)
+    parser.feed(html)
+    parser.close()
+    return parser.product_count, parser.cards
+
+# --- REGISTRY ---
+BACKENDS = {
+    'bs4': extract_bs4,
+    'strainer': extract_strainer,
+    'lxml': extract_lxml,
+    'stream': extract_stream,
+}
+DEFAULT_BACKEND = 'stream'
+
+def available_backends():
+    names = ['stream']
+    try:
+        import bs4  # noqa: F401
+        names[:0] = ['bs4', 'strainer']
+        import lxml  # noqa: F401
+        names.append('lxml')
+    except ImportError:
+        pass
+    return names
+
+def get_extractor(name=DEFAULT_BACKEND):
+    if name not in BACKENDS: raise ValueError(f"Unknown extractor backend: {name}")
+    return BACKENDS[name]
+
+def extract_cards(html, backend=DEFAULT_BACKEND, selectors=None):
+    """(product_count, cards); other stores' markup (`selectors`) is only understood by the streaming backend."""
+    if selectors is not None and selectors != STARTECH_SELECTORS: return extract_stream(html, selectors)
+    return get_extractor(backend)(html)
+
+def records_from_cards(cards, category_name):
+    records = []
+    for name, raw_price, url, image_url in cards:
+        price = clean_price(raw_price)
+        if price > 0:
+            records.append((name, price, get_specs_from_name(name, category_name), url, image_url))
+    return records
+
+def extract_records(html, category_name, backend=DEFAULT_BACKEND, selectors=None):
+    """(product_count, [(name, price, spec_tag, url, image_url), ...]) for one listing page."""
+    product_count, cards = extract_cards(html, backend, selectors)
+    return product_count, records_from_cards(cards, category_name)
+
+# --- PAGINATION ---
+_PAGE_COUNT = re.compile(r'\((\d+) Pages?\)')
+_PAGE_LINK = re.compile(r'[?&;]page=(\d+)')
+
+def extract_last_page(html):
+    """Highest page number the page knows of: OpenCart's "(14 Pages)" or the largest ?page= link; 0 if none."""
+    numbers = [int(n) for n in _PAGE_COUNT.findall(html)] + [int(n) for n in _PAGE_LINK.findall(html)]
+    return max(numbers, default=0)
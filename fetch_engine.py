@@ -0,0 +1,233 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- CONFIGURATION ---
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+DEFAULT_TIMEOUT = (5, 20)  # (connect, read) seconds
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+DEFAULT_RETRIES = 3        # per request, after the first attempt
+BACKOFF_BASE = 0.5         # seconds before the first retry; doubles each time, with jitter
+BACKOFF_MAX = 20.0
+DEFAULT_RETRY_BUDGET = 60  # retries for the whole run, across every host
+BREAKER_THRESHOLD = 5      # consecutive failed attempts that open a host's circuit
+BREAKER_COOLDOWN = 60.0    # seconds an open circuit waits before letting one trial request through
+
+class CircuitOpenError(requests.RequestException):
+    """The host's circuit is open; the request was not sent."""
+
+def _retryable(error):
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)): return True
+    response = getattr(error, 'response', None)
+    return isinstance(error, requests.HTTPError) and response is not None and response.status_code in RETRY_STATUSES
+
+# --- RATE LIMITER ---
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second, bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+# --- FAILURE HANDLING ---
+class RetryBudget:
+    """Retries left for a whole run, shared by every host and thread, so a failing site cannot stretch the job."""
+
+    def __init__(self, total=DEFAULT_RETRY_BUDGET):
+        self.total = total
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            if self.used >= self.total: return False
+            self.used += 1
+            return True
+
+class CircuitBreaker:
+    """Per host: opens after `threshold` consecutive failures, then fails fast; after `cooldown`
+    one trial request is let through, and its outcome closes or re-opens the circuit."""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None: return True
+            if self.trial or time.monotonic() - self.opened_at < self.cooldown: return False
+            self.trial = True
+            return True
+
+    def record(self, ok):
+        """Outcome of an allowed request; None (no verdict on the host) only ends a half-open trial."""
+        with self.lock:
+            self.trial = False
+            if ok is None: return
+            if ok:
+                self.failures, self.opened_at = 0, None
+                return
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.threshold:
+                if self.opened_at is None: self.trips += 1
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+# --- FETCH ENGINE ---
+class FetchEngine:
+    """Pooled keep-alive session plus a per-host token bucket, shared by a thread pool.
+
+    `host_limits` maps a host to its own (rate, burst); other hosts get `rate` and `burst`.
+    With an http_cache.HttpCache, requests are conditional and a 304 returns the cached body.
+    Timeouts, connection errors and 429/5xx are retried with backoff while `retry_budget`
+    lasts, and each host has a circuit breaker. `host_stats` and `job_stats` (per fetch_all
+    key: elapsed ms and retries) feed the run summary.
+    """
+
+    def __init__(self, concurrency=4, rate=2.0, burst=2, timeout=DEFAULT_TIMEOUT, headers=None, host_limits=None, cache=None,
+                 retries=DEFAULT_RETRIES, retry_budget=None, breaker_threshold=BREAKER_THRESHOLD, breaker_cooldown=BREAKER_COOLDOWN):
+        self.concurrency = max(1, int(concurrency))
+        self.rate = rate
+        self.burst = burst
+        self.host_limits = host_limits or {}
+        self.cache = cache
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self.retries = retries
+        self.retry_budget = retry_budget or RetryBudget()
+        self._breaker_args = (breaker_threshold, breaker_cooldown)
+        self.breakers = {}
+        self.host_stats = {}
+        self.job_stats = {}
+        self._local = threading.local()
+
+    def bucket_for(self, url):
+        host = urlsplit(url).netloc
+        with self._buckets_lock:
+            if host not in self._buckets: self._buckets[host] = TokenBucket(*self.host_limits.get(host, (self.rate, self.burst)))
+            return self._buckets[host]
+
+    def _host(self, host):
+        """(breaker, stats) for one host."""
+        with self._buckets_lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(*self._breaker_args)
+                self.host_stats[host] = {'requests': 0, 'failures': 0, 'retries': 0}
+            return self.breakers[host], self.host_stats[host]
+
+    def _get(self, url):
+        self.bucket_for(url).acquire()
+        conditional = self.cache.request_headers(url) if self.cache else {}
+        response = self.session.get(url, timeout=self.timeout, headers=conditional)
+        if response.status_code == 304 and conditional: return self.cache.not_modified(url)
+        response.raise_for_status()
+        if self.cache: self.cache.store(url, response.headers, response.text)
+        return response.text
+
+    def _backoff(self, attempt, error):
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+        if retry_after.isdigit(): return min(BACKOFF_MAX, float(retry_after))
+        return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+    def _with_retries(self, url, request):
+        host = urlsplit(url).netloc
+        breaker, stats = self._host(host)
+        attempt = 0
+        while True:
+            if not breaker.allow(): raise CircuitOpenError(f"circuit open for {host}")
+            # Pool threads share the host's counters; its breaker lock keeps the increments whole.
+            with breaker.lock: stats['requests'] += 1
+            error, healthy = None, None
+            try:
+                result = request()
+                healthy = True
+            except requests.RequestException as e:
+                error = e
+                healthy = not _retryable(e)   # a 404 still proves the host is answering
+            finally:
+                # Every path ends a half-open trial, even an error from the local cache.
+                breaker.record(healthy)
+            if error is None: return result
+            with breaker.lock: stats['failures'] += 1
+            if healthy or attempt >= self.retries or not self.retry_budget.take(): raise error
+            attempt += 1
+            with breaker.lock: stats['retries'] += 1
+            self._local.retries = getattr(self._local, 'retries', 0) + 1
+            time.sleep(self._backoff(attempt, error))
+
+    def fetch(self, url):
+        return self._with_retries(url, lambda: self._get(url))
+
+    def fetch_response(self, url, headers=None):
+        """The raw response (a 304 included) with the same rate limit, retries and breaker as fetch; bypasses the HttpCache."""
+        def request():
+            self.bucket_for(url).acquire()
+            response = self.session.get(url, timeout=self.timeout, headers=headers or {})
+            if response.status_code != 304: response.raise_for_status()
+            return response
+        return self._with_retries(url, request)
+
+    def _fetch_job(self, key, url):
+        started = time.monotonic()
+        self._local.retries = 0
+        try:
+            return self.fetch(url)
+        finally:
+            self.job_stats[key] = ((time.monotonic() - started) * 1000, self._local.retries)
+
+    def fetch_all(self, jobs):
+        """Fetch (key, url) jobs in parallel; yields (key, text, error) as each completes."""
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(self._fetch_job, key, url): key for key, url in jobs}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    yield key, future.result(), None
+                except Exception as e:
+                    yield key, None, e
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
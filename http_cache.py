@@ -0,0 +1,113 @@
+"""On-disk HTTP cache for the scraper.
+
+Bodies are stored content-addressed (sha256, gzipped) and every URL remembers its ETag,
+Last-Modified and body hash, so the next run can ask "changed since?" and a 304 costs
+no download. Parsed cards are cached per body hash too: a page whose bytes did not
+change, whether it came back as 304 or as an identical 200, is never parsed again.
+
+    .http_cache/index.json          url -> {etag, last_modified, hash, size}
+    .http_cache/bodies/ab/abcd...   gzipped response bodies
+    .http_cache/cards/abcd...-sel   parsed (product_count, cards, last_page)
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+CACHE_DIR = '.http_cache'
+CARDS_FORMAT = 2   # bumped when the card tuple changes, so older parses are redone
+
+class HttpCache:
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self.stats = {'fetched': 0, 'not_modified': 0, 'unchanged': 0, 'parsed': 0, 'parse_skipped': 0,
+                      'bytes_downloaded': 0, 'bytes_saved': 0}
+        try:
+            with open(os.path.join(root, 'index.json')) as f: self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def _path(self, kind, name):
+        return os.path.join(self.root, kind, name[:2], name) if kind == 'bodies' else os.path.join(self.root, kind, name)
+
+    def count(self, stat, amount=1):
+        with self._lock: self.stats[stat] += amount
+
+    # --- RESPONSES ---
+    def request_headers(self, url):
+        """Conditional headers for a URL fetched before, if its body is still on disk."""
+        entry = self.index.get(url)
+        if not entry or not os.path.exists(self._path('bodies', entry['hash'])): return {}
+        headers = {}
+        if entry.get('etag'): headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'): headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def not_modified(self, url):
+        """Body for a 304 response."""
+        entry = self.index[url]
+        self.count('not_modified')
+        self.count('bytes_saved', entry['size'])
+        with gzip.open(self._path('bodies', entry['hash']), 'rb') as f: return f.read().decode('utf-8')
+
+    def store(self, url, headers, text):
+        body = text.encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._path('bodies', digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(f"{path}.tmp", 'wb') as f: f.write(body)
+            os.replace(f"{path}.tmp", path)
+        with self._lock:
+            previous = self.index.get(url)
+            self.stats['fetched'] += 1
+            self.stats['bytes_downloaded'] += len(body)
+            if previous and previous['hash'] == digest: self.stats['unchanged'] += 1
+            self.index[url] = {'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified'),
+                               'hash': digest, 'size': len(body)}
+
+    def body_hash(self, url):
+        entry = self.index.get(url)
+        return entry['hash'] if entry else None
+
+    # --- PARSED CARDS ---
+    def _cards_name(self, digest, selectors):
+        return f"{digest}-{hashlib.sha256(repr((CARDS_FORMAT, selectors)).encode()).hexdigest()[:12]}.json"
+
+    def cards(self, digest, selectors):
+        if digest is None: return None
+        try:
+            with open(self._path('cards', self._cards_name(digest, selectors))) as f: parsed = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self.count('parse_skipped')
+        return parsed['product_count'], [tuple(card) for card in parsed['cards']], parsed['last_page']
+
+    def put_cards(self, digest, selectors, product_count, cards, last_page):
+        self.count('parsed')
+        path = self._path('cards', self._cards_name(digest, selectors))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", 'w') as f: json.dump({'product_count': product_count, 'cards': cards, 'last_page': last_page}, f)
+        os.replace(f"{path}.tmp", path)
+
+    # --- PERSISTENCE ---
+    def save(self):
+        """Writes the index and deletes bodies and cards no URL points at any more."""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            live = {entry['hash'] for entry in self.index.values()}
+            tmp = os.path.join(self.root, 'index.json.tmp')
+            with open(tmp, 'w') as f: json.dump(self.index, f)
+            os.replace(tmp, os.path.join(self.root, 'index.json'))
+        for kind in ('bodies', 'cards'):
+            for dirpath, _, files in os.walk(os.path.join(self.root, kind)):
+                for name in files:
+                    if name[:64] not in live: os.remove(os.path.join(dirpath, name))
+
+    def summary(self):
+        s = self.stats
+        return (f"{s['fetched']} pages downloaded ({s['unchanged']} identical), {s['not_modified']} served from cache, "
+                f"{s['parse_skipped']} parses skipped, {s['bytes_downloaded'] / 1e6:.1f} MB downloaded, "
+                f"{s['bytes_saved'] / 1e6:.1f} MB saved")
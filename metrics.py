@@ -0,0 +1,167 @@
+"""In-process performance metrics.
+
+Timers and counters accumulate in one process-wide registry that can be written to a
+file or served as Prometheus text. While a trace is active on the current thread (one
+Streamlit rerun), every sample is also recorded there for the ?debug=1 panel.
+
+    METRICS_FILE=metrics.prom   write the registry after every rerun
+    METRICS_PORT=9108           serve it at http://localhost:9108/metrics
+    METRICS_DISABLED=1          turn every hook into a no-op
+"""
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+ENABLED = os.environ.get('METRICS_DISABLED', '') not in ('1', 'true', 'yes')
+PREFIX = 'bdpc'
+
+_lock = threading.Lock()
+_counters = {}
+_timers = {}   # name -> [count, total_seconds, max_seconds]
+_local = threading.local()
+
+# --- RECORDING ---
+def count(name, amount=1):
+    if not ENABLED: return
+    with _lock: _counters[name] = _counters.get(name, 0) + amount
+    trace = getattr(_local, 'trace', None)
+    if trace is not None: trace['counters'][name] = trace['counters'].get(name, 0) + amount
+
+def observe(name, seconds, label=None):
+    if not ENABLED: return
+    with _lock:
+        stat = _timers.get(name)
+        if stat is None: stat = _timers[name] = [0, 0.0, 0.0]
+        stat[0] += 1
+        stat[1] += seconds
+        if seconds > stat[2]: stat[2] = seconds
+    trace = getattr(_local, 'trace', None)
+    if trace is not None: trace['timings'].append((name, label, seconds * 1000))
+
+@contextmanager
+def timer(name, label=None):
+    if not ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, label)
+
+class Phases:
+    """Back-to-back phase timing without re-indenting the code being measured.
+
+    Each mark() records the time since the previous mark as `<name>.<phase>`.
+    """
+    __slots__ = ('name', 'last')
+
+    def __init__(self, name):
+        self.name = name
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        if not ENABLED: return
+        now = time.perf_counter()
+        observe(f"{self.name}.{phase}", now - self.last)
+        self.last = now
+
+# --- SQL ---
+def sql_connect(*args, **kwargs):
+    """sqlite3.connect that counts connection opens."""
+    import sqlite3
+    count('sql.connections')
+    return sqlite3.connect(*args, **kwargs)
+
+def sql_fetch(conn, sql, params=(), one=False):
+    """Executes and fetches, recording query count, time and rows fetched."""
+    started = time.perf_counter()
+    cursor = conn.execute(sql, params)
+    if one:
+        row = cursor.fetchone()
+        rows = 1 if row is not None else 0
+    else:
+        row = cursor.fetchall()
+        rows = len(row)
+    observe('sql.query', time.perf_counter() - started)
+    count('sql.rows', rows)
+    return row
+
+# --- PER-RERUN TRACE ---
+def start_trace():
+    _local.trace = {'started': time.perf_counter(), 'timings': [], 'counters': {}}
+
+def end_trace():
+    """Stops the current thread's trace and returns it with its wall time, or None."""
+    trace = getattr(_local, 'trace', None)
+    _local.trace = None
+    if trace is None: return None
+    trace['total_ms'] = (time.perf_counter() - trace.pop('started')) * 1000
+    observe('app.rerun', trace['total_ms'] / 1000)
+    return trace
+
+# --- EXPORT ---
+def snapshot():
+    with _lock:
+        return dict(_counters), {name: list(stat) for name, stat in _timers.items()}
+
+def _metric_name(name):
+    return f"{PREFIX}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+def prometheus_text():
+    counters, timers = snapshot()
+    lines = []
+    for name, value in sorted(counters.items()):
+        metric = _metric_name(name) + '_total'
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, (calls, total, peak) in sorted(timers.items()):
+        metric = _metric_name(name) + '_seconds'
+        lines += [f"# TYPE {metric} summary", f"{metric}_count {calls}", f"{metric}_sum {total:.6f}",
+                  f"# TYPE {metric}_max gauge", f"{metric}_max {peak:.6f}"]
+    return "\n".join(lines) + "\n"
+
+def write_file(path):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f: f.write(prometheus_text())
+    os.replace(tmp, path)
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+_server = {}
+
+def serve(port):
+    """Starts (once per process) a background Prometheus text endpoint."""
+    with _lock:
+        if port in _server: return _server[port]
+        try:
+            server = HTTPServer(('127.0.0.1', port), _Handler)
+        except OSError:
+            server = None  # another process already owns the port; don't retry every rerun
+        else:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        _server[port] = server
+        return server
+
+def export_from_env():
+    """Honours METRICS_FILE / METRICS_PORT; cheap to call on every rerun."""
+    if not ENABLED: return
+    port = os.environ.get('METRICS_PORT')
+    if port: serve(int(port))
+    path = os.environ.get('METRICS_FILE')
+    if path: write_file(path)
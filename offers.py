@@ -0,0 +1,119 @@
+"""Cross-store merge: listings of the same product at different stores become one product.
+
+Matching never compares all pairs. Names that normalize to the same token set share a
+hash and merge outright; the rest are blocked by model number ("7600x", "4060 ti",
+"12400f") and only compared inside their block, where the smaller name's numbers must
+all appear in the larger one and most of its words must too.
+
+Per product the cheapest in-stock listing stays `active = 1`, which is all the builder
+and the catalog ever read; the other stores' listings become ACTIVE_UNDERCUT. Every
+listing carries the product's `best_price` and how many stores sell it (`offers`).
+"""
+import hashlib
+import re
+
+from search_index import normalize
+
+# --- CONFIGURATION ---
+OFFER_COLUMNS = {'store': 'TEXT', 'product_key': 'TEXT', 'best_price': 'INTEGER', 'offers': 'INTEGER'}
+ACTIVE_GONE, ACTIVE_BEST, ACTIVE_UNDERCUT = 0, 1, 2
+# Share of the smaller name's words the larger must contain to be the same product.
+MIN_CONTAINMENT = 0.8
+# Bigger blocks are generic numbers, not model numbers; they only merge by exact hash.
+MAX_BLOCK = 200
+
+NOISE_WORDS = frozenset('''processor desktop graphics card gaming ram memory ssd solid state drive power supply
+    psu casing case motherboard with and for pc edition bundle the tray box boxed new'''.split())
+UNITS = ('mhz', 'ghz', 'gb', 'tb', 'mm', 'w', 'g')
+# Words that change which model a number is when they follow it: "4060 Ti", "7600 X", "12400 F".
+MODEL_SUFFIXES = frozenset('ti super xt xtx gre x x3d f k kf ks t'.split())
+_RAW_SPLIT = re.compile(r'[^a-z0-9]+')
+_MODEL = re.compile(r'\d{3,}')
+_UNIT_SUFFIX = re.compile(r'(\d)(?:%s)$' % '|'.join(UNITS))
+
+class Listing:
+    __slots__ = ('row_id', 'store', 'key', 'models', 'numbers', 'words')
+
+    def __init__(self, row_id, store, name):
+        self.row_id = row_id
+        self.store = store
+        raw = [w for w in _RAW_SPLIT.split(name.lower()) if w and w not in NOISE_WORDS]
+        tokens = [t for t in normalize(' '.join(raw)) if t not in NOISE_WORDS]
+        self.key = hashlib.blake2b(' '.join(sorted(set(tokens))).encode(), digest_size=8).hexdigest()
+        self.models = frozenset(_model_tokens(raw))
+        self.numbers = frozenset(t for t in tokens if t.isdigit())
+        self.words = frozenset(t for t in tokens if not t.isdigit())
+
+def _model_tokens(raw):
+    """'7600x', '12400f', '4060ti': 3+ digit tokens, units stripped, joined to a model suffix."""
+    models = []
+    for i, word in enumerate(raw):
+        if not _MODEL.search(word): continue
+        word = _UNIT_SUFFIX.sub(r'\1', word)
+        following = raw[i + 1] if i + 1 < len(raw) else ''
+        if word.isdigit() and following in MODEL_SUFFIXES:
+            word += following
+        models.append(word)
+    return models
+
+def same_product(a, b):
+    small, large = (a, b) if len(a.numbers) + len(a.words) <= len(b.numbers) + len(b.words) else (b, a)
+    if not small.numbers <= large.numbers: return False
+    if not small.words: return True
+    return len(small.words & large.words) / len(small.words) >= MIN_CONTAINMENT
+
+# --- CLUSTERING ---
+def cluster_listings(listings):
+    """{row_id: product_key}; listings from one store are never merged with each other by similarity."""
+    groups = {}
+    for listing in listings: groups.setdefault(listing.key, []).append(listing)
+
+    blocks = {}
+    for key, members in groups.items():
+        if members[0].models: blocks.setdefault(members[0].models, []).append(key)
+
+    product_of = {key: key for key in groups}
+    for keys in blocks.values():
+        if len(keys) < 2 or len(keys) > MAX_BLOCK: continue
+        clusters = []   # [representative listing, stores, product key]
+        for key in sorted(keys):
+            members = groups[key]
+            stores = {m.store for m in members}
+            for cluster in clusters:
+                if not (stores & cluster[1]) and same_product(members[0], cluster[0]):
+                    cluster[1] |= stores
+                    product_of[key] = cluster[2]
+                    break
+            else:
+                clusters.append([members[0], stores, key])
+    return {listing.row_id: product_of[listing.key] for listing in listings}
+
+# --- DATABASE ---
+def ensure_offer_columns(conn, table, default_store):
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for column, kind in OFFER_COLUMNS.items():
+        if column not in columns: conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+    conn.execute(f"UPDATE {table} SET store = ? WHERE store IS NULL", (default_store,))
+
+def merge_offers(conn, table):
+    """Re-clusters a table's live listings and marks the cheapest offer of each product.
+
+    Returns (url, old_price, new_price) changes for listings the builder starts or stops seeing.
+    """
+    rows = conn.execute(f"SELECT id, store, name, price, url, active, product_key, best_price, offers "
+                        f"FROM {table} WHERE active != {ACTIVE_GONE}").fetchall()
+    product_of = cluster_listings([Listing(row[0], row[1], row[2]) for row in rows])
+    products = {}
+    for row in rows: products.setdefault(product_of[row[0]], []).append(row)
+
+    updates, changes = [], []
+    for key, members in products.items():
+        best = min(members, key=lambda r: (r[3], r[0]))
+        offers = len({r[1] for r in members})
+        for row_id, _, _, price, url, active, old_key, old_best, old_offers in members:
+            state = ACTIVE_BEST if row_id == best[0] else ACTIVE_UNDERCUT
+            if (active, old_key, old_best, old_offers) == (state, key, best[3], offers): continue
+            updates.append((state, key, best[3], offers, row_id))
+            if active != state: changes.append((url, price, None) if state == ACTIVE_UNDERCUT else (url, None, price))
+    conn.executemany(f"UPDATE {table} SET active = ?, product_key = ?, best_price = ?, offers = ? WHERE id = ?", updates)
+    return changes
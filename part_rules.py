@@ -0,0 +1,78 @@
+from perf_model import DEFAULT_POWER, balance, score_products
+from spec_rules import classify
+
+# Every spec fact comes from the columns spec_rules materializes at scrape time; rows
+# that predate them (or were built by hand) are classified from their name on the spot.
+def part_attr(item, attribute, category):
+    if attribute in item: return item[attribute]
+    return classify(item['name'], category)[attribute]
+
+# --- HELPER: WATTAGE ---
+def get_wattage(psu):
+    return part_attr(psu, 'psu_watts', 'PSU') or 0
+
+# --- HELPER: CPU VENDOR ---
+def get_cpu_type(cpu):
+    return part_attr(cpu, 'vendor', 'CPU')
+
+# --- HELPER: RAM GENERATION FROM MOTHERBOARD ---
+def get_ram_type(mobo):
+    return part_attr(mobo, 'ram_gen', 'Motherboard') or "DDR4"
+
+# --- HELPER: MANDATORY GPU CHECK ---
+def is_gpu_mandatory(cpu):
+    return part_attr(cpu, 'has_igpu', 'CPU') == 0
+
+# --- HELPER: PERFORMANCE MODEL ---
+def part_perf(item, table):
+    """(perf_score, power_draw) as perf_model stored them, or scored on the spot for rows it has not seen."""
+    if item.get('perf_score') is not None: return item['perf_score'], item.get('power_draw')
+    scores, _, power = score_products(table, [item['name']], [item['price']])
+    return float(scores[0]), int(power[0])
+
+def get_perf_score(item, table):
+    return part_perf(item, table)[0]
+
+# --- HELPER: BOTTLENECK CALCULATOR ---
+def check_bottleneck(cpu, gpu):
+    if not gpu: return None
+    side = balance(get_perf_score(cpu, 'processors'), get_perf_score(gpu, 'gpus'))
+    if side < 0: return "⚠️ **Bottleneck Detected:** GPU is significantly weaker than CPU."
+    if side > 0: return "⚠️ **Bottleneck Detected:** CPU will hold this GPU back."
+    return None
+
+# --- HELPER: POWER BREAKDOWN ---
+def get_cpu_watts(cpu):
+    return part_perf(cpu, 'processors')[1] or DEFAULT_POWER['processors']
+
+def get_gpu_watts(gpu):
+    return part_perf(gpu, 'gpus')[1] or DEFAULT_POWER['gpus']
+
+def calculate_power_breakdown(parts):
+    breakdown = { "Base System": 100, "CPU": 0, "GPU": 0, "Storage": 0, "Total": 0 }
+    if 'CPU' in parts: breakdown["CPU"] = get_cpu_watts(parts['CPU'])
+    if 'Graphics Card' in parts: breakdown["GPU"] = get_gpu_watts(parts['Graphics Card'])
+    if 'Storage' in parts: breakdown["Storage"] = 15
+    breakdown["Total"] = sum(breakdown.values())
+    return breakdown
+
+PSU_HEADROOM = 150
+
+# --- HELPER: COMPATIBILITY ---
+def compatibility_issues(parts):
+    """What does not fit together in a build (hand-picked parts can break the solver's rules)."""
+    issues = []
+    cpu, mobo, ram, psu = (parts.get(slot) for slot in ('CPU', 'Motherboard', 'RAM', 'Power Supply'))
+    if cpu and mobo:
+        # Vendor is the compatibility rule the builders use (sockets are not tracked for every board).
+        cpu_vendor, mobo_vendor = get_cpu_type(cpu), part_attr(mobo, 'vendor', 'Motherboard')
+        if cpu_vendor and mobo_vendor and cpu_vendor != mobo_vendor:
+            issues.append(f"🔌 **Socket Mismatch:** an {mobo_vendor} motherboard cannot take an {cpu_vendor} CPU.")
+    if mobo and ram:
+        ram_gen = part_attr(ram, 'ram_gen', 'RAM')
+        if ram_gen and ram_gen != get_ram_type(mobo):
+            issues.append(f"🧩 **RAM Mismatch:** the motherboard takes {get_ram_type(mobo)}, this kit is {ram_gen}.")
+    if psu:
+        needed = calculate_power_breakdown(parts)['Total'] + PSU_HEADROOM
+        if get_wattage(psu) < needed: issues.append(f"⚡ **PSU Too Weak:** {get_wattage(psu)}W for a build that wants {needed}W.")
+    return issues
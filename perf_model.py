@@ -0,0 +1,263 @@
+"""Performance and power model for processors and graphics cards.
+
+Benchmark tables give every known model a relative score (the fastest part ≈ 100) and a
+peak power draw. Names the tables don't know are estimated from their model number's
+class and generation, and names without a model number from price. Each name is read
+once by one regex; every score, tier and wattage after that is NumPy array arithmetic
+over the whole table.
+
+The scraper stores perf_score, perf_tier and power_draw on every processor and GPU row
+after each publish; the Catalog keeps them as arrays aligned with its price lists.
+
+    python perf_model.py --rescore                                # recompute tech_data.db
+    python perf_model.py --explain gpus "MSI GeForce RTX 4060 Ti Ventus 2X"
+"""
+import argparse
+import re
+import sqlite3
+
+import numpy as np
+
+# --- CONFIGURATION ---
+DATABASE_NAME = 'tech_data.db'
+PERF_TABLES = ('processors', 'gpus')
+PERF_COLUMNS = {'perf_score': 'REAL', 'perf_tier': 'INTEGER', 'power_draw': 'INTEGER'}
+TIER_NAMES = {1: 'Entry', 2: 'Budget', 3: 'Mainstream', 4: 'High-end', 5: 'Enthusiast'}
+TIER_BOUNDS = {'processors': [30, 50, 70, 90], 'gpus': [15, 30, 50, 75]}
+DEFAULT_POWER = {'processors': 100, 'gpus': 150}
+# A GPU scoring between these multiples of its CPU's score is a balanced pairing.
+BALANCE = (0.3, 1.2)
+
+# --- CPU TABLES ---
+CPU_CLASSES = (3, 5, 7, 9)   # i3/Ryzen 3 ... i9/Ryzen 9
+# (line, generation): ((score for class 3, 5, 7, 9), (peak watts for class 3, 5, 7, 9))
+CPU_GENERATIONS = {
+    ('core', 8): ((28, 36, 42, 46), (65, 95, 130, 160)),
+    ('core', 9): ((30, 38, 46, 50), (65, 95, 160, 200)),
+    ('core', 10): ((35, 45, 52, 56), (90, 134, 229, 250)),
+    ('core', 11): ((38, 52, 57, 58), (90, 154, 229, 251)),
+    ('core', 12): ((55, 68, 80, 85), (89, 148, 190, 241)),
+    ('core', 13): ((58, 78, 90, 96), (89, 154, 253, 253)),
+    ('core', 14): ((60, 80, 94, 100), (110, 154, 253, 253)),
+    ('ultra', 2): ((60, 80, 92, 98), (110, 159, 250, 250)),
+    ('ryzen', 1): ((20, 28, 32, 32), (65, 95, 95, 95)),
+    ('ryzen', 2): ((25, 33, 37, 37), (65, 95, 105, 105)),
+    ('ryzen', 3): ((35, 45, 50, 52), (65, 88, 142, 142)),
+    ('ryzen', 4): ((38, 48, 54, 54), (65, 88, 88, 88)),
+    ('ryzen', 5): ((48, 60, 68, 72), (65, 88, 142, 142)),
+    ('ryzen', 7): ((62, 80, 88, 92), (88, 142, 142, 230)),
+    ('ryzen', 8): ((55, 66, 70, 70), (88, 88, 88, 88)),
+    ('ryzen', 9): ((66, 84, 90, 96), (88, 88, 142, 230)),
+}
+# Generation not in the table: the class alone.
+CPU_CLASS_FALLBACK = ((45, 62, 75, 85), (90, 130, 180, 230))
+CPU_BASIC = (15, 58)   # Pentium, Celeron, Athlon
+# Suffix: (score multiplier, power multiplier)
+CPU_SUFFIXES = {'K': (1.04, 1.0), 'KF': (1.04, 1.0), 'KS': (1.06, 1.0), 'T': (0.85, 0.5), 'X': (1.04, 1.0),
+                'XT': (1.06, 1.0), 'X3D': (1.2, 0.9), 'G': (0.9, 0.8), 'GE': (0.85, 0.5), 'GT': (0.92, 0.8)}
+
+_CPU_NAME = re.compile(r'\bI(?P<core>[3579])[- ]?(?P<core_gen>\d{1,2})\d{3}(?!\d)(?P<core_sfx>[A-Z]*)'
+                       r'|\bULTRA\s*(?P<ultra>[3579])\s*(?P<ultra_gen>\d)\d{2}(?!\d)(?P<ultra_sfx>[A-Z]*)'
+                       r'|\bRYZEN\s*(?P<ryzen>[3579])\s*(?P<ryzen_gen>\d)\d{3}(?!\d)(?P<ryzen_sfx>[A-Z0-9]*)'
+                       r'|\bI(?P<core_class>[3579])\b|\bRYZEN\s*(?P<ryzen_class>[3579])\b'
+                       r'|\b(?P<basic>PENTIUM|CELERON|ATHLON)\b')
+
+# --- GPU TABLES ---
+# Model: (score, peak watts)
+GPU_MODELS = {
+    'GT 1030': (3, 30), 'GTX 1050 TI': (9, 75), 'GTX 1650': (12, 75), 'GTX 1660': (16, 120),
+    'GTX 1660 SUPER': (18, 125), 'GTX 1660 TI': (18, 120), 'RTX 2060': (22, 160), 'RTX 2060 SUPER': (25, 175),
+    'RTX 3050': (20, 130), 'RTX 3060': (28, 170), 'RTX 3060 TI': (36, 200), 'RTX 3070': (41, 220),
+    'RTX 3070 TI': (44, 290), 'RTX 3080': (52, 320), 'RTX 3080 TI': (58, 350), 'RTX 3090': (60, 350),
+    'RTX 4060': (32, 115), 'RTX 4060 TI': (38, 160), 'RTX 4070': (50, 200), 'RTX 4070 SUPER': (57, 220),
+    'RTX 4070 TI': (60, 285), 'RTX 4070 TI SUPER': (65, 285), 'RTX 4080': (76, 320), 'RTX 4080 SUPER': (78, 320),
+    'RTX 4090': (100, 450), 'RTX 5060': (38, 145), 'RTX 5060 TI': (44, 180), 'RTX 5070': (60, 250),
+    'RTX 5070 TI': (74, 300), 'RTX 5080': (82, 360), 'RTX 5090': (125, 575),
+    'RX 550': (4, 50), 'RX 580': (15, 185), 'RX 6400': (10, 53), 'RX 6500 XT': (12, 107), 'RX 6600': (27, 132),
+    'RX 6600 XT': (31, 160), 'RX 6650 XT': (33, 180), 'RX 6700 XT': (40, 230), 'RX 6750 XT': (42, 250),
+    'RX 6800': (50, 250), 'RX 6800 XT': (57, 300), 'RX 6900 XT': (60, 300), 'RX 6950 XT': (64, 335),
+    'RX 7600': (30, 165), 'RX 7600 XT': (32, 190), 'RX 7700 XT': (44, 245), 'RX 7800 XT': (53, 263),
+    'RX 7900 GRE': (60, 260), 'RX 7900 XT': (72, 315), 'RX 7900 XTX': (82, 355), 'RX 9060 XT': (42, 160),
+    'RX 9070': (66, 220), 'RX 9070 XT': (74, 304),
+    'ARC A380': (8, 75), 'ARC A580': (24, 185), 'ARC A750': (28, 225), 'ARC A770': (31, 225), 'ARC B580': (34, 190),
+}
+# Unknown model numbers: score = class base x generation factor, both interpolated.
+GPU_LINES = {
+    # line: ((series, factor) points, (class digit, base score) points)
+    'nvidia': (((10, 0.45), (16, 0.6), (20, 0.75), (30, 1.0), (40, 1.25), (50, 1.45)),
+               ((3, 6), (5, 20), (6, 28), (7, 41), (8, 52), (9, 60))),
+    'amd': (((5, 0.8), (6, 1.0), (7, 1.15), (9, 1.5)),
+            ((4, 10), (5, 12), (6, 27), (7, 40), (8, 52), (9, 60))),
+}
+GPU_SUFFIXES = {'TI': 1.15, 'SUPER': 1.1, 'TI SUPER': 1.25, 'XT': 1.12, 'XTX': 1.25, 'GRE': 1.05}
+
+_GPU_NAME = re.compile(r'\b(?P<nv>RTX|GTX|GT)\s*(?P<nv_num>\d{3,4})(?!\d)\s*(?P<nv_sfx>TI\s*SUPER|TI|SUPER)?\b'
+                       r'|\bRX\s*(?P<amd_num>\d{3,4})(?!\d)\s*(?P<amd_sfx>XTX|XT|GRE)?\b'
+                       r'|\bARC\s*(?P<arc>[AB]\d{3})\b')
+
+# --- NAME PARSING (the only per-row Python) ---
+_CPU_KEYS = {key: i for i, key in enumerate(CPU_GENERATIONS)}
+_CPU_SCORES = np.array([scores for scores, _ in CPU_GENERATIONS.values()], dtype=float)
+_CPU_POWER = np.array([power for _, power in CPU_GENERATIONS.values()], dtype=float)
+_GPU_KEYS = {key: i for i, key in enumerate(GPU_MODELS)}
+_GPU_TABLE = np.array(list(GPU_MODELS.values()), dtype=float)
+
+def _parse_cpu(name):
+    """(generation row or -1, class index or -1, score multiplier, power multiplier, basic)."""
+    m = _CPU_NAME.search(name.upper())
+    if not m: return -1, -1, 1.0, 1.0, False
+    if m['basic']: return -1, -1, 1.0, 1.0, True
+    for line in ('core', 'ultra', 'ryzen'):
+        if m[line]:
+            score_mult, power_mult = CPU_SUFFIXES.get(m[f'{line}_sfx'], (1.0, 1.0))
+            row = _CPU_KEYS.get((line, int(m[f'{line}_gen'])), -1)
+            return row, CPU_CLASSES.index(int(m[line])), score_mult, power_mult, False
+    return -1, CPU_CLASSES.index(int(m['core_class'] or m['ryzen_class'])), 1.0, 1.0, False
+
+def _parse_gpu(name):
+    """(model row or -1, line: 0 nvidia / 1 amd / -1, model number, suffix multiplier)."""
+    m = _GPU_NAME.search(name.upper())
+    if not m: return -1, -1, 0, 1.0
+    if m['arc']: return _GPU_KEYS.get(f"ARC {m['arc']}", -1), -1, 0, 1.0
+    line, prefix = (0, m['nv']) if m['nv'] else (1, 'RX')
+    number = m['nv_num'] or m['amd_num']
+    suffix = ' '.join((m['nv_sfx'] or m['amd_sfx'] or '').split())
+    key = f"{prefix} {number} {suffix}" if suffix else f"{prefix} {number}"
+    return _GPU_KEYS.get(key, -1), line, int(number), GPU_SUFFIXES.get(suffix, 1.0)
+
+# --- VECTORIZED SCORING ---
+def _price_fill(scores, prices):
+    """Scores still NaN take the score of known parts at their price; pricier never scores lower."""
+    unknown = np.isnan(scores)
+    if not unknown.any(): return scores
+    known = ~unknown
+    if not known.any(): return np.where(unknown, 30.0, scores)
+    order = np.argsort(prices[known], kind='stable')
+    known_prices = prices[known][order]
+    known_scores = np.maximum.accumulate(scores[known][order])
+    return np.where(unknown, np.interp(prices, known_prices, known_scores), scores)
+
+def _cpu_arrays(names, prices):
+    parsed = np.array([_parse_cpu(name) for name in names], dtype=float).reshape(-1, 5)
+    row, cls, score_mult, power_mult, basic = parsed.T
+    row, cls, basic = row.astype(int), cls.astype(int), basic.astype(bool)
+    safe_row, safe_cls = np.maximum(row, 0), np.maximum(cls, 0)
+    fallback_scores = np.array(CPU_CLASS_FALLBACK[0], dtype=float)[safe_cls]
+    fallback_power = np.array(CPU_CLASS_FALLBACK[1], dtype=float)[safe_cls]
+    scores = np.where(row >= 0, _CPU_SCORES[safe_row, safe_cls], fallback_scores) * score_mult
+    power = np.where(row >= 0, _CPU_POWER[safe_row, safe_cls], fallback_power) * power_mult
+    scores = np.where(basic, CPU_BASIC[0], np.where(cls >= 0, scores, np.nan))
+    power = np.where(basic, CPU_BASIC[1], np.where(cls >= 0, power, DEFAULT_POWER['processors']))
+    return _price_fill(scores, prices), power
+
+def _gpu_arrays(names, prices):
+    parsed = np.array([_parse_gpu(name) for name in names], dtype=float).reshape(-1, 4)
+    row, line, number, suffix_mult = parsed.T
+    row, line = row.astype(int), line.astype(int)
+    scores = np.full(len(names), np.nan)
+    for index, (series_points, class_points) in enumerate(GPU_LINES.values()):
+        mask = (row < 0) & (line == index) & (number >= 1000)
+        # nvidia 4060: series 40, class 6; amd 7600: series 7, class 6
+        series = number // 100 if index == 0 else number // 1000
+        klass = (number // 10) % 10 if index == 0 else (number // 100) % 10
+        factor = np.interp(series, *zip(*series_points))
+        base = np.interp(klass, *zip(*class_points))
+        scores = np.where(mask, base * factor * suffix_mult, scores)
+    # Three-digit numbers: Polaris RX 460-590, and GT 710/730-class office cards.
+    three_digit = (row < 0) & (number > 0) & (number < 1000)
+    scores = np.where(three_digit & (line == 1), np.interp(number, (460, 550, 580, 590), (6, 4, 15, 16)), scores)
+    scores = np.where(three_digit & (line == 0), 2.0, scores)
+    scores = np.where(row >= 0, _GPU_TABLE[np.maximum(row, 0), 0], scores)
+    scores = _price_fill(scores, prices)
+    power = np.where(row >= 0, _GPU_TABLE[np.maximum(row, 0), 1], np.clip(30 + 4 * scores, 30, 600))
+    return scores, power
+
+def score_products(table, names, prices):
+    """(scores, tiers, power) arrays for parallel lists of names and prices of one table."""
+    prices = np.asarray(prices, dtype=float)
+    if not len(names): return np.zeros(0), np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    scores, power = (_cpu_arrays if table == 'processors' else _gpu_arrays)(names, prices)
+    scores = np.round(np.maximum(scores, 1.0), 1)
+    tiers = np.digitize(scores, TIER_BOUNDS[table]) + 1
+    return scores, tiers, np.round(power).astype(int)
+
+def balance(cpu_score, gpu_score):
+    """-1 when the GPU holds the CPU back, 1 when the CPU holds the GPU back, else 0."""
+    ratio = gpu_score / cpu_score
+    return -1 if ratio < BALANCE[0] else (1 if ratio > BALANCE[1] else 0)
+
+# --- CATALOG ARRAYS ---
+class PerfIndex:
+    """Scores and performance per taka of one price-sorted list, aligned with its items."""
+
+    def __init__(self, items, prices=None, scores=None):
+        # prices/scores: buffers already aligned with items (a snapshot's columns), read without copying.
+        self.items = items
+        if prices is not None: self.prices = np.asarray(prices, dtype=float)
+        else: self.prices = np.fromiter((r['price'] for r in items), dtype=float, count=len(items))
+        if scores is not None:
+            self.scores = np.asarray(scores, dtype=float)
+            if np.isnan(self.scores).any(): self.scores = np.nan_to_num(self.scores)
+        else: self.scores = np.fromiter((r['perf_score'] or 0 for r in items), dtype=float, count=len(items))
+        self.value = self.scores / np.maximum(self.prices, 1)
+
+    def best_value(self, mask, limit):
+        """Up to `limit` items where mask is set, most performance per taka first."""
+        idx = np.flatnonzero(mask)
+        idx = idx[np.argsort(-self.value[idx], kind='stable')[:limit]]
+        return tuple(self.items[i] for i in idx)
+
+# --- DATABASE ---
+def ensure_perf_columns(conn, table):
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for column, sql_type in PERF_COLUMNS.items():
+        if column not in columns: conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}")
+
+def score_table(conn, table):
+    """Scores every row of one table in one pass; writes only rows whose numbers changed."""
+    ensure_perf_columns(conn, table)
+    rows = conn.execute(f"SELECT id, name, price, perf_score, perf_tier, power_draw FROM {table}").fetchall()
+    if not rows: return 0
+    scores, tiers, power = score_products(table, [r[1] or '' for r in rows], [r[2] or 0 for r in rows])
+    updates = [(float(s), int(t), int(w), r[0]) for r, s, t, w in zip(rows, scores, tiers, power)
+               if (r[3], r[4], r[5]) != (float(s), int(t), int(w))]
+    conn.executemany(f"UPDATE {table} SET perf_score = ?, perf_tier = ?, power_draw = ? WHERE id = ?", updates)
+    return len(updates)
+
+def rescore(db_path=DATABASE_NAME):
+    """Re-scores every processor and GPU after a table change; no scraping needed."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    changed_total = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in PERF_TABLES:
+            if table not in existing: continue
+            changed = score_table(conn, table)
+            changed_total += changed
+            print(f"  {table}: {changed} rows re-scored")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if changed_total: conn.execute(f"PRAGMA user_version = {version + 1}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return changed_total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Performance and power model maintenance")
+    parser.add_argument("--rescore", action="store_true", help="Re-score every processor and GPU in the database")
+    parser.add_argument("--explain", nargs=2, metavar=("TABLE", "NAME"), help="Score one product name")
+    parser.add_argument("--price", type=int, default=0, help="Price for --explain (used when the name has no model)")
+    parser.add_argument("--db", default=DATABASE_NAME)
+    args = parser.parse_args()
+    if args.rescore:
+        print(f"✅ Re-scored {rescore(args.db)} rows.")
+    elif args.explain:
+        table, name = args.explain
+        scores, tiers, power = score_products(table, [name], [args.price])
+        print(f"{name}: score {scores[0]}, tier {tiers[0]} ({TIER_NAMES[tiers[0]]}), {power[0]} W")
+    else:
+        parser.print_help()
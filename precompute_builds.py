@@ -0,0 +1,168 @@
+"""Materializes the "AI Decides" build for every budget step the UI allows.
+
+Runs right after the scraper:
+
+    python precompute_builds.py                                   # every budget
+    python precompute_builds.py --changes scrape_changes.json     # only budgets a price change can touch
+"""
+import argparse
+import json
+import math
+import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+from build_engine import generate_pc_build
+from build_solver import SLOT_TABLES
+from catalog import DATABASE_NAME, Catalog, get_catalog
+from metrics import sql_connect, sql_fetch
+from part_rules import calculate_power_breakdown
+
+# --- CONFIGURATION ---
+# Must match the st.number_input limits in web_app.py.
+BUDGET_MIN = 15000
+BUDGET_MAX = 800000
+BUDGET_STEP = 1000
+CHUNK_SIZE = 40
+# A catalog version the table was not written for yet is looked up again after this many
+# seconds, so an app that loaded the version before precompute finished still picks it up.
+MISS_RECHECK = 5.0
+
+def all_keys():
+    return [(budget, gpu) for budget in range(BUDGET_MIN, BUDGET_MAX + 1, BUDGET_STEP) for gpu in (True, False)]
+
+def setup_build_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS build_table (
+            budget INTEGER, include_gpu INTEGER,
+            part_ids TEXT, total INTEGER, remaining INTEGER, gpu_required INTEGER, advice TEXT,
+            PRIMARY KEY (budget, include_gpu)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE TABLE IF NOT EXISTS build_table_meta (id INTEGER PRIMARY KEY CHECK (id = 1), catalog_version INTEGER)")
+
+# --- WORKERS ---
+_worker = {}
+
+def _init_worker(db_path):
+    _worker['catalog'] = Catalog.load(db_path)
+
+def _compute_chunk(keys):
+    catalog = _worker['catalog']
+    rows = []
+    for budget, gpu in keys:
+        parts, total, remaining, _, gpu_required, advice = generate_pc_build(budget, gpu, catalog=catalog)
+        part_ids = json.dumps({slot: item['id'] for slot, item in parts.items()}) if parts else None
+        rows.append((budget, int(gpu), part_ids, total, remaining, int(gpu_required), advice))
+    return rows
+
+# --- INCREMENTAL SELECTION ---
+def affected_keys(changes, builds, catalog):
+    """Budgets a set of price changes can touch, given the builds stored for them.
+
+    A price drop or a new product can open a better build at any budget that covers its
+    new price. A rise or a removal only breaks the builds that hold that product: every
+    other build keeps its price and stays within budget, and no rival became cheaper, so
+    it is kept. That is exact on feasibility; under the price ranking a rival holding the
+    dearer part scores up to weight * log(new / old) more, so a kept build can trail a
+    fresh solve by that much until the next full run. Kept builds also keep whatever the
+    solver chose among near-ties, or settled on at a timeout, the last time it ran.
+    """
+    changed, drops = set(), []
+    for table, entries in changes.items():
+        for url, old, new in entries:
+            changed.add((table, url))
+            if new and (old is None or new < old): drops.append(new)
+    if not changed: return []
+    floor = min(drops, default=math.inf)
+
+    def touched(part_ids):
+        for slot, row_id in json.loads(part_ids).items():
+            item = catalog.by_id(SLOT_TABLES[slot], row_id)
+            if item is None or (SLOT_TABLES[slot], item['url']) in changed: return True
+        return False
+    return [(budget, gpu) for budget, gpu in all_keys()
+            if budget >= floor or (builds.get((budget, gpu)) and touched(builds[(budget, gpu)]))]
+
+def precompute(db_path=DATABASE_NAME, changes=None, workers=None):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    setup_build_table(conn)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    stored = conn.execute("SELECT catalog_version FROM build_table_meta WHERE id = 1").fetchone()
+    have_rows = conn.execute("SELECT COUNT(*) FROM build_table").fetchone()[0] == len(all_keys())
+    # Incremental only when the table is complete and exactly one publish behind.
+    incremental = changes is not None and have_rows and stored is not None and stored[0] in (version, version - 1)
+    if incremental:
+        builds = {(budget, bool(gpu)): part_ids
+                  for budget, gpu, part_ids in conn.execute("SELECT budget, include_gpu, part_ids FROM build_table")}
+        keys = affected_keys(changes, builds, Catalog.load(db_path))
+    else:
+        keys = all_keys()
+
+    started = time.perf_counter()
+    chunks = [keys[i:i + CHUNK_SIZE] for i in range(0, len(keys), CHUNK_SIZE)]
+    rows = []
+    if chunks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(db_path,)) as pool:
+            for chunk_rows in pool.map(_compute_chunk, chunks): rows.extend(chunk_rows)
+
+    conn.execute("BEGIN IMMEDIATE")
+    conn.executemany("INSERT OR REPLACE INTO build_table VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.execute("INSERT OR REPLACE INTO build_table_meta (id, catalog_version) VALUES (1, ?)", (version,))
+    conn.execute("COMMIT")
+    conn.close()
+    mode = "incremental" if incremental else "full"
+    print(f"✅ Build table ({mode}): {len(rows)} of {len(all_keys())} builds computed in {time.perf_counter() - started:.1f}s")
+    return len(rows)
+
+# --- LOOKUP ---
+_tables = weakref.WeakKeyDictionary()   # catalog -> (table, when to look again if it was empty)
+_tables_lock = threading.Lock()
+
+def _load_table(catalog, db_path):
+    conn = sql_connect(db_path)
+    try:
+        meta = sql_fetch(conn, "SELECT catalog_version FROM build_table_meta WHERE id = 1", one=True)
+        if not meta or meta[0] != catalog.version: return {}
+        return {(budget, bool(gpu)): (part_ids, total, remaining, bool(gpu_required), advice)
+                for budget, gpu, part_ids, total, remaining, gpu_required, advice in sql_fetch(conn, "SELECT * FROM build_table")}
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+
+def lookup_build(budget, include_gpu=True, catalog=None, db_path=DATABASE_NAME):
+    """Precomputed result in generate_pc_build's shape, or None when the table has no fresh entry."""
+    catalog = catalog or get_catalog(db_path)
+    with _tables_lock:
+        cached = _tables.get(catalog)
+        if cached is None or (not cached[0] and time.monotonic() >= cached[1]):
+            cached = _tables[catalog] = (_load_table(catalog, db_path), time.monotonic() + MISS_RECHECK)
+    table = cached[0]
+    entry = table.get((budget, bool(include_gpu)))
+    if entry is None: return None
+    part_ids, total, remaining, gpu_required, advice = entry
+    if part_ids is None: return None, 0, 0, 0, False, None
+    parts = {}
+    for slot, row_id in json.loads(part_ids).items():
+        item = catalog.by_id(SLOT_TABLES[slot], row_id)
+        if item is None: return None
+        parts[slot] = item
+    return parts, total, remaining, calculate_power_breakdown(parts), gpu_required, advice
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=DATABASE_NAME)
+    parser.add_argument("--changes", help="JSON change report written by the scraper")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    changes = None
+    if args.changes:
+        try:
+            with open(args.changes) as f: changes = json.load(f)
+        except FileNotFoundError:
+            print(f"⚠️ {args.changes} not found; recomputing every budget.")
+    precompute(args.db, changes, args.workers)
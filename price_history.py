@@ -0,0 +1,244 @@
+"""Compact price history: one entry per price change, never a daily copy of the catalog.
+
+Each publish appends (product, day, price) only for listings whose price moved, appeared
+or disappeared (price 0). The file is columnar: products as (key, run length) pairs,
+then day and price columns delta-encoded across the whole file, each zlib-compressed.
+Loading is a few C-level accumulate passes, and every query works on per-product slices.
+
+    python price_history.py --record          # after a scrape: append today's changes
+    python price_history.py --drops 10 --days 7
+    python price_history.py --product gpus 42
+"""
+import argparse
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+from datetime import date, timedelta
+from itertools import accumulate
+
+from catalog import DATABASE_NAME, TABLES
+
+# --- CONFIGURATION ---
+HISTORY_FILE = 'price_history.bin'
+MAGIC = b'BDPH'
+FORMAT_VERSION = 1
+EPOCH = date(2020, 1, 1)
+TABLE_SHIFT = 32                   # product key = table index << 32 | row id
+GOOD_DEAL_MARGIN = 0.02            # within 2% of the all-time low
+HIGH_MARGIN = 0.10                 # 10% over the 90-day median
+
+def day_number(when=None):
+    return ((when or date.today()) - EPOCH).days
+
+def product_key(table, row_id):
+    return TABLES.index(table) << TABLE_SHIFT | row_id
+
+def split_key(key):
+    return TABLES[key >> TABLE_SHIFT], key & ((1 << TABLE_SHIFT) - 1)
+
+# --- STORE ---
+class PriceHistory:
+    """Entries sorted by (product, day); `runs` maps a product key to its [start, end) slice."""
+
+    def __init__(self, keys=(), counts=(), days=(), prices=()):
+        self.keys = array('q', keys)
+        self.counts = array('i', counts)
+        self.days = array('i', days)
+        self.prices = array('i', prices)
+        self.runs = {}
+        start = 0
+        for key, n in zip(self.keys, self.counts):
+            self.runs[key] = (start, start + n)
+            start += n
+        self._lows = {}
+        self._drops = {}
+
+    def __len__(self):
+        return len(self.days)
+
+    # --- FILE FORMAT ---
+    @classmethod
+    def load(cls, path=HISTORY_FILE):
+        try:
+            with open(path, 'rb') as f: data = f.read()
+        except FileNotFoundError:
+            return cls()
+        magic, version = struct.unpack_from('<4sH', data)
+        if magic != MAGIC or version != FORMAT_VERSION: raise ValueError(f"{path} is not a v{FORMAT_VERSION} price history")
+        offset, columns = 6, []
+        for typecode in ('q', 'i', 'i', 'i'):
+            (size,) = struct.unpack_from('<I', data, offset)
+            column = array(typecode)
+            column.frombytes(zlib.decompress(data[offset + 4:offset + 4 + size]))
+            columns.append(column)
+            offset += 4 + size
+        keys, counts, day_deltas, price_deltas = columns
+        return cls(keys, counts, accumulate(day_deltas), accumulate(price_deltas))
+
+    def save(self, path=HISTORY_FILE):
+        def deltas(column): return array('i', (b - a for a, b in zip([0] + list(column[:-1]), column)))
+        parts = [struct.pack('<4sH', MAGIC, FORMAT_VERSION)]
+        for column in (self.keys, self.counts, deltas(self.days), deltas(self.prices)):
+            blob = zlib.compress(column.tobytes(), 9)
+            parts += [struct.pack('<I', len(blob)), blob]
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f: f.write(b''.join(parts))
+        os.replace(tmp, path)
+
+    # --- WRITING ---
+    def latest(self):
+        """{product key: last recorded price}."""
+        return {key: self.prices[end - 1] for key, (_, end) in self.runs.items()}
+
+    def with_changes(self, day, current):
+        """New history with `current` ({key: price}, gone products absent) recorded for `day`.
+
+        Only products whose price differs from their last entry get a new entry.
+        """
+        latest = self.latest()
+        changes = {key: price for key, price in current.items() if latest.get(key) != price}
+        changes.update({key: 0 for key, price in latest.items() if price and key not in current})
+        if not changes: return self, 0
+        keys, counts, days, prices, total = [], [], [], [], 0
+        for key in sorted(set(self.runs) | set(changes)):
+            start, end = self.runs.get(key, (0, 0))
+            keys.append(key)
+            days.extend(self.days[start:end])
+            prices.extend(self.prices[start:end])
+            if key in changes:
+                if end > start and self.days[end - 1] == day:
+                    prices[-1] = changes[key]   # second publish on one day: last price wins
+                else:
+                    days.append(day)
+                    prices.append(changes[key])
+            counts.append(len(days) - total)
+            total = len(days)
+        return PriceHistory(keys, counts, days, prices), len(changes)
+
+    # --- QUERIES ---
+    def series(self, table, row_id, days=None, today=None):
+        """[(date, price)] for one listing; with `days`, the price in force at the window start comes first."""
+        start, end = self.runs.get(product_key(table, row_id), (0, 0))
+        if days is not None:
+            cutoff = day_number(today) - days
+            first = bisect_right(self.days, cutoff, start, end) - 1
+            start = max(start, first)
+        return [(EPOCH + timedelta(days=self.days[i]), self.prices[i]) for i in range(start, end)]
+
+    def price_on(self, key, day):
+        start, end = self.runs.get(key, (0, 0))
+        i = bisect_right(self.days, day, start, end) - 1
+        return self.prices[i] if i >= start else None
+
+    def all_time_low(self, table, row_id):
+        key = product_key(table, row_id)
+        if key not in self._lows:
+            start, end = self.runs.get(key, (0, 0))
+            self._lows[key] = min(filter(None, self.prices[start:end]), default=None)
+        return self._lows[key]
+
+    def drops(self, min_pct=10, days=7, table=None, today=None):
+        """[(table, row_id, old, new, pct)] for live products now at least min_pct cheaper than `days` ago.
+
+        The history never changes once loaded, so each distinct query is computed once.
+        """
+        query = (min_pct, days, table, day_number(today))
+        if query not in self._drops: self._drops[query] = self._find_drops(*query)
+        return self._drops[query]
+
+    def _find_drops(self, min_pct, days, table, now):
+        since = now - days
+        table_index = TABLES.index(table) if table else None
+        found = []
+        for key, (start, end) in self.runs.items():
+            if table_index is not None and key >> TABLE_SHIFT != table_index: continue
+            new = self.prices[end - 1]
+            # Skip products with no change in the window; they cannot have dropped.
+            if not new or self.days[end - 1] <= since: continue
+            i = bisect_right(self.days, since, start, end) - 1
+            old = self.prices[i] if i >= start else 0
+            if old and (old - new) * 100 >= min_pct * old:
+                found.append(split_key(key) + (old, new, round(100.0 * (old - new) / old, 1)))
+        found.sort(key=lambda d: -d[4])
+        return found
+
+    def buy_signal(self, table, row_id, price, today=None):
+        """('good' | 'high' | 'typical' | None, reason) for showing next to a part."""
+        key = product_key(table, row_id)
+        start, end = self.runs.get(key, (0, 0))
+        if end - start < 2: return None, None
+        low = self.all_time_low(table, row_id)
+        if low and price <= low * (1 + GOOD_DEAL_MARGIN): return 'good', f"lowest price seen ({low} ৳)"
+        now = day_number(today)
+        week_ago = self.price_on(key, now - 7)
+        if week_ago and price <= week_ago * 0.9: return 'good', f"down {round(100 * (week_ago - price) / week_ago)}% this week"
+        window = sorted(p for _, p in self.series(table, row_id, days=90, today=today) if p > 0)
+        if window and price > window[len(window) // 2] * (1 + HIGH_MARGIN):
+            return 'high', f"above its usual {window[len(window) // 2]} ৳ (low {low} ৳)"
+        return 'typical', f"usual price (low {low} ৳)"
+
+# --- RECORDING ---
+def current_prices(db_path=DATABASE_NAME):
+    conn = sqlite3.connect(db_path)
+    try:
+        existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        current = {}
+        for table in TABLES:
+            if table not in existing: continue
+            for row_id, price in conn.execute(f"SELECT id, price FROM {table} WHERE active != 0 AND price > 0"):
+                current[product_key(table, row_id)] = price
+        return current
+    finally:
+        conn.close()
+
+def record(db_path=DATABASE_NAME, path=HISTORY_FILE, when=None):
+    history = PriceHistory.load(path)
+    updated, changed = history.with_changes(day_number(when), current_prices(db_path))
+    if changed: updated.save(path)
+    print(f"📈 Price history: {changed} changes recorded, {len(updated)} entries for {len(updated.runs)} listings.")
+    return changed
+
+# --- PROCESS-WIDE CACHE ---
+_lock = threading.Lock()
+_state = {'history': None, 'stamp': None}
+
+def get_history(path=HISTORY_FILE):
+    """Shared history for this process; reloaded when the file changes."""
+    try:
+        stat = os.stat(path)
+        stamp = (path, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = (path, None, None)
+    with _lock:
+        if _state['history'] is None or _state['stamp'] != stamp:
+            _state['history'] = PriceHistory.load(path)
+            _state['stamp'] = stamp
+        return _state['history']
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record and query the price history")
+    parser.add_argument("--db", default=DATABASE_NAME)
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--record", action="store_true", help="Append today's price changes from --db")
+    parser.add_argument("--drops", type=float, metavar="PCT", help="Products down at least PCT%% over --days")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--product", nargs=2, metavar=("TABLE", "ID"), help="Last 90 days and all-time low of one listing")
+    args = parser.parse_args()
+
+    if args.record: record(args.db, args.history)
+    history = PriceHistory.load(args.history)
+    if args.drops is not None:
+        started = time.perf_counter()
+        found = history.drops(args.drops, args.days)
+        elapsed = (time.perf_counter() - started) * 1000
+        for table, row_id, old, new, pct in found[:50]: print(f"  {table:<13} #{row_id:<7} {old:>8} -> {new:>8} ৳  -{pct}%")
+        print(f"{len(found)} drops in {elapsed:.2f} ms")
+    if args.product:
+        table, row_id = args.product[0], int(args.product[1])
+        for day, price in history.series(table, row_id, days=90): print(f"  {day}  {price} ৳")
+        print(f"All-time low: {history.all_time_low(table, row_id)} ৳")
@@ -1,128 +1,344 @@
-import requests
-from bs4 import BeautifulSoup
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import sqlite3
+import sys
 import time
-import re
+
+from extractors import (BACKENDS, DEFAULT_BACKEND, clean_price, extract_cards, extract_last_page,  # noqa: F401
+                        extract_records, get_specs_from_name, records_from_cards)
+from catalog_db import catalog_sql, ensure_indexes
+from fetch_engine import FetchEngine
+from http_cache import CACHE_DIR, HttpCache
+from price_history import record as record_price_history
+from offers import ACTIVE_GONE, ensure_offer_columns, merge_offers
+from perf_model import PERF_TABLES, ensure_perf_columns, score_table
+from snapshot import SNAPSHOT_DIR, write_snapshot
+from spec_rules import ATTRIBUTE_COLUMNS, TABLE_CATEGORIES, attribute_row, ensure_attribute_columns, retag_table
+from stores import DEFAULT_STORE, STORES
+from thumbnails import IMAGE_COLUMNS, update_thumbnails
+from watchlist import OUTBOX, WATCHLIST_DB, run_watchlist
 
 # --- CONFIGURATION ---
 DATABASE_NAME = 'tech_data.db'
+CHANGES_FILE = 'scrape_changes.json'
+SUMMARY_FILE = 'scrape_summary.json'
+# A category returning fewer rows than this share of what the store listed last time is
+# more likely a broken page or a block than a sell-out, so it is not written.
+MIN_KEEP_RATIO = 0.5
+KEPT_STATUSES = ('failed', 'suspicious')
+TABLES = ['processors', 'motherboards', 'rams', 'ssds', 'gpus', 'psus', 'casings']
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
-def clean_price(price_text):
-    if not price_text or "stock" in price_text.lower(): return 0
-    clean_text = price_text.replace('৳', '').replace(',', '').strip()
-    if clean_text.isdigit(): return int(clean_text)
-    match = re.search(r'\d+', clean_text)
-    if match: return int(match.group())
-    return 0
-
-def get_specs_from_name(name, category):
-    spec_tag = "General"
-    name_upper = name.upper()
-    
-    if category == "RAM":
-        if "DDR5" in name_upper: spec_tag = "DDR5"
-        elif "DDR4" in name_upper: spec_tag = "DDR4"
-        elif "DDR3" in name_upper: spec_tag = "DDR3"
-    elif category == "SSD":
-        if "NVME" in name_upper or "M.2" in name_upper: spec_tag = "NVMe"
-        else: spec_tag = "SATA"
-    elif category == "Motherboard":
-         if "INTEL" in name_upper or "LGA" in name_upper: spec_tag = "Intel"
-         elif "AMD" in name_upper or "AM4" in name_upper or "AM5" in name_upper: spec_tag = "AMD"
-    elif category == "GPU":
-        if "RTX" in name_upper or "GTX" in name_upper: spec_tag = "Nvidia"
-        elif "RX" in name_upper or "RADEON" in name_upper: spec_tag = "AMD"
-
-    return spec_tag
-
-def setup_database():
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    tables = ['processors', 'motherboards', 'rams', 'ssds', 'gpus', 'psus', 'casings']
-    for table in tables:
-        cursor.execute(f"DROP TABLE IF EXISTS {table}") 
-        cursor.execute(f'''
-            CREATE TABLE {table} (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT, price INTEGER, spec_tag TEXT, url TEXT
-            )
-        ''')
-    conn.commit()
+def connect_database():
+    conn = sqlite3.connect(DATABASE_NAME, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def setup_database(conn=None):
+    """Creates missing tables and migrates old ones in place; never drops data."""
+    own_conn = conn is None
+    if own_conn: conn = connect_database()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for table in TABLES:
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT, price INTEGER, spec_tag TEXT, url TEXT,
+                    active INTEGER NOT NULL DEFAULT 1
+                )
+            ''')
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if 'active' not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN active INTEGER NOT NULL DEFAULT 1")
+            for column in IMAGE_COLUMNS:
+                if column not in columns: conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+            # Rows from the old drop-and-reload scraper may repeat a URL; keep the first one.
+            conn.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY url)")
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_url ON {table}(url)")
+            ensure_offer_columns(conn, table, DEFAULT_STORE)
+            ensure_attribute_columns(conn, table)
+            ensure_perf_columns(conn, table)
+            ensure_indexes(conn, table)
+            # Rows stored before the spec columns existed get classified once here.
+            retag_table(conn, table, only_missing=True)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    if own_conn: conn.close()
+
+def parse_listing(html, category_name, backend=DEFAULT_BACKEND, selectors=None):
+    """Extracts (name, price, spec_tag, url, image_url) records from one listing page."""
+    return extract_records(html, category_name, backend, selectors)
+
+def parse_page(html, backend=DEFAULT_BACKEND, selectors=None):
+    """(product_count, cards, last_page) for one listing page; runs in the parser pool."""
+    product_count, cards = extract_cards(html, backend, selectors)
+    return product_count, cards, extract_last_page(html)
+
+def collect_records(category_name, pages):
+    """Joins a category's pages in page order, one record per product URL.
+
+    A page that could not be fetched or parsed is None and is skipped; the pages after it still count.
+    """
+    by_url = {}
+    for page_num in sorted(pages):
+        if pages[page_num] is None: continue
+        product_count, records = pages[page_num]
+        # STOP at the first page that loaded but had no products
+        if not product_count:
+            print(f"  x {category_name}: no products on page {page_num}. Stopping.")
+            break
+        for record in records:
+            if record[3]: by_url[record[3]] = record
+    return list(by_url.values())
+
+def upsert_category(conn, table_name, records, complete, store=DEFAULT_STORE):
+    """Writes only new or changed rows of one store; its products missing from a complete scrape are marked inactive."""
+    existing = {url: (row_id, name, price, spec_tag, active, image_url) for row_id, name, price, spec_tag, url, active, image_url
+                in conn.execute(catalog_sql('store_rows', table_name), (store,))}
+    category = TABLE_CATEGORIES[table_name]
+    changed = []
+    changes = []
+    for name, price, spec_tag, url, image_url in records:
+        image_url = image_url or None
+        old = existing.get(url)
+        if old is None:
+            changes.append((url, None, price))
+        elif old[1:4] == (name, price, spec_tag) and old[5] == image_url and old[4] != ACTIVE_GONE:
+            continue
+        elif old[2] != price or not old[4]:
+            changes.append((url, old[2] if old[4] else None, price))
+        changed.append((name, price, spec_tag, url, store, image_url) + attribute_row(name, category))
+
+    columns = ', '.join(ATTRIBUTE_COLUMNS)
+    conn.executemany(f'''
+        INSERT INTO {table_name} (name, price, spec_tag, url, store, image_url, {columns}, active)
+        VALUES (?, ?, ?, ?, ?, ?, {', '.join('?' * len(ATTRIBUTE_COLUMNS))}, 1)
+        ON CONFLICT(url) DO UPDATE SET
+            name = excluded.name, price = excluded.price, spec_tag = excluded.spec_tag, image_url = excluded.image_url,
+            {', '.join(f'{c} = excluded.{c}' for c in ATTRIBUTE_COLUMNS)}, active = 1
+        WHERE name IS NOT excluded.name OR price IS NOT excluded.price
+           OR spec_tag IS NOT excluded.spec_tag OR image_url IS NOT excluded.image_url OR active = 0
+    ''', changed)
+
+    vanished = []
+    if complete and records:
+        seen = {record[3] for record in records}
+        vanished = [(url, old[2]) for url, old in existing.items() if old[4] and url not in seen]
+        conn.executemany(catalog_sql('deactivate_url', table_name), [(url,) for url, _ in vanished])
+        changes.extend((url, price, None) for url, price in vanished)
+
+    return {"seen": len(records), "written": len(changed), "deactivated": len(vanished), "changes": changes}
+
+def category_status(records, failed_pages, previous):
+    """'ok'; 'partial' when some pages failed (written, but nothing is marked gone); or 'failed' /
+    'suspicious' (under MIN_KEEP_RATIO of the `previous` row count), which keep the last good data."""
+    if failed_pages and not records: return 'failed'
+    if previous and len(records) < MIN_KEEP_RATIO * previous: return 'suspicious'
+    return 'partial' if failed_pages else 'ok'
+
+def publish(conn, categories, pages, failed, report=None):
+    """Applies every (store, table) in one transaction so readers switch catalogs atomically.
+
+    After each table's stores are written, its listings are re-merged across stores.
+    Categories that failed or look truncated are left as they were; `report` receives each
+    category's status and row counts.
+    """
+    results = {}
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for (store, table), category_name in categories.items():
+            records = collect_records(category_name, pages[store, table])
+            previous = conn.execute(catalog_sql('store_live_count', table), (store,)).fetchone()[0]
+            status = category_status(records, failed[store, table], previous)
+            if report is not None: report[store, table] = {'status': status, 'rows': len(records), 'previous_rows': previous}
+            if status in KEPT_STATUSES:
+                print(f"⚠️ {store} {category_name}: {status}, {len(records)} rows (last run {previous}); keeping the last good data.")
+                continue
+            stats = upsert_category(conn, table, records, complete=status == 'ok', store=store)
+            print(f"✅ {store} {category_name}: {stats['seen']} seen, {stats['written']} written, {stats['deactivated']} marked gone.")
+            totals = results.setdefault(table, {"seen": 0, "written": 0, "deactivated": 0, "changes": []})
+            for key in ("seen", "written", "deactivated"): totals[key] += stats[key]
+            totals["changes"].extend(stats["changes"])
+        for table, totals in results.items():
+            merged = merge_offers(conn, table)
+            totals["changes"].extend(merged)
+            if merged: print(f"🔀 {table}: {len(merged)} listings changed cheapest-offer status.")
+        for table in PERF_TABLES:
+            if table in results: print(f"🏎️ {table}: {score_table(conn, table)} rows re-scored.")
+        if results:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    # Fold the WAL back into tech_data.db so the committed file is self-contained.
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return results
+
+def _interleave(job_lists):
+    """Round-robin across stores so every store's pages are in flight from the start."""
+    jobs = []
+    for i in range(max((len(j) for j in job_lists), default=0)):
+        jobs.extend(j[i] for j in job_lists if i < len(j))
+    return jobs
+
+def _percentile(ordered, q):
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1) if ordered else 0
+
+def run_summary(categories, failed, report, engine, fetched, elapsed):
+    """Machine-readable account of a run: status, pages, retries and latency per category, health per host."""
+    jobs = {}
+    for (store, table, _), stats in engine.job_stats.items(): jobs.setdefault((store, table), []).append(stats)
+    summary = {'elapsed_s': round(elapsed, 1), 'pages': fetched,
+               'retry_budget': {'total': engine.retry_budget.total, 'used': engine.retry_budget.used},
+               'hosts': {host: dict(stats, circuit_trips=engine.breakers[host].trips, circuit_open=engine.breakers[host].is_open)
+                         for host, stats in engine.host_stats.items()},
+               'categories': {}}
+    for key, category_name in categories.items():
+        latencies = sorted(ms for ms, _ in jobs.get(key, ()))
+        summary['categories'][f"{key[0]}/{key[1]}"] = dict(
+            report.get(key, {'status': 'failed'}), category=category_name, pages=len(latencies), failed_pages=sorted(failed[key]),
+            retries=sum(retries for _, retries in jobs.get(key, ())),
+            latency_ms={'p50': _percentile(latencies, 0.5), 'max': _percentile(latencies, 1.0), 'total': round(sum(latencies), 1)})
+    statuses = [c['status'] for c in summary['categories'].values()]
+    summary['status'] = {status: statuses.count(status) for status in sorted(set(statuses))}
+    return summary
+
+def run_scrape(stores, tables=None, concurrency=4, rate=None, burst=None, parse_workers=None,
+               parser_backend=DEFAULT_BACKEND, cache_dir=CACHE_DIR):
+    """Fetches every store's listing pages concurrently, parses in a process pool and writes from one connection.
+
+    Each category's first page says how many pages it has; those are then fetched together
+    (in more rounds only if a page links further than the first one said). Each store keeps
+    its own rate limit, and `concurrency` is per store. With a cache, unchanged pages are
+    neither downloaded nor parsed. Failed requests are retried within one budget for the run
+    and a host that keeps failing is cut off by its circuit breaker; a category that still
+    fails keeps its last good rows. Returns (results, summary), see run_summary.
+    """
+    started = time.perf_counter()
+    by_name = {store.name: store for store in stores}
+    categories = {(store.name, table): cat for store in stores for table, cat in store.category_names().items()
+                  if tables is None or table in tables}
+    pages = {key: {} for key in categories}
+    failed = {key: set() for key in categories}
+    last_page = {key: 1 for key in categories}
+    limits = {store.host: (rate or store.rate, burst or store.burst) for store in stores}
+    cache = HttpCache(cache_dir) if cache_dir else None
+
+    def record(key, page_num, parsed):
+        product_count, cards, page_last = parsed
+        pages[key][page_num] = (product_count, records_from_cards(cards, categories[key]))
+        last_page[key] = max(last_page[key], page_last)
+
+    jobs = _interleave([store.first_pages(tables) for store in stores])
+    fetched = 0
+    with FetchEngine(concurrency=concurrency * len(stores), headers=HEADERS, host_limits=limits, cache=cache) as engine, \
+         ProcessPoolExecutor(max_workers=parse_workers) as parsers:
+        while jobs:
+            fetched += len(jobs)
+            urls = dict(jobs)
+            parse_futures = {}
+            for (store, table, page_num), html, error in engine.fetch_all(jobs):
+                key, selectors = (store, table), by_name[store].selectors
+                if error:
+                    print(f"❌ Error on {store} {categories[key]} page {page_num}: {error}")
+                    pages[key][page_num] = None
+                    failed[key].add(page_num)
+                    continue
+                digest = cache.body_hash(urls[store, table, page_num]) if cache else None
+                parsed = cache.cards(digest, selectors) if cache else None
+                if parsed is not None:
+                    record(key, page_num, parsed)
+                    continue
+                future = parsers.submit(parse_page, html, parser_backend, selectors)
+                parse_futures[future] = (key, page_num, digest)
+
+            for future in as_completed(parse_futures):
+                key, page_num, digest = parse_futures[future]
+                try:
+                    parsed = future.result()
+                except Exception as e:
+                    print(f"❌ Parse error on {key[0]} {categories[key]} page {page_num}: {e}")
+                    pages[key][page_num] = None
+                    failed[key].add(page_num)
+                    continue
+                if cache: cache.put_cards(digest, by_name[key[0]].selectors, *parsed)
+                record(key, page_num, parsed)
+
+            jobs = _interleave([[((store, table, page_num), by_name[store].page_url(by_name[store].listing_url(table), page_num))
+                                 for page_num in range(2, min(last_page[store, table], by_name[store].max_pages) + 1)
+                                 if page_num not in pages[store, table]]
+                                for store, table in categories])
+
+    if cache: cache.save()
+    conn = connect_database()
+    setup_database(conn)
+    report = {}
+    results = publish(conn, categories, pages, failed, report)
     conn.close()
+    elapsed = time.perf_counter() - started
+    summary = run_summary(categories, failed, report, engine, fetched, elapsed)
+    print(f"\n⏱️ {fetched} pages from {len(stores)} stores in {elapsed:.1f}s (concurrency={concurrency} per store)")
+    print(f"🔁 {summary['retry_budget']['used']}/{summary['retry_budget']['total']} retries used; categories: "
+          + ', '.join(f"{n} {status}" for status, n in summary['status'].items()))
+    if cache: print(f"🗄️ {cache.summary()}")
+    return results, summary
 
-def scrape_category(base_url, category_name, table_name):
+def scrape_category(base_url, category_name, table_name, store=DEFAULT_STORE):
     print(f"--- Scraping {category_name} ---")
-    
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    total_count = 0
-    
-    # --- NEW: LOOP THROUGH PAGES 1 TO 5 ---
-    for page_num in range(1, 6): 
-        # Construct URL with page number (e.g., ?page=2)
-        target_url = f"{base_url}?page={page_num}"
-        print(f"  > Visiting Page {page_num}...")
-        
-        try:
-            response = requests.get(target_url, headers=HEADERS)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            products = soup.find_all('div', class_='p-item')
-            
-            # STOP if no products found on this page
-            if not products:
-                print("    x No more products found. Stopping.")
-                break
-            
-            count_on_page = 0
-            for product in products:
-                name_tag = product.find('h4', class_='p-item-name')
-                price_div = product.find('div', class_='p-item-price')
-                link_tag = product.find('a', href=True)
-                
-                if name_tag and price_div:
-                    name = name_tag.text.strip()
-                    
-                    price_tag = price_div.find('span', class_='price-new')
-                    if not price_tag:
-                        price_tag = price_div.find('span')
-                    
-                    raw_price = price_tag.text.strip() if price_tag else "0"
-                    price = clean_price(raw_price)
-                    url = link_tag['href'] if link_tag else ""
-                    
-                    if price > 0:
-                        spec_tag = get_specs_from_name(name, category_name)
-                        cursor.execute(f'INSERT INTO {table_name} (name, price, spec_tag, url) VALUES (?, ?, ?, ?)', 
-                                       (name, price, spec_tag, url))
-                        count_on_page += 1
-            
-            total_count += count_on_page
-            time.sleep(1) # Wait 1 sec between pages to be polite
-            
-        except Exception as e:
-            print(f"❌ Error on Page {page_num}: {e}")
-
-    conn.commit()
-    conn.close()
-    print(f"✅ Finished {category_name}. Total Saved: {total_count} items.\n")
+    results, _ = run_scrape([STORES[store]], tables=[table_name])
+    return results.get(table_name, {}).get('seen', 0)
 
 if __name__ == "__main__":
-    setup_database()
-    target_urls = [
-        ("https://www.startech.com.bd/component/processor", "CPU", "processors"),
-        ("https://www.startech.com.bd/component/motherboard", "Motherboard", "motherboards"),
-        ("https://www.startech.com.bd/component/ram", "RAM", "rams"),
-        ("https://www.startech.com.bd/component/graphics-card", "GPU", "gpus"),
-        ("https://www.startech.com.bd/ssd", "SSD", "ssds"),
-        ("https://www.startech.com.bd/component/power-supply", "PSU", "psus"),
-        ("https://www.startech.com.bd/component/casing", "Casing", "casings"),
-    ]
-    
-    print("🚀 Starting Multi-Page Scrape (Max 5 pages per category)...")
-    for url, cat, table in target_urls:
-        scrape_category(url, cat, table)
+    parser = argparse.ArgumentParser(description="Scrape retailer listings into tech_data.db")
+    parser.add_argument("--stores", nargs="*", choices=sorted(STORES), default=sorted(STORES), help="Stores to scrape (default: all)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel page fetches per store")
+    parser.add_argument("--rate", type=float, default=None, help="Max requests per second per host (default: each store's own)")
+    parser.add_argument("--burst", type=int, default=None, help="Token bucket burst size per host (default: each store's own)")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--parser", choices=sorted(BACKENDS), default=DEFAULT_BACKEND, help="Listing extractor backend")
+    parser.add_argument("--changes-file", default=CHANGES_FILE, help="Where to write this run's price changes")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="HTTP cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Download and parse every page")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR, help="Where to publish the catalog snapshot the web app maps")
+    parser.add_argument("--no-images", action="store_true", help="Skip downloading and thumbnailing product images")
+    parser.add_argument("--watchlist", default=WATCHLIST_DB, help="Price watches to check against this run's changes")
+    parser.add_argument("--outbox", default=OUTBOX, help="Where price alerts are queued for the notifier")
+    parser.add_argument("--summary-file", default=SUMMARY_FILE, help="Where to write this run's per-category status and fetch stats")
+    args = parser.parse_args()
+
+    stores = [STORES[name] for name in args.stores]
+    print(f"🚀 Starting Multi-Page Scrape of {', '.join(store.label for store in stores)}...")
+    results, summary = run_scrape(stores, concurrency=args.concurrency, rate=args.rate, burst=args.burst,
+                         parse_workers=args.parse_workers, parser_backend=args.parser,
+                         cache_dir=None if args.no_cache else args.cache_dir)
+    with open(args.summary_file, 'w') as f:
+        json.dump(summary, f, indent=2)
+    if not any(c['status'] not in KEPT_STATUSES for c in summary['categories'].values()):
+        print(f"❌ No category was scraped successfully; the database is unchanged. See {args.summary_file}.")
+        sys.exit(1)
+    with open(args.changes_file, 'w') as f:
+        json.dump({table: stats['changes'] for table, stats in results.items()}, f)
+    if not args.no_images:
+        thumbs = update_thumbnails(DATABASE_NAME)
+        if thumbs: print(f"🖼️ {thumbs['downloaded']} new thumbnails, {thumbs['not_modified']} unchanged, {thumbs['failed']} failed, "
+                         f"{thumbs['evicted']} evicted.")
+    record_price_history(DATABASE_NAME)
+    manifest = write_snapshot(DATABASE_NAME, args.snapshot_dir)
+    print(f"📦 Snapshot {manifest['file']} ({manifest['bytes'] / 1024:.0f} KiB)")
+    watched = run_watchlist(args.snapshot_dir, args.watchlist, args.outbox)
+    if watched:
+        counts, alerts = watched
+        print(f"🧾 Since the last snapshot: {sum(c['added'] for c in counts.values())} added, "
+              f"{sum(c['removed'] for c in counts.values())} removed, {sum(c['repriced'] for c in counts.values())} repriced; "
+              f"{alerts} price alerts queued.")
         
     print("\n🎉 DATABASE UPDATED! You now have hundreds of products.")
\ No newline at end of file
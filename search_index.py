@@ -0,0 +1,123 @@
+"""Typo-tolerant product search.
+
+Each table gets an in-process trigram index, built once per published catalog snapshot.
+Queries are normalized the same way as names ("4060ti" -> "4060 ti"), the last query
+word counts as a prefix for typeahead, and results come back ranked as (table, id).
+
+    python search_index.py "ryzen 5 7600" [--table processors]
+"""
+import argparse
+import re
+import threading
+import time
+import weakref
+from math import ceil
+
+from catalog import TABLES, get_catalog
+
+# --- CONFIGURATION ---
+# A product must share this fraction of the query's trigrams to be a match at all.
+MIN_COVERAGE = 0.4
+DEFAULT_LIMIT = 10
+
+_SPLIT = re.compile(r'(?<=[a-z])(?=\d)|(?<=\d)(?=[a-z])')
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+def normalize(text):
+    """Lower-case words with letter/digit runs split apart: 'i5-12400F' -> ['i', '5', '12400', 'f']."""
+    return _NON_WORD.sub(' ', _SPLIT.sub(' ', text.lower())).split()
+
+def trigrams(words, prefix_last=False):
+    grams = set()
+    for i, word in enumerate(words):
+        padded = f" {word}" if prefix_last and i == len(words) - 1 else f" {word} "
+        if len(padded) < 3: padded += " "
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+# --- INDEX ---
+class TrigramIndex:
+    """Trigram postings over one table's rows, one entry per distinct name (its cheapest listing)."""
+
+    def __init__(self, rows):
+        by_name = {}
+        for row in rows: by_name.setdefault(row['name'], row)  # rows arrive price ascending
+        self.rows = list(by_name.values())
+        self.grams = [frozenset(trigrams(normalize(row['name']))) for row in self.rows]
+        self.postings = {}
+        for doc, grams in enumerate(self.grams):
+            for gram in grams: self.postings.setdefault(gram, []).append(doc)
+
+    def search(self, query, limit=DEFAULT_LIMIT, min_coverage=MIN_COVERAGE):
+        """[(score, row)] best first; score is query coverage plus a small similarity tie-breaker."""
+        query_grams = trigrams(normalize(query), prefix_last=True)
+        if not query_grams: return []
+        needed = max(1, ceil(len(query_grams) * min_coverage))
+        # Any product sharing `needed` trigrams must contain one of the len - needed + 1
+        # rarest ones, so only their postings need scoring.
+        by_rarity = sorted(query_grams, key=lambda g: len(self.postings.get(g, ())))
+        candidates = set()
+        for gram in by_rarity[:len(query_grams) - needed + 1]:
+            candidates.update(self.postings.get(gram, ()))
+        scored = []
+        for doc in candidates:
+            grams = self.grams[doc]
+            shared = len(query_grams & grams)
+            if shared < needed: continue
+            coverage = shared / len(query_grams)
+            similarity = shared / (len(query_grams) + len(grams) - shared)
+            scored.append((coverage + 0.1 * similarity, doc))
+        scored.sort(key=lambda s: (-s[0], -self.rows[s[1]]['price']))
+        return [(score, self.rows[doc]) for score, doc in scored[:limit]]
+
+class CatalogSearch:
+    """Per-table indexes for one catalog snapshot, each built on its first query."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def index(self, table):
+        with self._lock:
+            if table not in self._indexes:
+                self._indexes[table] = TrigramIndex(self.catalog.table(table).items)
+            return self._indexes[table]
+
+    def search(self, query, tables=None, limit=DEFAULT_LIMIT):
+        hits = []
+        for table in tables or TABLES:
+            hits.extend((score, table, row) for score, row in self.index(table).search(query, limit))
+        hits.sort(key=lambda h: (-h[0], -h[2]['price']))
+        return [(table, row['id']) for _, table, row in hits[:limit]]
+
+_searches = weakref.WeakKeyDictionary()
+_searches_lock = threading.Lock()
+
+def get_search(catalog):
+    with _searches_lock:
+        search = _searches.get(catalog)
+        if search is None: search = _searches[catalog] = CatalogSearch(catalog)
+        return search
+
+def search_products(query, tables=None, limit=DEFAULT_LIMIT, catalog=None):
+    """Ranked (table, id) pairs for a free-text, possibly misspelt or partial, query."""
+    catalog = catalog or get_catalog()
+    return get_search(catalog).search(query, tables, limit)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the product catalog")
+    parser.add_argument("query")
+    parser.add_argument("--table", action="append", help="Limit to this table (repeatable)")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    args = parser.parse_args()
+    catalog = get_catalog()
+    search = get_search(catalog)
+    for table in args.table or TABLES: search.index(table)
+    started = time.perf_counter()
+    results = search.search(args.query, args.table, args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    for table, row_id in results:
+        row = catalog.by_id(table, row_id)
+        print(f"  {table:<13} {row['price']:>8} ৳  {row['name']}")
+    print(f"{len(results)} results in {elapsed:.3f} ms")
@@ -0,0 +1,258 @@
+"""Immutable catalog snapshots: one read-optimized file per catalog version, plus a manifest.
+
+After a publish the scraper writes `snapshots/catalog-v<version>-<sha12>.bin` and then swaps
+`snapshots/manifest.json` to point at it; a snapshot file is never modified afterwards. The
+format is columnar: per table, rows presorted by (price, id), numbers as fixed-width arrays
+and text as an offsets array plus one UTF-8 blob, 8-byte aligned behind a JSON directory.
+Readers mmap the file, check its sha256 against the manifest and build one Catalog whose
+price, wattage and score columns are views into the mapping, shared by every session and
+thread. `get_live_catalog` re-reads the manifest every few seconds and swaps in a new
+version; builds still holding the previous catalog finish on it.
+
+    python snapshot.py --write --vacuum     # after a scrape: snapshot tech_data.db
+    python snapshot.py --verify             # load the current snapshot and check it
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from itertools import accumulate
+
+from catalog import DATABASE_NAME, PART_FIELDS, TABLES, Catalog, Part, get_catalog
+from metrics import count, sql_connect, sql_fetch, timer
+
+# --- CONFIGURATION ---
+SNAPSHOT_DIR = 'snapshots'
+MANIFEST = 'manifest.json'
+MAGIC = b'BDCS'
+FORMAT_VERSION = 1
+KEEP_SNAPSHOTS = 2                 # the current file and the one before it
+CHECK_INTERVAL = 5.0               # seconds between manifest checks
+ALIGN = 8
+_HEADER = struct.Struct('<4sHI')   # magic, format version, directory length
+
+# --- ENCODING ---
+def _encode_column(values):
+    """(typecode, data, null mask) for one column, or None when every value is null.
+
+    Null numbers are stored as 0 or NaN so the arrays stay usable as they are; the mask
+    (one byte per row, only written when there are nulls) restores them as None in Parts.
+    """
+    present = [v for v in values if v is not None]
+    if not present: return None
+    nulls = bytes(v is None for v in values) if len(present) < len(values) else b''
+    if all(type(v) is int for v in present):
+        typecode = 'i' if -2**31 <= min(present) and max(present) < 2**31 else 'q'
+        return typecode, array(typecode, [0 if v is None else v for v in values]).tobytes(), nulls
+    if all(type(v) in (int, float) for v in present):
+        return 'd', array('d', [float('nan') if v is None else v for v in values]).tobytes(), nulls
+    encoded = [b'' if v is None else str(v).encode() for v in values]
+    offsets = array('I', accumulate((len(b) for b in encoded), initial=0))
+    return 's', offsets.tobytes() + b''.join(encoded), nulls
+
+def encode(catalog):
+    """Snapshot bytes for a loaded catalog."""
+    directory = {'version': catalog.version, 'byteorder': sys.byteorder, 'tables': {}}
+    chunks, size = [], 0
+
+    def add(data):
+        nonlocal size
+        start, pad = size, -len(data) % ALIGN
+        chunks.extend((data, b'\0' * pad))
+        size += len(data) + pad
+        return start
+
+    for table in TABLES:
+        items = catalog.table(table).items
+        fields = list(PART_FIELDS) + sorted({key for part in items for key in (part.extra or ())})
+        columns = {}
+        for field in fields:
+            encoded = _encode_column([part.get(field) for part in items])
+            if encoded is None: continue
+            typecode, data, nulls = encoded
+            columns[field] = [typecode, add(data), len(data), add(nulls) if nulls else None]
+        directory['tables'][table] = {'rows': len(items), 'columns': columns}
+    head = json.dumps(directory, separators=(',', ':')).encode()
+    head += b' ' * (-(_HEADER.size + len(head)) % ALIGN)
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, len(head)) + head + b''.join(chunks)
+
+# --- READING ---
+class Snapshot:
+    """One memory-mapped snapshot file; numeric columns are read straight from the mapping."""
+
+    def __init__(self, path, sha256=None):
+        with open(path, 'rb') as f: self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.buffer = memoryview(self._map)
+        if sha256 is not None and hashlib.sha256(self.buffer).hexdigest() != sha256:
+            raise ValueError(f"{path} does not match its manifest checksum")
+        magic, version, length = _HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != FORMAT_VERSION: raise ValueError(f"{path} is not a v{FORMAT_VERSION} catalog snapshot")
+        directory = json.loads(bytes(self.buffer[_HEADER.size:_HEADER.size + length]))
+        if directory['byteorder'] != sys.byteorder: raise ValueError(f"{path} was written on a {directory['byteorder']}-endian machine")
+        self.version = directory['version']
+        self.tables = directory['tables']
+        self._payload = _HEADER.size + length
+
+    def _slice(self, offset, length):
+        return self.buffer[self._payload + offset:self._payload + offset + length]
+
+    def rows(self, table):
+        return self.tables.get(table, {}).get('rows', 0)
+
+    def column(self, table, name):
+        """Numbers as a memoryview into the mapping (nulls read as 0/NaN), text as a list of str; None if absent."""
+        entry = self.tables.get(table, {}).get('columns', {}).get(name)
+        if entry is None: return None
+        typecode, offset, length, _ = entry
+        view = self._slice(offset, length)
+        if typecode != 's': return view.cast(typecode)
+        split = 4 * (self.rows(table) + 1)
+        ends, blob = view[:split].cast('I'), bytes(view[split:])
+        return [blob[start:end].decode() for start, end in zip(ends, ends[1:])]
+
+    def text(self, table, name, row):
+        """One value of a text column, without decoding the rest of it."""
+        entry = self.tables.get(table, {}).get('columns', {}).get(name)
+        if entry is None: return None
+        typecode, offset, length, null_offset = entry
+        if null_offset is not None and self._slice(null_offset, self.rows(table))[row]: return None
+        split = 4 * (self.rows(table) + 1)
+        view = self._slice(offset, length)
+        ends = view[:split].cast('I')
+        return bytes(view[split + ends[row]:split + ends[row + 1]]).decode()
+
+    def parts(self, table):
+        """Parts of one table in (price, id) order, decoded once per snapshot."""
+        rows = self.rows(table)
+        columns = {}
+        for name, (typecode, _, _, null_offset) in self.tables.get(table, {}).get('columns', {}).items():
+            values = self.column(table, name)
+            if typecode != 's': values = values.tolist()
+            if null_offset is not None:
+                values = [None if null else value for value, null in zip(values, self._slice(null_offset, rows))]
+            columns[name] = values
+        return Part.from_columns(columns, rows)
+
+# --- MANIFEST ---
+def _atomic_write(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def read_manifest(snapshot_dir=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST)) as f: return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def write_snapshot(db_path=DATABASE_NAME, snapshot_dir=SNAPSHOT_DIR, keep=KEEP_SNAPSHOTS):
+    """Snapshots the database's active rows and points the manifest at the new file.
+
+    Unchanged content keeps the current file and manifest. Returns the manifest.
+    """
+    conn = sql_connect(db_path)
+    try:
+        version = sql_fetch(conn, "PRAGMA user_version", one=True)[0]
+    finally:
+        conn.close()
+    with timer('snapshot.write'):
+        catalog = Catalog.load(db_path, version=version)
+        data = encode(catalog)
+    digest = hashlib.sha256(data).hexdigest()
+    current = read_manifest(snapshot_dir)
+    if current and current['sha256'] == digest and os.path.exists(os.path.join(snapshot_dir, current['file'])): return current
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    name = f"catalog-v{version}-{digest[:12]}.bin"
+    _atomic_write(os.path.join(snapshot_dir, name), data)
+    manifest = {'format': FORMAT_VERSION, 'version': version, 'file': name, 'sha256': digest, 'bytes': len(data),
+                'rows': {table: len(catalog.table(table)) for table in TABLES},
+                'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'previous': current['file'] if current else None}
+    _atomic_write(os.path.join(snapshot_dir, MANIFEST), json.dumps(manifest, indent=2).encode())
+    _prune(snapshot_dir, keep, name)
+    return manifest
+
+def _prune(snapshot_dir, keep, current):
+    # Readers that mapped an older file keep their mapping; unlinking only frees the name.
+    files = [f for f in os.listdir(snapshot_dir) if f.startswith('catalog-v') and f.endswith('.bin') and f != current]
+    files.sort(key=lambda f: os.stat(os.path.join(snapshot_dir, f)).st_mtime_ns, reverse=True)
+    for name in files[max(keep - 1, 0):]: os.remove(os.path.join(snapshot_dir, name))
+
+def load_snapshot(snapshot_dir=SNAPSHOT_DIR, manifest=None):
+    """Catalog over the manifest's current snapshot, after checking its checksum."""
+    manifest = manifest or read_manifest(snapshot_dir)
+    if manifest is None: raise FileNotFoundError(f"No {MANIFEST} in {snapshot_dir}")
+    with timer('snapshot.load'):
+        return Catalog.from_snapshot(Snapshot(os.path.join(snapshot_dir, manifest['file']), manifest['sha256']))
+
+# --- PROCESS-WIDE CATALOG ---
+_reload_lock = threading.Lock()
+_state = {'catalog': None, 'dir': None, 'stamp': None, 'next_check': 0.0}
+
+def _manifest_stamp(snapshot_dir):
+    try:
+        st = os.stat(os.path.join(snapshot_dir, MANIFEST))
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+def get_live_catalog(snapshot_dir=SNAPSHOT_DIR, db_path=DATABASE_NAME):
+    """Shared catalog from the current snapshot, swapped for a newer one when the manifest moves.
+
+    The manifest is checked at most every CHECK_INTERVAL seconds. One caller loads a new
+    version while the others keep getting the current catalog, so nobody waits on a reload;
+    a snapshot that fails its checksum is skipped until the manifest changes again. Without
+    a manifest this is get_catalog(db_path).
+    """
+    current = _state['catalog'] if _state['dir'] == snapshot_dir else None
+    if current is not None and time.monotonic() < _state['next_check']: return current
+    if not _reload_lock.acquire(blocking=current is None): return current
+    try:
+        _state['next_check'] = time.monotonic() + CHECK_INTERVAL
+        stamp = _manifest_stamp(snapshot_dir)
+        if stamp is None: return get_catalog(db_path)
+        if stamp != _state['stamp'] or _state['dir'] != snapshot_dir:
+            try:
+                current = load_snapshot(snapshot_dir)
+                count('snapshot.swap')
+            except (OSError, ValueError, KeyError) as e:
+                count('snapshot.rejected')
+                print(f"⚠️ Snapshot in {snapshot_dir} rejected ({e}); keeping the current catalog")
+            _state.update(catalog=current, dir=snapshot_dir, stamp=stamp)
+        return current or get_catalog(db_path)
+    finally:
+        _reload_lock.release()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write and check catalog snapshots")
+    parser.add_argument("--db", default=DATABASE_NAME)
+    parser.add_argument("--dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--write", action="store_true", help="Snapshot --db and update the manifest")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM --db first so the committed file has no free pages")
+    parser.add_argument("--verify", action="store_true", help="Load the current snapshot and check its checksum")
+    args = parser.parse_args()
+
+    if args.vacuum:
+        conn = sql_connect(args.db)
+        conn.execute("VACUUM")
+        conn.close()
+    if args.write:
+        manifest = write_snapshot(args.db, args.dir)
+        print(f"📦 {manifest['file']}: {manifest['bytes'] / 1024:.0f} KiB, {sum(manifest['rows'].values())} rows")
+    if args.verify:
+        started = time.perf_counter()
+        catalog = load_snapshot(args.dir)
+        rows = sum(len(catalog.table(table)) for table in TABLES)
+        print(f"✅ v{catalog.version}: {rows} rows, loaded in {(time.perf_counter() - started) * 1000:.0f} ms")
@@ -0,0 +1,249 @@
+"""Rule-table spec classifier.
+
+Every piece of name-based spec knowledge (spec_tag, vendor, socket, RAM generation,
+PSU wattage, iGPU presence, storage interface) lives in RULES below; performance and
+power draw come from perf_model. Each category's rules are compiled once into a single
+regex that finds every feature in one scan of the name; the rules are then evaluated
+against that feature set.
+
+    python spec_rules.py --retag      # re-classify every row in tech_data.db in place
+"""
+import argparse
+import re
+import sqlite3
+
+# --- CONFIGURATION ---
+DATABASE_NAME = 'tech_data.db'
+TABLE_CATEGORIES = {'processors': 'CPU', 'motherboards': 'Motherboard', 'rams': 'RAM', 'ssds': 'SSD',
+                    'gpus': 'GPU', 'psus': 'PSU', 'casings': 'Casing'}
+# Materialized attribute columns and their SQLite types.
+ATTRIBUTE_COLUMNS = {'vendor': 'TEXT', 'socket': 'TEXT', 'ram_gen': 'TEXT', 'psu_watts': 'INTEGER',
+                     'has_igpu': 'INTEGER', 'storage_if': 'TEXT'}
+
+# Feature patterns match the upper-cased name. Plain strings are literals; re.compile()
+# objects are patterns. A feature that captures a number stores it as its value.
+FEATURES = {
+    'F_TOKEN': re.compile(r'(?<!\S)F(?!\S)'),
+    'INTEL_1200': re.compile(r'I[3579]-1[01]\d{3}'),
+    'INTEL_1700': re.compile(r'I[3579]-1[234]\d{3}'),
+    'RYZEN_AM4': re.compile(r'RYZEN [3579] [1-5]\d{3}'),
+    'RYZEN_AM5': re.compile(r'RYZEN [3579] [789]\d{3}'),
+    'WATTS': re.compile(r'(\d{3,4})\s*W'),
+}
+
+# (category, attribute, value, all_of, none_of) -- any_of is expressed as several rules.
+# For each attribute the first rule whose features are all present (and none_of absent) wins.
+RULES = [
+    # spec_tag: exactly what the scraper has always stored
+    ('RAM', 'spec_tag', 'DDR5', ['DDR5'], []),
+    ('RAM', 'spec_tag', 'DDR4', ['DDR4'], []),
+    ('RAM', 'spec_tag', 'DDR3', ['DDR3'], []),
+    ('SSD', 'spec_tag', 'NVMe', ['NVME'], []),
+    ('SSD', 'spec_tag', 'NVMe', ['M.2'], []),
+    ('SSD', 'spec_tag', 'SATA', [], []),
+    ('Motherboard', 'spec_tag', 'Intel', ['INTEL'], []),
+    ('Motherboard', 'spec_tag', 'Intel', ['LGA'], []),
+    ('Motherboard', 'spec_tag', 'AMD', ['AMD'], []),
+    ('Motherboard', 'spec_tag', 'AMD', ['AM4'], []),
+    ('Motherboard', 'spec_tag', 'AMD', ['AM5'], []),
+    ('GPU', 'spec_tag', 'Nvidia', ['RTX'], []),
+    ('GPU', 'spec_tag', 'Nvidia', ['GTX'], []),
+    ('GPU', 'spec_tag', 'AMD', ['RX'], []),
+    ('GPU', 'spec_tag', 'AMD', ['RADEON'], []),
+
+    # CPU
+    ('CPU', 'vendor', 'Intel', ['INTEL'], []),
+    ('CPU', 'vendor', 'AMD', ['AMD'], []),
+    ('CPU', 'vendor', 'AMD', ['RYZEN'], []),
+    ('CPU', 'socket', 'AM5', ['RYZEN_AM5'], []),
+    ('CPU', 'socket', 'AM4', ['RYZEN_AM4'], []),
+    ('CPU', 'socket', 'LGA1851', ['INTEL', 'ULTRA'], []),
+    ('CPU', 'socket', 'LGA1700', ['INTEL_1700'], []),
+    ('CPU', 'socket', 'LGA1200', ['INTEL_1200'], []),
+    # No integrated graphics: Intel F/KF parts, and Ryzen 5 parts that are neither G nor 7000+ series.
+    ('CPU', 'has_igpu', 0, ['INTEL', 'F_TOKEN'], []),
+    ('CPU', 'has_igpu', 0, ['INTEL', 'KF'], []),
+    ('CPU', 'has_igpu', 0, ['RYZEN', '5'], ['G', '7000', '8000', '9000']),
+    ('CPU', 'has_igpu', 1, [], []),
+
+    # Motherboard
+    ('Motherboard', 'vendor', 'Intel', ['INTEL'], []),
+    ('Motherboard', 'vendor', 'Intel', ['LGA'], []),
+    ('Motherboard', 'vendor', 'AMD', ['AMD'], []),
+    ('Motherboard', 'vendor', 'AMD', ['AM4'], []),
+    ('Motherboard', 'vendor', 'AMD', ['AM5'], []),
+] + [('Motherboard', 'vendor', 'Intel', [chipset], []) for chipset in ['H610', 'B660', 'H670', 'Z690', 'B760', 'H770', 'Z790', 'H510', 'B560', 'Z590', 'B860', 'Z890']] \
+  + [('Motherboard', 'vendor', 'AMD', [chipset], []) for chipset in ['A320', 'B450', 'A520', 'B550', 'X570', 'A620', 'B650', 'X670', 'B850', 'X870']] \
+  + [('Motherboard', 'socket', 'AM5', [key], []) for key in ['AM5', 'A620', 'B650', 'X670', 'B850', 'X870']] \
+  + [('Motherboard', 'socket', 'AM4', [key], []) for key in ['AM4', 'A320', 'B450', 'A520', 'B550', 'X570']] \
+  + [('Motherboard', 'socket', 'LGA1851', [key], []) for key in ['LGA1851', 'B860', 'Z890']] \
+  + [('Motherboard', 'socket', 'LGA1700', [key], []) for key in ['LGA1700', 'H610', 'B660', 'H670', 'Z690', 'B760', 'H770', 'Z790']] \
+  + [('Motherboard', 'socket', 'LGA1200', [key], []) for key in ['LGA1200', 'H510', 'B560', 'Z590']] \
+  + [
+    # DDR5 when the name says so or the chipset is DDR5-only, unless it is a D4 variant.
+    ('Motherboard', 'ram_gen', 'DDR4', ['D4'], []),
+] + [('Motherboard', 'ram_gen', 'DDR5', [key], []) for key in ['DDR5', ' D5 ', 'X670', 'B650', 'AM5', 'Z790', 'A620']] \
+  + [
+    ('Motherboard', 'ram_gen', 'DDR4', [], []),
+
+    # RAM
+    ('RAM', 'ram_gen', 'DDR5', ['DDR5'], []),
+    ('RAM', 'ram_gen', 'DDR4', ['DDR4'], []),
+    ('RAM', 'ram_gen', 'DDR3', ['DDR3'], []),
+
+    # SSD
+    ('SSD', 'storage_if', 'NVMe', ['NVME'], []),
+    ('SSD', 'storage_if', 'NVMe', ['M.2'], []),
+    ('SSD', 'storage_if', 'SATA', [], []),
+
+    # GPU
+    ('GPU', 'vendor', 'Nvidia', ['RTX'], []),
+    ('GPU', 'vendor', 'Nvidia', ['GTX'], []),
+    ('GPU', 'vendor', 'AMD', ['RX'], []),
+    ('GPU', 'vendor', 'AMD', ['RADEON'], []),
+    ('GPU', 'vendor', 'Intel', ['ARC'], []),
+
+    # PSU: the first "<digits> W" in the name; the value comes from the capture.
+    ('PSU', 'psu_watts', 'WATTS', ['WATTS'], []),
+    ('PSU', 'psu_watts', 0, [], []),
+]
+
+DEFAULTS = {'spec_tag': 'General', 'vendor': None, 'socket': None, 'ram_gen': None, 'psu_watts': None,
+            'has_igpu': None, 'storage_if': None}
+
+# --- COMPILER ---
+def _trie_pattern(literals):
+    """Regex for a set of literals, factored into a prefix trie so each position costs one branch."""
+    trie = {}
+    for literal in literals:
+        node = trie
+        for ch in literal: node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def walk(node):
+        branches = [re.escape(ch) + walk(child) for ch, child in sorted(node.items()) if ch]
+        if not branches: return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy, so the longest literal starting at a position is the one reported.
+        return f'(?:{body})?' if '' in node else body
+    return walk(trie)
+
+class CompiledRules:
+    """One category's rules: a single scanning regex plus the ordered rule lists per attribute."""
+
+    def __init__(self, category, rules):
+        self.rules = {}
+        names = []
+        for cat, attribute, value, all_of, none_of in rules:
+            if cat != category: continue
+            self.rules.setdefault(attribute, []).append((value, frozenset(all_of), frozenset(none_of)))
+            names.extend(all_of)
+            names.extend(none_of)
+        names = list(dict.fromkeys(names))
+        patterns = [n for n in names if n in FEATURES]
+        literals = [n for n in names if n not in FEATURES]
+        # Each literal also implies every shorter literal it starts with, since only the
+        # longest one at a position is reported.
+        self.implied = {lit: {other: other for other in literals if lit.startswith(other)} for lit in literals}
+        # Patterns first, then the literal trie, inside one lookahead so every start
+        # position is tried and overlapping features are all seen.
+        alternatives = [f'(?P<p{i}>{FEATURES[n].pattern})' for i, n in enumerate(patterns)]
+        if literals: alternatives.append(f'(?P<lit>{_trie_pattern(literals)})')
+        self.group_names = {f'p{i}': n for i, n in enumerate(patterns)}
+        self.regex = re.compile('(?=' + '|'.join(alternatives) + ')') if alternatives else None
+
+    def _features(self, name):
+        found = {}
+        if self.regex is None: return found
+        for match in self.regex.finditer(name):
+            group = match.lastgroup
+            text = match.group(group)
+            if group == 'lit':
+                found.update(self.implied[text])
+                continue
+            found.setdefault(self.group_names[group], text)
+            for lit, implied in self.implied.items():
+                if text.startswith(lit): found.update(implied)
+        return found
+
+    def classify(self, name):
+        features = self._features(name.upper())
+        present = features.keys()
+        out = dict(DEFAULTS)
+        for attribute, rules in self.rules.items():
+            for value, all_of, none_of in rules:
+                if all_of <= present and none_of.isdisjoint(present):
+                    out[attribute] = _resolve(value, features)
+                    break
+        return out
+
+def _resolve(value, features):
+    if isinstance(value, str) and value in FEATURES:
+        return int(FEATURES[value].match(features[value]).group(1))
+    return value
+
+_compiled = {category: CompiledRules(category, RULES) for category in set(TABLE_CATEGORIES.values())}
+
+def classify(name, category):
+    """All spec attributes for a product name, as a dict keyed by column name."""
+    compiled = _compiled.get(category)
+    return compiled.classify(name) if compiled else dict(DEFAULTS)
+
+def attribute_row(name, category):
+    """Attribute values in ATTRIBUTE_COLUMNS order, ready for an INSERT or UPDATE."""
+    attrs = classify(name, category)
+    return tuple(attrs[column] for column in ATTRIBUTE_COLUMNS)
+
+# --- SCHEMA ---
+def ensure_attribute_columns(conn, table):
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for column, sql_type in ATTRIBUTE_COLUMNS.items():
+        if column not in columns: conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}")
+
+# --- BULK RETAG ---
+def retag_table(conn, table, only_missing=False):
+    """Re-classifies one table from its stored names; returns how many rows changed."""
+    category = TABLE_CATEGORIES[table]
+    columns = ['spec_tag'] + list(ATTRIBUTE_COLUMNS)
+    where = " WHERE has_igpu IS NULL AND psu_watts IS NULL AND storage_if IS NULL AND ram_gen IS NULL" if only_missing else ""
+    updates = []
+    for row in conn.execute(f"SELECT id, name, {', '.join(columns)} FROM {table}{where}"):
+        attrs = classify(row[1] or "", category)
+        new = tuple(attrs[c] for c in columns)
+        if new != tuple(row[2:]): updates.append(new + (row[0],))
+    conn.executemany(f"UPDATE {table} SET {', '.join(c + ' = ?' for c in columns)} WHERE id = ?", updates)
+    return len(updates)
+
+def retag(db_path=DATABASE_NAME):
+    """Re-classifies every row in one transaction after a rule change; no scraping needed."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    changed_total = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in TABLE_CATEGORIES:
+            if table not in existing: continue
+            ensure_attribute_columns(conn, table)
+            changed = retag_table(conn, table)
+            changed_total += changed
+            print(f"  {table}: {changed} rows re-tagged")
+        # Bump the catalog version so running apps and the build table pick up the new tags.
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if changed_total: conn.execute(f"PRAGMA user_version = {version + 1}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return changed_total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spec classifier maintenance")
+    parser.add_argument("--retag", action="store_true", help="Re-classify every product in the database")
+    parser.add_argument("--db", default=DATABASE_NAME)
+    args = parser.parse_args()
+    if args.retag:
+        print(f"✅ Re-tagged {retag(args.db)} rows.")
+    else:
+        parser.print_help()
@@ -0,0 +1,83 @@
+"""Retailer adapters: which listing pages each store has, how they paginate and how a product card looks.
+
+Adding a store is one `Store(...)` entry in STORES. Its listings land in the same product
+tables as everyone else's, tagged with the store name, and offers.py merges them.
+"""
+from urllib.parse import urlsplit
+
+from extractors import STARTECH_SELECTORS, CardSelectors
+
+# --- CONFIGURATION ---
+DEFAULT_STORE = 'startech'
+# Safety cap; the real page count is read from each category's first page.
+MAX_PAGES = 50
+
+class Store:
+    """One retailer. `categories` is [(listing url, category name, table)]."""
+
+    def __init__(self, name, label, categories, selectors=STARTECH_SELECTORS, page_format='{url}?page={page}',
+                 max_pages=MAX_PAGES, rate=2.0, burst=2):
+        self.name = name
+        self.label = label
+        self.categories = categories
+        self.selectors = selectors
+        self.page_format = page_format
+        self.max_pages = max_pages
+        self.rate = rate
+        self.burst = burst
+
+    @property
+    def host(self):
+        return urlsplit(self.categories[0][0]).netloc
+
+    def page_url(self, url, page_num):
+        return self.page_format.format(url=url, page=page_num)
+
+    def listing_url(self, table):
+        return next(url for url, _, t in self.categories if t == table)
+
+    def first_pages(self, tables=None):
+        """((store, table, 1), url) for every category; later pages are discovered from these."""
+        return [((self.name, table, 1), self.page_url(url, 1))
+                for url, _, table in self.categories if tables is None or table in tables]
+
+    def category_names(self):
+        return {table: category for _, category, table in self.categories}
+
+STORES = {store.name: store for store in [
+    Store('startech', 'Star Tech', [
+        ("https://www.startech.com.bd/component/processor", "CPU", "processors"),
+        ("https://www.startech.com.bd/component/motherboard", "Motherboard", "motherboards"),
+        ("https://www.startech.com.bd/component/ram", "RAM", "rams"),
+        ("https://www.startech.com.bd/component/graphics-card", "GPU", "gpus"),
+        ("https://www.startech.com.bd/ssd", "SSD", "ssds"),
+        ("https://www.startech.com.bd/component/power-supply", "PSU", "psus"),
+        ("https://www.startech.com.bd/component/casing", "Casing", "casings"),
+    ]),
+    # OpenCart/Journal theme: special prices sit in span.price-new, regular ones in span.price-normal.
+    Store('techland', 'Techland BD', [
+        ("https://www.techlandbd.com/pc-components/processor", "CPU", "processors"),
+        ("https://www.techlandbd.com/pc-components/motherboard", "Motherboard", "motherboards"),
+        ("https://www.techlandbd.com/pc-components/shop-desktop-ram", "RAM", "rams"),
+        ("https://www.techlandbd.com/pc-components/graphics-card", "GPU", "gpus"),
+        ("https://www.techlandbd.com/pc-components/solid-state-drive", "SSD", "ssds"),
+        ("https://www.techlandbd.com/pc-components/power-supply", "PSU", "psus"),
+        ("https://www.techlandbd.com/pc-components/computer-case", "Casing", "casings"),
+    ], selectors=CardSelectors(('div', 'product-layout'), ('div', 'name'), ('div', 'price'), ('span', 'price-new')),
+       rate=1.0),
+    # Ryans prints the price as plain text in the price paragraph.
+    Store('ryans', 'Ryans Computers', [
+        ("https://www.ryanscomputers.com/category/desktop-component-processor", "CPU", "processors"),
+        ("https://www.ryanscomputers.com/category/desktop-component-motherboard", "Motherboard", "motherboards"),
+        ("https://www.ryanscomputers.com/category/desktop-component-desktop-ram", "RAM", "rams"),
+        ("https://www.ryanscomputers.com/category/desktop-component-graphics-card", "GPU", "gpus"),
+        ("https://www.ryanscomputers.com/category/desktop-component-ssd", "SSD", "ssds"),
+        ("https://www.ryanscomputers.com/category/desktop-component-power-supply", "PSU", "psus"),
+        ("https://www.ryanscomputers.com/category/desktop-component-casing", "Casing", "casings"),
+    ], selectors=CardSelectors(('div', 'category-single-product'), ('p', 'card-text'), ('p', 'pr-text'), None),
+       page_format='{url}?limit=60&page={page}', rate=1.0),
+]}
+
+def store_label(name):
+    store = STORES.get(name)
+    return store.label if store else (name or '')
@@ -0,0 +1,216 @@
+"""80px product thumbnails, downloaded once and served from the app's own static folder.
+
+After a publish every live listing's image_url is checked against static/thumbs/index.json
+(source url -> ETag, Last-Modified, thumbnail digest). New URLs are downloaded by a bounded
+thread pool through FetchEngine (per-host rate limits, retries, circuit breaker); known ones
+are revalidated with If-None-Match / If-Modified-Since at most every REVALIDATE_DAYS, and a
+304 or an unchanged ETag keeps the thumbnail. Decoding and resizing run in a process pool
+while downloads continue. Thumbnails are content-addressed, static/thumbs/<sha256>.jpg, so
+identical images share one file and a file never changes; each row's `thumb` column names
+its file. Past MAX_CACHE_BYTES, files no live listing uses go first, oldest first.
+
+Streamlit serves the folder at ./app/static/thumbs/ (server.enableStaticServing); with a
+?v= query its static handler sends a far-future Cache-Control, which is safe because a
+name never gets new content.
+
+    python thumbnails.py                  # after a scrape
+    python thumbnails.py --max-mb 32 --concurrency 4
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from catalog import DATABASE_NAME, TABLES
+from fetch_engine import FetchEngine
+from metrics import count, sql_connect, timer
+from offers import ACTIVE_GONE
+from stores import STORES
+
+# --- CONFIGURATION ---
+THUMB_DIR = os.path.join('static', 'thumbs')
+STATIC_URL = './app/static/thumbs'
+INDEX = 'index.json'
+IMAGE_COLUMNS = ('image_url', 'thumb')
+THUMB_SIZE = 80
+JPEG_QUALITY = 85
+MAX_CACHE_BYTES = 64 << 20
+MAX_IMAGE_BYTES = 5 << 20          # anything bigger is not a product photo
+REVALIDATE_DAYS = 7
+DOWNLOAD_CONCURRENCY = 8
+
+def thumb_name(digest):
+    return f"{digest}.jpg"
+
+def thumb_url(digest):
+    """URL of a thumbnail under Streamlit's static serving; ?v= makes it cacheable for good."""
+    return f"{STATIC_URL}/{thumb_name(digest)}?v={digest[:12]}"
+
+# --- RESIZING (runs in the worker pool) ---
+def make_thumbnail(data, size=THUMB_SIZE):
+    """JPEG bytes of an image scaled to fit size x size, transparency flattened onto white."""
+    from PIL import Image
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail((size, size))
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            flat = Image.new('RGB', image.size, 'white')
+            flat.paste(image, mask=image.getchannel('A'))
+            image = flat
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        out = io.BytesIO()
+        image.save(out, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    return out.getvalue()
+
+# --- CACHE ---
+def load_index(root=THUMB_DIR):
+    try:
+        with open(os.path.join(root, INDEX)) as f: return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_index(root, index):
+    path = os.path.join(root, INDEX)
+    with open(f"{path}.tmp", 'w') as f: json.dump(index, f, separators=(',', ':'))
+    os.replace(f"{path}.tmp", path)
+
+def store_thumbnail(root, data):
+    """Writes a thumbnail under its content hash (once) and returns the hash."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(root, thumb_name(digest))
+    if not os.path.exists(path):
+        with open(f"{path}.tmp", 'wb') as f: f.write(data)
+        os.replace(f"{path}.tmp", path)
+    return digest
+
+def evict(root, max_bytes, live):
+    """Deletes thumbnails until the folder fits in max_bytes: unused ones first, then oldest. Returns the deleted digests."""
+    files = []
+    for name in os.listdir(root):
+        if not name.endswith('.jpg'): continue
+        st = os.stat(os.path.join(root, name))
+        files.append((name[:-4] in live, st.st_mtime, name, st.st_size))
+    total = sum(size for *_, size in files)
+    evicted = set()
+    for _, _, name, size in sorted(files):
+        if total <= max_bytes: break
+        os.remove(os.path.join(root, name))
+        evicted.add(name[:-4])
+        total -= size
+    return evicted
+
+def _conditional(entry):
+    headers = {}
+    if entry and entry.get('etag'): headers['If-None-Match'] = entry['etag']
+    if entry and entry.get('last_modified'): headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+# --- PIPELINE ---
+def update_thumbnails(db_path=DATABASE_NAME, root=THUMB_DIR, max_bytes=MAX_CACHE_BYTES, concurrency=DOWNLOAD_CONCURRENCY, workers=None):
+    """Brings every live listing's thumbnail up to date and records it in the `thumb` column.
+
+    Returns counts: downloaded, not_modified, failed, evicted, rows updated.
+    """
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("⚠️ Pillow is not installed; skipping thumbnails.")
+        return None
+    os.makedirs(root, exist_ok=True)
+    conn = sql_connect(db_path, isolation_level=None)
+    users = {}   # image url -> [(table, row id, current thumb)]
+    for table in TABLES:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if not set(IMAGE_COLUMNS) <= columns: continue
+        for row_id, image_url, thumb in conn.execute(f"SELECT id, image_url, thumb FROM {table} WHERE active != {ACTIVE_GONE} AND image_url IS NOT NULL AND image_url != ''"):
+            users.setdefault(image_url, []).append((table, row_id, thumb))
+
+    index = load_index(root)
+    today = int(time.time() // 86400)
+    def cached(url):
+        entry = index.get(url)
+        return entry if entry and os.path.exists(os.path.join(root, thumb_name(entry['digest']))) else None
+    due = [url for url in users if not cached(url) or today - cached(url)['checked'] >= REVALIDATE_DAYS]
+    stats = {'images': len(users), 'downloaded': 0, 'not_modified': 0, 'failed': 0, 'evicted': 0, 'rows': 0}
+
+    limits = {store.host: (store.rate, store.burst) for store in STORES.values()}
+    with timer('thumbnails.update'), FetchEngine(concurrency=concurrency, host_limits=limits) as engine, \
+         ThreadPoolExecutor(max_workers=engine.concurrency) as downloads, ProcessPoolExecutor(max_workers=workers) as resizers:
+        fetches = {downloads.submit(engine.fetch_response, url, _conditional(cached(url))): url for url in due}
+        resizes = {}
+        for future in as_completed(fetches):
+            url = fetches[future]
+            entry = cached(url)
+            try:
+                response = future.result()
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"❌ Image {url}: {e}")
+                continue
+            etag = response.headers.get('ETag')
+            if entry and (response.status_code == 304 or (etag and etag == entry.get('etag'))):
+                entry['checked'] = today
+                stats['not_modified'] += 1
+                continue
+            if len(response.content) > MAX_IMAGE_BYTES:
+                stats['failed'] += 1
+                continue
+            meta = {'etag': etag, 'last_modified': response.headers.get('Last-Modified'), 'checked': today}
+            resizes[resizers.submit(make_thumbnail, response.content)] = (url, meta)
+            count('thumbnails.downloaded')
+        for future in as_completed(resizes):
+            url, meta = resizes[future]
+            try:
+                index[url] = dict(meta, digest=store_thumbnail(root, future.result()))
+                stats['downloaded'] += 1
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"❌ Image {url} could not be thumbnailed: {e}")
+
+    # Everything still in use counts as just used, so eviction takes the unused and stale first.
+    live = {index[url]['digest'] for url in users if url in index}
+    now = time.time()
+    for digest in live:
+        path = os.path.join(root, thumb_name(digest))
+        if os.path.exists(path): os.utime(path, (now, now))
+    evicted = evict(root, max_bytes, live)
+    stats['evicted'] = len(evicted)
+    # Entries outlive their listings while the file is kept, so a product that comes back is not downloaded again.
+    for url in [url for url in index if not cached(url)]: del index[url]
+    save_index(root, index)
+
+    updates = {}
+    for url, rows in users.items():
+        digest = index[url]['digest'] if url in index else None
+        for table, row_id, thumb in rows:
+            if thumb != digest: updates.setdefault(table, []).append((digest, row_id))
+    # user_version is left alone: thumbnails are not a price change (precompute_builds keys on it), and
+    # the snapshot written after this stage carries them to the app.
+    if updates:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table, rows in updates.items(): conn.executemany(f"UPDATE {table} SET thumb = ? WHERE id = ?", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    conn.close()
+    stats['rows'] = sum(len(rows) for rows in updates.values())
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download and thumbnail product images")
+    parser.add_argument("--db", default=DATABASE_NAME)
+    parser.add_argument("--dir", default=THUMB_DIR)
+    parser.add_argument("--max-mb", type=float, default=MAX_CACHE_BYTES / (1 << 20), help="Size cap for the thumbnail folder")
+    parser.add_argument("--concurrency", type=int, default=DOWNLOAD_CONCURRENCY, help="Parallel image downloads")
+    parser.add_argument("--workers", type=int, default=None, help="Resizing processes (default: CPU count)")
+    args = parser.parse_args()
+
+    stats = update_thumbnails(args.db, args.dir, int(args.max_mb * (1 << 20)), args.concurrency, args.workers)
+    if stats: print(f"🖼️ {stats['images']} images: {stats['downloaded']} new thumbnails, {stats['not_modified']} unchanged, "
+                    f"{stats['failed']} failed, {stats['evicted']} evicted, {stats['rows']} rows updated.")
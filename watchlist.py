@@ -0,0 +1,227 @@
+"""What changed since the last scrape, and price-drop alerts for watched parts.
+
+A publish writes a new snapshot; the one before it is still on disk (snapshot.KEEP_SNAPSHOTS),
+so the diff is one hash join of the two files on each row's product key (offers.py's hash
+of the normalized name, so a product whose cheapest offer moved to another store counts as
+repriced, not removed and added). Numbers come straight from the mapped columns and names
+are only decoded for rows that trigger an alert.
+
+Watches live in watchlist.db: a product with a target price, or a whole category with a
+price ceiling. They are indexed once per run (a dict by product, sorted ceilings per table),
+so each change costs a lookup and a bisect however many watches there are. A watch fires
+when the price crosses under its target; matches are appended to outbox.jsonl, which a
+notifier reads from its own saved offset.
+
+    python watchlist.py --diff                                   # changes since the previous snapshot
+    python watchlist.py --watch gpus --id 42 --target 40000      # one product under a price
+    python watchlist.py --watch gpus --target 30000 --owner me   # anything in a category under a price
+    python watchlist.py --drain                                  # print new outbox messages
+"""
+import argparse
+import json
+import os
+import time
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from catalog import DATABASE_NAME, TABLES, get_catalog
+from metrics import count, sql_connect, timer
+from snapshot import SNAPSHOT_DIR, Snapshot, read_manifest
+
+# --- CONFIGURATION ---
+WATCHLIST_DB = 'watchlist.db'
+OUTBOX = 'outbox.jsonl'
+
+Watch = namedtuple('Watch', 'id owner table product_key product_id target')
+
+# --- DIFF ---
+def _keyed(snapshot, table):
+    """(keys, prices) of one snapshot table; rows without a product key fall back to their id."""
+    ids = snapshot.column(table, 'id')
+    if ids is None: return [], []
+    prices = snapshot.column(table, 'price').tolist()
+    keys = snapshot.column(table, 'product_key') or [''] * len(ids)
+    return [key or f"#{row_id}" for key, row_id in zip(keys, ids.tolist())], prices
+
+def diff_snapshots(old, new):
+    """{table: [(product_key, old_price, new_price, row)]} from one pass over each snapshot.
+
+    old_price is None for an added product and new_price None for a removed one, as in the
+    scraper's change report; row indexes the new snapshot, or the old one for removals.
+    """
+    changes = {}
+    with timer('watchlist.diff'):
+        for table in TABLES:
+            old_keys, old_prices = _keyed(old, table)
+            before = {key: (row, price) for row, (key, price) in enumerate(zip(old_keys, old_prices))}
+            table_changes = []
+            for row, (key, price) in enumerate(zip(*_keyed(new, table))):
+                previous = before.pop(key, None)
+                if previous is None: table_changes.append((key, None, price, row))
+                elif previous[1] != price: table_changes.append((key, previous[1], price, row))
+            table_changes.extend((key, price, None, row) for key, (row, price) in before.items())
+            if table_changes: changes[table] = table_changes
+    return changes
+
+def summarize(changes):
+    """{table: {'added', 'removed', 'repriced'}} counts."""
+    return {table: {'added': sum(old is None for _, old, _, _ in entries),
+                    'removed': sum(new is None for _, _, new, _ in entries),
+                    'repriced': sum(old is not None and new is not None for _, old, new, _ in entries)}
+            for table, entries in changes.items()}
+
+def snapshot_pair(snapshot_dir=SNAPSHOT_DIR):
+    """(previous, current) Snapshots named by the manifest, or None when there is nothing to compare."""
+    manifest = read_manifest(snapshot_dir)
+    if not manifest or not manifest.get('previous'): return None
+    previous = os.path.join(snapshot_dir, manifest['previous'])
+    if not os.path.exists(previous): return None
+    return Snapshot(previous), Snapshot(os.path.join(snapshot_dir, manifest['file']), manifest['sha256'])
+
+# --- WATCHES ---
+def connect_watchlist(path=WATCHLIST_DB):
+    conn = sql_connect(path, isolation_level=None)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS watches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            owner TEXT, table_name TEXT NOT NULL, product_key TEXT, product_id INTEGER,
+            target_price INTEGER NOT NULL, created TEXT
+        )
+    ''')
+    return conn
+
+def add_watch(conn, table, target_price, product_id=None, owner=None, catalog=None):
+    """Watches one product (by catalog id) or, without product_id, the whole table. Returns the watch id."""
+    if table not in TABLES: raise ValueError(f"Unknown table: {table}")
+    product_key = None
+    if product_id is not None:
+        item = (catalog or get_catalog()).by_id(table, product_id)
+        if item is None: raise ValueError(f"No {table} row with id {product_id}")
+        product_key = item.get('product_key') or f"#{product_id}"
+    cursor = conn.execute("INSERT INTO watches (owner, table_name, product_key, product_id, target_price, created) VALUES (?, ?, ?, ?, ?, ?)",
+                          (owner, table, product_key, product_id, int(target_price), datetime.now(timezone.utc).isoformat(timespec='seconds')))
+    return cursor.lastrowid
+
+def load_watches(conn):
+    return [Watch(*row) for row in conn.execute("SELECT id, owner, table_name, product_key, product_id, target_price FROM watches")]
+
+class WatchIndex:
+    """Watches indexed for change lookups: product watches by (table, product_key), category
+    watches as ceilings sorted per table."""
+
+    def __init__(self, watches):
+        self.by_product = {}
+        ceilings = {}
+        for watch in watches:
+            if watch.product_key: self.by_product.setdefault((watch.table, watch.product_key), []).append(watch)
+            else: ceilings.setdefault(watch.table, []).append(watch)
+        self.ceilings = {}
+        for table, entries in ceilings.items():
+            entries.sort(key=lambda w: w.target)
+            self.ceilings[table] = ([w.target for w in entries], entries)
+
+    def matches(self, table, product_key, old_price, new_price):
+        """Watches whose target this change crosses: new_price <= target < old_price (any target for a new listing)."""
+        if new_price is None: return []
+        above = old_price if old_price is not None else float('inf')
+        hits = [w for w in self.by_product.get((table, product_key), ()) if new_price <= w.target < above]
+        targets, entries = self.ceilings.get(table, ((), ()))
+        hits.extend(entries[bisect_left(targets, new_price):bisect_left(targets, above)])
+        return hits
+
+def evaluate(changes, watches, snapshot, version=None):
+    """Outbox messages for every watch a set of changes fires."""
+    index = WatchIndex(watches)
+    messages = []
+    with timer('watchlist.evaluate'):
+        for table, entries in changes.items():
+            for product_key, old_price, new_price, row in entries:
+                for watch in index.matches(table, product_key, old_price, new_price):
+                    messages.append({'id': f"{watch.id}:{version}:{product_key}", 'watch': watch.id, 'owner': watch.owner,
+                                     'table': table, 'product_key': product_key, 'target': watch.target,
+                                     'old_price': old_price, 'price': new_price,
+                                     'name': snapshot.text(table, 'name', row), 'url': snapshot.text(table, 'url', row),
+                                     'store': snapshot.text(table, 'store', row), 'version': version})
+    count('watchlist.matches', len(messages))
+    return messages
+
+# --- OUTBOX ---
+def append_outbox(messages, path=OUTBOX):
+    """Appends one JSON line per message; a line is either fully written or, after a crash, the last and partial one."""
+    if not messages: return 0
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(''.join(json.dumps(m, ensure_ascii=False) + '\n' for m in messages))
+        f.flush()
+        os.fsync(f.fileno())
+    return len(messages)
+
+def read_outbox(path=OUTBOX, offset=0):
+    """(messages, next_offset) after byte `offset`; a trailing partial line is left for the next read."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], offset
+    complete = data[:data.rfind(b'\n') + 1]
+    return [json.loads(line) for line in complete.splitlines() if line.strip()], offset + len(complete)
+
+# --- PIPELINE ---
+def run_watchlist(snapshot_dir=SNAPSHOT_DIR, watch_db=WATCHLIST_DB, outbox=OUTBOX):
+    """Diffs the two newest snapshots and queues alerts for the watches they fire.
+
+    Returns (summary, alerts queued), or None when there is no previous snapshot.
+    """
+    pair = snapshot_pair(snapshot_dir)
+    if pair is None: return None
+    previous, current = pair
+    changes = diff_snapshots(previous, current)
+    queued = 0
+    if os.path.exists(watch_db):
+        conn = connect_watchlist(watch_db)
+        try:
+            watches = load_watches(conn)
+        finally:
+            conn.close()
+        queued = append_outbox(evaluate(changes, watches, current, current.version), outbox)
+    return summarize(changes), queued
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshot diffs and price-drop alerts")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--db", default=WATCHLIST_DB, help="Watchlist database")
+    parser.add_argument("--outbox", default=OUTBOX)
+    parser.add_argument("--diff", action="store_true", help="Show what changed between the previous and current snapshot")
+    parser.add_argument("--watch", choices=TABLES, help="Add a watch on this table")
+    parser.add_argument("--id", type=int, help="Product id to watch (default: the whole table)")
+    parser.add_argument("--target", type=int, help="Alert when the price drops to this or below")
+    parser.add_argument("--owner", default=None)
+    parser.add_argument("--catalog-db", default=DATABASE_NAME, help="Database used to resolve --id")
+    parser.add_argument("--evaluate", action="store_true", help="Diff the two newest snapshots and queue alerts")
+    parser.add_argument("--drain", action="store_true", help="Print outbox messages not printed before")
+    args = parser.parse_args()
+
+    if args.watch:
+        if args.target is None: parser.error("--watch needs --target")
+        conn = connect_watchlist(args.db)
+        watch_id = add_watch(conn, args.watch, args.target, args.id, args.owner, get_catalog(args.catalog_db) if args.id else None)
+        conn.close()
+        print(f"🔔 Watch {watch_id}: {args.watch} {'#' + str(args.id) if args.id else '(any)'} at or under {args.target} ৳")
+    if args.diff:
+        pair = snapshot_pair(args.dir)
+        if pair is None: parser.exit(1, "No previous snapshot to compare with.\n")
+        started = time.perf_counter()
+        changes = diff_snapshots(*pair)
+        for table, counts in summarize(changes).items():
+            print(f"{table:13} +{counts['added']:<6} -{counts['removed']:<6} ~{counts['repriced']}")
+        print(f"✅ v{pair[0].version} → v{pair[1].version} in {(time.perf_counter() - started) * 1000:.0f} ms")
+    if args.evaluate:
+        result = run_watchlist(args.dir, args.db, args.outbox)
+        print("No previous snapshot to compare with." if result is None else f"📬 {result[1]} alerts queued in {args.outbox}")
+    if args.drain:
+        cursor = f"{args.outbox}.offset"
+        offset = int(open(cursor).read() or 0) if os.path.exists(cursor) else 0
+        messages, offset = read_outbox(args.outbox, offset)
+        for m in messages: print(f"🔔 {m['name']}: {m['price']} ৳ (target {m['target']} ৳) {m['url']}")
+        with open(cursor, 'w') as f: f.write(str(offset))
@@ -1,6 +1,17 @@
 import streamlit as st
-import sqlite3
-import re
+
+import metrics
+from build_engine import generate_pc_build, get_alternatives, get_gpu_recommendations
+from build_solver import SLOT_TABLES, rebalance_build
+from cpu_matrix import cpu_build_matrix
+from part_rules import calculate_power_breakdown, get_cpu_type, get_ram_type, get_wattage, is_gpu_mandatory
+from perf_model import TIER_NAMES
+from precompute_builds import lookup_build
+from price_history import get_history
+from search_index import search_products
+from snapshot import get_live_catalog
+from stores import store_label
+from thumbnails import thumb_url
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -9,116 +20,93 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="collapsed"
 )
+metrics.start_trace()
 
-# --- DATABASE CONNECTION ---
-def get_db_connection():
+# --- CATALOG SNAPSHOT ---
+# One memory-mapped snapshot shared by every session; a newly published one is picked up on
+# the next rerun, while reruns already building keep the catalog they started with.
+def load_catalog():
     try:
-        conn = sqlite3.connect('tech_data.db')
-        conn.row_factory = sqlite3.Row
-        return conn
+        return get_live_catalog()
     except Exception as e:
         st.error(f"Database Error: {e}")
         return None
 
-# --- HELPER: GET ALL CPUS ---
-def get_all_cpus():
-    conn = get_db_connection()
-    if not conn: return []
-    cursor = conn.cursor()
-    cursor.execute("SELECT name, price FROM processors ORDER BY price DESC")
-    rows = cursor.fetchall()
-    conn.close()
-    return [f"{row['name']} ({row['price']} ৳)" for row in rows]
-
-# --- HELPER: CPU PARSER ---
-def get_cpu_object(selection_string):
-    if not selection_string: return None
-    name = selection_string.rsplit(' (', 1)[0]
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM processors WHERE name = ?", (name,))
-    row = cursor.fetchone()
-    conn.close()
-    return dict(row) if row else None
-
-# --- HELPER: WATTAGE PARSER ---
-def get_wattage(name):
-    match = re.search(r'(\d{3,4})\s*[Ww]', name) 
-    if match: return int(match.group(1))
-    return 0 
-
-# --- HELPER: MANDATORY GPU CHECK ---
-def is_gpu_mandatory(cpu_name):
-    name = cpu_name.upper()
-    if "INTEL" in name and ("F" in name.split() or "KF" in name): return True
-    if "RYZEN" in name and "5" in name and "G" not in name and "7000" not in name and "8000" not in name and "9000" not in name:
-         return True
-    return False
-
-# --- HELPER: BOTTLENECK CALCULATOR ---
-def check_bottleneck(cpu_price, gpu_price):
-    if gpu_price == 0: return None
-    ratio = gpu_price / cpu_price
-    if ratio < 0.5:
-        return f"⚠️ **Bottleneck Detected:** GPU is significantly weaker than CPU."
-    return None
-
-# --- NEW HELPER: GPU RECOMMENDATIONS ---
-def get_gpu_recommendations(cpu_price):
-    """Categorizes GPUs based on price ratio with CPU"""
-    conn = get_db_connection()
-    if not conn: return [], []
-    cursor = conn.cursor()
-    
-    # Get all GPUs
-    cursor.execute("SELECT * FROM gpus ORDER BY price DESC")
-    all_gpus = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    
-    preferred = []
-    risky = []
-    
-    for gpu in all_gpus:
-        price = gpu['price']
-        if price <= 0: continue
-        
-        ratio = price / cpu_price
-        
-        # Logic: 0.6x to 2.5x is the "Sweet Spot"
-        if 0.6 <= ratio <= 2.5:
-            preferred.append(gpu)
-        else:
-            risky.append(gpu)
-            
-    # Limit lists to avoid UI clutter
-    return preferred[:10], risky[:10] # Top 10 of each
-
-# --- HELPER: POWER BREAKDOWN ---
-def calculate_power_breakdown(parts):
-    breakdown = { "Base System": 100, "CPU": 0, "GPU": 0, "Storage": 0, "Total": 0 }
-    if 'CPU' in parts:
-        name = parts['CPU']['name'].upper()
-        watts = 100 
-        if "I9" in name or "RYZEN 9" in name: watts = 300
-        elif "I7" in name or "RYZEN 7" in name: watts = 250
-        elif "I5" in name or "RYZEN 5" in name: watts = 150
-        breakdown["CPU"] = watts
-    if 'Graphics Card' in parts:
-        name = parts['Graphics Card']['name'].upper()
-        watts = 150 
-        if "4090" in name: watts = 500
-        elif "4080" in name: watts = 350
-        elif "7900" in name: watts = 360
-        elif "4070" in name: watts = 300 if ("TI" in name or "SUPER" in name) else 240
-        elif "7800" in name or "6900" in name: watts = 300
-        elif "3080" in name: watts = 350
-        elif "4060" in name or "3060" in name: watts = 180
-        elif "7700" in name or "6700" in name: watts = 260
-        elif "3050" in name or "6600" in name: watts = 140
-        breakdown["GPU"] = watts
-    if 'Storage' in parts: breakdown["Storage"] = 15
-    breakdown["Total"] = sum(breakdown.values())
-    return breakdown
+# --- HELPER: CPU PICKER ---
+def get_cpu_ids(catalog, query=None):
+    """Processor ids for the picker: search-ranked when there is a query, else most expensive first."""
+    if not catalog: return []
+    if query and query.strip():
+        return [row_id for _, row_id in search_products(query, ["processors"], limit=25, catalog=catalog)]
+    return [row['id'] for row in catalog.table("processors").items[::-1]]
+
+def cpu_label(catalog, cpu_id):
+    row = catalog.by_id("processors", cpu_id)
+    return row.label if row else str(cpu_id)
+
+# --- HELPER: STORE CAPTION ---
+def offer_caption(item):
+    if not item.get('store'): return None
+    if (item.get('offers') or 1) > 1: return f"🏬 {store_label(item['store'])} · cheapest of {item['offers']} stores"
+    return f"🏬 {store_label(item['store'])}"
+
+# --- HELPER: PERFORMANCE TIER ---
+def perf_caption(item):
+    if not item.get('perf_tier'): return None
+    return f"🏎️ {TIER_NAMES[item['perf_tier']]} tier · score {item['perf_score']:g}"
+
+# --- HELPER: GOOD TIME TO BUY ---
+BUY_ICONS = {'good': "🟢 Good time to buy", 'high': "🔴 Pricier than usual", 'typical': "⚪ Typical price"}
+
+def buy_caption(part_type, item):
+    signal, reason = get_history().buy_signal(SLOT_TABLES[part_type], item['id'], item['price'])
+    return f"{BUY_ICONS[signal]}: {reason}" if signal else None
+
+# --- HELPER: PRODUCT THUMBNAIL ---
+def render_thumbnail(item):
+    # The local 80px copy from thumbnails.py; the retailer's full-size image is never hot-linked.
+    if item.get('thumb'): st.markdown(f'<img src="{thumb_url(item["thumb"])}" width="80" alt="">', unsafe_allow_html=True)
+    else: st.write("📦")
+
+# --- HELPER: CPU LOOKUP ---
+def get_cpu_object(catalog, cpu_id):
+    if cpu_id is None or not catalog: return None
+    return catalog.by_id("processors", cpu_id)
+
+# --- HELPER: SESSION BUILD ---
+# A session keeps part ids and the catalog version only; the parts themselves are the
+# shared catalog rows, looked up again on every rerun.
+def session_build(parts, gpu_forced, advice, catalog, budget, mode="optimal", pinned=()):
+    return {"part_ids": {slot: item['id'] for slot, item in parts.items()}, "catalog_version": catalog.version,
+            "gpu_forced": gpu_forced, "advice": advice, "budget": budget, "mode": mode, "pinned": list(pinned)}
+
+def resolve_parts(catalog, part_ids):
+    """({slot: part}, [slots whose listing is gone]) against the current catalog."""
+    parts, missing = {}, []
+    for slot, row_id in part_ids.items():
+        item = catalog.by_id(SLOT_TABLES[slot], row_id) if catalog else None
+        if item is None: missing.append(slot)
+        else: parts[slot] = item
+    return parts, missing
+
+# --- HELPER: SWAP ---
+# A swapped part is pinned and the build re-solved around it: only the slots that depend on
+# it (PSU after a GPU, RAM after a motherboard...) move, unless the budget forces more.
+def apply_swap(slot, item, catalog):
+    data = st.session_state.build_results
+    data['part_ids'][slot] = item['id']
+    pinned = data.setdefault('pinned', [])
+    if slot not in pinned: pinned.append(slot)
+    parts, missing = resolve_parts(catalog, data['part_ids'])
+    if missing or not catalog: return
+    rank = 'performance' if data.get('mode') == 'performance' else 'price'
+    with metrics.timer('ui.rebalance', label=slot):
+        result = rebalance_build(catalog, data.get('budget') or budget_input, parts, pinned, [slot], rank=rank)
+    new_parts, _, _, _, gpu_forced, advice = result
+    if new_parts is None:
+        data['advice'] = advice or "❌ **Over Budget:** your chosen parts leave no room for the rest of the build. Raise the budget or pick something cheaper."
+        return
+    data.update(part_ids={s: p['id'] for s, p in new_parts.items()}, gpu_forced=gpu_forced, advice=advice, catalog_version=catalog.version)
 
 # --- HELPER: GENERATE SUMMARY TEXT ---
 def generate_build_summary(parts, total, watts):
@@ -129,53 +117,50 @@ def generate_build_summary(parts, total, watts):
     text += "\n🚀 Generated by BD PC Builder AI"
     return text
 
-# --- DATABASE FETCHERS ---
-def get_best_item(cursor, table, max_price, spec_constraint=None, min_watts=0):
-    query = f"SELECT * FROM {table} WHERE price <= ? AND price > 0"
-    params = [max_price]
-    if spec_constraint:
-        query += " AND spec_tag LIKE ?"
-        params.append(f"%{spec_constraint}%")
-    query += " ORDER BY price DESC"
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    if min_watts > 0 and table == 'psus':
-        valid_psus = [row for row in rows if get_wattage(row['name']) >= min_watts]
-        return valid_psus[0] if valid_psus else None
-    return rows[0] if rows else None
-
-def get_cheapest_item(cursor, table, min_watts=0):
-    cursor.execute(f"SELECT * FROM {table} WHERE price > 0 ORDER BY price ASC")
-    rows = cursor.fetchall()
-    if min_watts > 0 and table == 'psus':
-        valid_psus = [row for row in rows if get_wattage(row['name']) >= min_watts]
-        return valid_psus[0] if valid_psus else None
-    return rows[0] if rows else None
-
-# --- SWAP HELPER ---
-def get_alternatives(table, current_price, name_search=None):
-    conn = get_db_connection()
-    if not conn: return []
-    cursor = conn.cursor()
-    min_price = current_price * 0.5
-    max_price = current_price * 3.0
-    query = f"SELECT * FROM {table} WHERE price BETWEEN ? AND ?"
-    params = [min_price, max_price]
-    if name_search:
-        query += " AND name LIKE ?"
-        params.append(f"%{name_search}%")
-    query += " ORDER BY price DESC LIMIT 50" 
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
-
 # --- HOVER BADGE ---
 def render_power_badge(breakdown):
     css = """<style>.power-container { position: relative; display: inline-block; cursor: pointer; font-family: sans-serif; } .power-badge { background-color: #FF4B4B; color: white; padding: 8px 16px; border-radius: 8px; font-weight: bold; font-size: 18px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); transition: transform 0.2s; } .power-badge:hover { transform: scale(1.05); } .power-tooltip { visibility: hidden; width: 220px; background-color: #262730; color: #fff; text-align: left; border-radius: 8px; padding: 12px; position: absolute; z-index: 10; top: 125%; left: 50%; margin-left: -110px; box-shadow: 0 8px 16px rgba(0,0,0,0.2); opacity: 0; transition: opacity 0.3s; border: 1px solid #444; } .power-container:hover .power-tooltip { visibility: visible; opacity: 1; } .power-row { display: flex; justify-content: space-between; margin-bottom: 4px; font-size: 14px; } .power-total { border-top: 1px solid #666; padding-top: 8px; margin-top: 8px; font-weight: bold; color: #FF4B4B; }</style>"""
     html = f"""{css}<div class="power-container"><div class="power-badge">⚡ {breakdown['Total']}W</div><div class="power-tooltip"><div class="power-row"><span>System Base:</span> <span>{breakdown['Base System']}W</span></div><div class="power-row"><span>CPU Max:</span> <span>{breakdown['CPU']}W</span></div><div class="power-row"><span>GPU Peak:</span> <span>{breakdown['GPU']}W</span></div><div class="power-row"><span>Storage:</span> <span>{breakdown['Storage']}W</span></div><div class="power-row power-total"><span>EST. PEAK:</span> <span>{breakdown['Total']}W</span></div></div></div>"""
     return html
 
+# --- DEBUG PANEL (?debug=1) ---
+def render_debug_panel(trace):
+    with st.expander("🛠️ Performance: this rerun", expanded=True):
+        counters = trace['counters']
+        sql_ms = [ms for name, _, ms in trace['timings'] if name == 'sql.query']
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Rerun", f"{trace['total_ms']:.1f} ms")
+        c2.metric("SQL queries", len(sql_ms))
+        c3.metric("SQL time", f"{sum(sql_ms):.2f} ms")
+        c4.metric("Rows fetched", counters.get('sql.rows', 0))
+        grouped = {}
+        for name, label, ms in trace['timings']:
+            key = f"{name} [{label}]" if label else name
+            calls, total = grouped.get(key, (0, 0.0))
+            grouped[key] = (calls + 1, total + ms)
+        rows = [{"timer": key, "calls": calls, "total ms": round(total, 3)} for key, (calls, total) in grouped.items()]
+        st.dataframe(sorted(rows, key=lambda r: -r["total ms"]), use_container_width=True, hide_index=True)
+        if counters: st.json(counters)
+
+# --- SWAP DIALOG ---
+# Alternatives are only fetched when a swap is opened; the list comes from the shared cache.
+@st.dialog("🔄 Swap Part")
+def show_swap_dialog(part_type, item, constraint):
+    st.markdown(f"**Swap {part_type}**")
+    table = SLOT_TABLES[part_type]
+    query = st.text_input("🔎 Search:", placeholder="Search every listing instead of similar prices")
+    with metrics.timer('ui.alternatives', label=part_type):
+        catalog = load_catalog()
+        if query.strip() and catalog:
+            alts = [catalog.by_id(table, row_id) for _, row_id in search_products(query, [table], limit=25, catalog=catalog)]
+        else:
+            alts = get_alternatives(table, item['price'], constraint, catalog=catalog)
+    options = [item] + [a for a in alts if a['name'] != item['name']]
+    choice = st.selectbox("Choose:", range(len(options)), format_func=lambda i: options[i].short_label, index=0)
+    if st.button("Confirm", type="primary"):
+        apply_swap(part_type, options[choice], catalog)
+        st.rerun()
+
 # --- SHARE MENU ---
 @st.dialog("📤 Share Your Build")
 def show_share_menu(link):
@@ -190,140 +175,12 @@ def show_share_menu(link):
     with col3: st.markdown(f'<a href="fb-messenger://share/?link={link}" target="_blank" class="share-btn" style="background-color: #0084FF;">⚡ Messenger</a>', unsafe_allow_html=True)
     with col4: st.markdown(f'<a href="mailto:?subject=My PC Build&body=Check out this build: {link}" class="share-btn" style="background-color: #555;">✉️ Email</a>', unsafe_allow_html=True)
 
-# --- MASTER BUILD LOGIC ---
-def generate_pc_build(budget, include_gpu=True, fixed_cpu=None):
-    conn = get_db_connection()
-    if not conn: return None, 0, 0, 0, False, None
-    cursor = conn.cursor()
-    remaining = budget
-    parts = {}
-    
-    # --- PHASE 1: CPU ---
-    cpu = None
-    if fixed_cpu:
-        cpu = fixed_cpu
-    else:
-        cpu = get_best_item(cursor, "processors", budget * 0.30) or get_cheapest_item(cursor, "processors")
-
-    if cpu: 
-        if remaining - cpu['price'] < 5000:
-            return None, 0, 0, 0, False, None
-        remaining -= cpu['price']
-        parts['CPU'] = dict(cpu)
-        
-        cpu_name = cpu['name'].upper()
-        if "INTEL" in cpu_name: cpu_type = "Intel"
-        elif "AMD" in cpu_name: cpu_type = "AMD"
-        else: cpu_type = None
-        gpu_required = is_gpu_mandatory(cpu['name'])
-        
-        # --- PHASE 2: BUDGET ALLOCATION ---
-        cash_left = remaining
-        mobo_alloc = 0.20
-        ram_alloc = 0.10
-        ssd_alloc = 0.10
-        
-        should_buy_gpu = include_gpu or gpu_required
-        if should_buy_gpu and cash_left < 45000:
-             mobo_alloc = 0.25 
-             ram_alloc = 0.10
-             ssd_alloc = 0.10
-        
-        if fixed_cpu:
-            mobo_budget = cash_left * mobo_alloc
-            ram_budget = cash_left * ram_alloc
-            ssd_budget = cash_left * ssd_alloc
-        else:
-            mobo_budget = budget * 0.20
-            ram_budget = budget * 0.10
-            ssd_budget = budget * 0.10
-
-        # --- MOTHERBOARD & RAM ---
-        mobo = None
-        if cpu_type: mobo = get_best_item(cursor, "motherboards", mobo_budget, cpu_type)
-        if not mobo: mobo = get_best_item(cursor, "motherboards", mobo_budget) or get_cheapest_item(cursor, "motherboards")
-            
-        if mobo:
-            remaining -= mobo['price']
-            parts['Motherboard'] = dict(mobo)
-            mobo_name = mobo['name'].upper()
-            ram_type = "DDR4"
-            if "DDR5" in mobo_name or " D5 " in mobo_name or any(x in mobo_name for x in ["X670", "B650", "AM5", "Z790", "A620"]):
-                if "D4" not in mobo_name: ram_type = "DDR5"
-            
-            ram = get_best_item(cursor, "rams", ram_budget, ram_type) or get_best_item(cursor, "rams", ram_budget, "DDR4") or get_cheapest_item(cursor, "rams")
-            if ram: remaining -= ram['price']; parts['RAM'] = dict(ram)
-    
-    # --- PHASE 3: STORAGE & CASING ---
-    ssd = get_best_item(cursor, "ssds", ssd_budget) or get_cheapest_item(cursor, "ssds")
-    if ssd: remaining -= ssd['price']; parts['Storage'] = dict(ssd)
-    
-    casing = get_best_item(cursor, "casings", 5000) or get_cheapest_item(cursor, "casings")
-    if casing: remaining -= casing['price']; parts['Casing'] = dict(casing)
-
-    # --- PHASE 4: GPU & PSU ---
-    advice_msg = None 
-
-    if should_buy_gpu:
-        if budget < 60000: psu_reserve = 3500 
-        elif budget < 100000: psu_reserve = 5000 
-        else: psu_reserve = budget * 0.10
-
-        gpu = None
-        gpu_budget = remaining - psu_reserve 
-        
-        if gpu_budget > 5000:
-            gpu = get_best_item(cursor, "gpus", gpu_budget)
-            if gpu: 
-                remaining -= gpu['price']
-                parts['Graphics Card'] = dict(gpu)
-        else:
-            if gpu_required:
-                needed = 15000 - gpu_budget 
-                advice_msg = f"❌ **Budget Crisis:** Cannot afford a dedicated GPU for this CPU! **Please add ~{int(needed)} BDT** to your budget."
-            else:
-                advice_msg = "💡 **Advisor:** Budget is too tight for a decent GPU. We skipped it. Use the CPU's Integrated Graphics and save up!"
-
-    breakdown_data = calculate_power_breakdown(parts) 
-    estimated_watts = breakdown_data['Total']
-    recommended_psu_watts = estimated_watts + 150 
-    
-    psu = get_best_item(cursor, "psus", remaining, min_watts=recommended_psu_watts)
-    if not psu: psu = get_cheapest_item(cursor, "psus", min_watts=recommended_psu_watts)
-    if not psu: psu = get_best_item(cursor, "psus", remaining) 
-    if psu: remaining -= psu['price']; parts['Power Supply'] = dict(psu)
-
-    # --- PHASE 5: SWEEPER ---
-    if should_buy_gpu:
-        upgrade_order = [('Graphics Card', 'gpus', None), ('RAM', 'rams', ram_type), ('Storage', 'ssds', None)]
-        if not fixed_cpu:
-            upgrade_order.insert(1, ('CPU', 'processors', None)) 
-            
-        for part_name, table, constraint in upgrade_order:
-            if part_name in parts and remaining > 1000:
-                current_item = parts[part_name]
-                current_price = current_item['price']
-                potential_budget = current_price + remaining
-                better_item = get_best_item(cursor, table, potential_budget, constraint)
-                if better_item and better_item['price'] > current_price:
-                    cost_diff = better_item['price'] - current_price
-                    parts[part_name] = dict(better_item)
-                    remaining -= cost_diff
-    
-    # --- PHASE 6: BOTTLENECK CHECK ---
-    if 'Graphics Card' in parts and 'CPU' in parts:
-        if not advice_msg:
-             advice_msg = check_bottleneck(parts['CPU']['price'], parts['Graphics Card']['price'])
-
-    final_breakdown = calculate_power_breakdown(parts)
-    conn.close()
-    return parts, sum(p['price'] for p in parts.values()), remaining, final_breakdown, gpu_required, advice_msg
-
 # --- UI START ---
 st.title("🖥️ BD PC Builder AI v10.1")
 st.caption("Expert Mode. Smart Recommendations.")
 
 query_params = st.query_params
+debug_mode = query_params.get("debug") == "1"
 safe_budget = 40000
 if "budget" in query_params:
     try: safe_budget = int(query_params["budget"])
@@ -340,11 +197,13 @@ with st.container():
     is_locked = False
     
     if cpu_choice_mode == "🎯 I Choose":
-        all_cpus = get_all_cpus()
-        cpu_selection = st.selectbox("Select your Processor:", all_cpus, help="The AI will build the rest of the PC around this CPU.")
-        if cpu_selection:
-            selected_cpu_obj = get_cpu_object(cpu_selection)
-            if selected_cpu_obj and is_gpu_mandatory(selected_cpu_obj['name']):
+        catalog = load_catalog()
+        cpu_query = st.text_input("🔎 Search Processors:", placeholder="e.g. ryzen 5 7600, i5 12400f")
+        cpu_ids = get_cpu_ids(catalog, cpu_query)
+        cpu_selection = st.selectbox("Select your Processor:", cpu_ids, format_func=lambda cpu_id: cpu_label(catalog, cpu_id), help="The AI will build the rest of the PC around this CPU.")
+        if cpu_selection is not None:
+            selected_cpu_obj = get_cpu_object(catalog, cpu_selection)
+            if selected_cpu_obj and is_gpu_mandatory(selected_cpu_obj):
                 is_locked = True
                 st.info(f"🔒 **Locked:** {selected_cpu_obj['name']} requires a Graphics Card.")
 
@@ -353,21 +212,83 @@ with st.container():
     else:
         include_gpu_check = st.checkbox("Include Graphics Card?", value=True)
 
-if "build_results" not in st.session_state: st.session_state.build_results = None
+    build_strategy = st.radio("Build Strategy:", ["🧠 Optimal", "⚡ Performance", "📐 Classic"], horizontal=True, help="Optimal searches every compatible combination for the best use of your budget. Performance does the same but picks the CPU and GPU by benchmark score per taka. Classic uses fixed budget splits.")
+    build_mode = {"📐 Classic": "greedy", "⚡ Performance": "performance"}.get(build_strategy, "optimal")
+
+if "build_results" not in st.session_state:
+    st.session_state.build_results = None
+    # Shared ?budget= links open straight onto the precomputed build.
+    if "budget" in query_params and cpu_choice_mode == "🤖 AI Decides":
+        catalog = load_catalog()
+        shared = lookup_build(safe_budget, True, catalog=catalog) if catalog else None
+        if shared and shared[0]:
+            parts, total_cost, saved, watts, gpu_forced, advice = shared
+            st.session_state.build_results = session_build(parts, gpu_forced, advice, catalog, safe_budget)
 
 if st.button("🚀 Build PC", type="primary", use_container_width=True):
     st.query_params["budget"] = budget_input
     
-    parts, total_cost, saved, watts, gpu_forced, advice = generate_pc_build(budget_input, include_gpu_check, fixed_cpu=selected_cpu_obj)
+    catalog = load_catalog()
+    parts = None
+    if catalog:
+        result = None
+        with metrics.timer('ui.build', label=build_mode):
+            if build_mode == "optimal" and not selected_cpu_obj:
+                result = lookup_build(budget_input, include_gpu_check, catalog=catalog)
+            if result is None:
+                result = generate_pc_build(budget_input, include_gpu_check, fixed_cpu=selected_cpu_obj, mode=build_mode, catalog=catalog)
+        parts, total_cost, saved, watts, gpu_forced, advice = result
     
     if parts is None:
-        st.error(f"❌ Impossible Build! The CPU you selected costs more than your entire budget. Please increase budget.")
+        st.error("❌ Impossible Build! No compatible set of parts fits this budget. Please increase budget.")
     else:
-        st.session_state.build_results = {"parts": parts, "total": total_cost, "saved": saved, "watts": watts, "gpu_forced": gpu_forced, "advice": advice}
+        st.session_state.build_results = session_build(parts, gpu_forced, advice, catalog, budget_input, build_mode,
+                                                       pinned=['CPU'] if selected_cpu_obj else [])
+
+# --- CPU COMPARISON ---
+# Every processor's best build at this budget, solved in one pass; the table keeps ids only.
+MATRIX_ROWS_SHOWN = 100
+
+if cpu_choice_mode == "🎯 I Choose":
+    if st.button("📊 Compare Every CPU", use_container_width=True, help="Build the best PC around every processor at this budget and rank them."):
+        catalog = load_catalog()
+        if catalog:
+            with metrics.timer('ui.cpu_matrix', label=build_mode):
+                matrix = cpu_build_matrix(budget_input, include_gpu_check, build_mode, catalog)
+            st.session_state.cpu_matrix = {
+                "rows": [{"part_ids": {slot: item['id'] for slot, item in row['parts'].items()}, "total": row['total'],
+                          "value": row['value'], "gpu_required": row['gpu_required'], "advice": row['advice']} for row in matrix],
+                "budget": budget_input, "mode": build_mode}
+
+    comparison = st.session_state.get("cpu_matrix")
+    if comparison and comparison["rows"]:
+        catalog = load_catalog()
+        shown = []
+        for row in comparison["rows"][:MATRIX_ROWS_SHOWN]:
+            parts, missing = resolve_parts(catalog, row["part_ids"])
+            if not missing: shown.append((row, parts))
+        with st.expander(f"📊 Best build for each of {len(comparison['rows'])} CPUs at {comparison['budget']} ৳", expanded=True):
+            st.dataframe([{"CPU": parts['CPU']['name'], "Graphics Card": parts['Graphics Card']['name'] if 'Graphics Card' in parts else "Integrated",
+                           "Total (৳)": row["total"], "Performance Score": round(row["value"], 3)} for row, parts in shown],
+                         use_container_width=True, hide_index=True)
+            if shown:
+                pick = st.selectbox("Open build:", range(len(shown)), format_func=lambda i: shown[i][1]['CPU'].label)
+                if st.button("Use This Build"):
+                    row, parts = shown[pick]
+                    st.session_state.build_results = session_build(parts, row["gpu_required"], row["advice"], catalog,
+                                                                   comparison["budget"], comparison["mode"], pinned=['CPU'])
+                    st.rerun()
+    elif comparison:
+        st.error("❌ No processor leaves enough budget for a complete build. Please increase budget.")
 
 if st.session_state.build_results:
     data = st.session_state.build_results
-    parts = data["parts"]
+    catalog = load_catalog()
+    parts, missing = resolve_parts(catalog, data["part_ids"])
+    if missing:
+        st.warning(f"⚠️ No longer listed since this build was made: {', '.join(missing)}. Rebuild or swap in a replacement.")
+    elif catalog and catalog.version != data["catalog_version"]:
+        st.caption("🔄 Prices refreshed since this build was made.")
     current_total = sum(p['price'] for p in parts.values())
     current_breakdown = calculate_power_breakdown(parts)
     
@@ -379,9 +300,9 @@ if st.session_state.build_results:
             st.error(data["advice"])
             
             # --- NEW: GPU RECOMMENDATION EXPANDER ---
-            if "Bottleneck" in data["advice"] or "Crisis" in data["advice"]:
-                cpu_price = parts['CPU']['price']
-                preferred, risky = get_gpu_recommendations(cpu_price)
+            if ("Bottleneck" in data["advice"] or "Crisis" in data["advice"]) and 'CPU' in parts:
+                with metrics.timer('ui.gpu_recommendations'):
+                    preferred, risky = get_gpu_recommendations(parts['CPU'], catalog)
                 
                 with st.expander("💡 View Recommended GPUs for this CPU", expanded=True):
                     st.markdown("### ✅ Best Matches (Balanced)")
@@ -391,7 +312,7 @@ if st.session_state.build_results:
                             c1.write(f"**{gpu['name']}**")
                             c2.write(f"{gpu['price']} ৳")
                             if c3.button("Swap", key=f"swap_p_{gpu['id']}"):
-                                st.session_state.build_results['parts']['Graphics Card'] = gpu
+                                apply_swap('Graphics Card', gpu, catalog)
                                 st.rerun()
                     else:
                         st.info("No perfect matches found in database.")
@@ -404,7 +325,7 @@ if st.session_state.build_results:
                             c1.write(f"**{gpu['name']}**")
                             c2.write(f"{gpu['price']} ৳")
                             if c3.button("Swap", key=f"swap_r_{gpu['id']}"):
-                                st.session_state.build_results['parts']['Graphics Card'] = gpu
+                                apply_swap('Graphics Card', gpu, catalog)
                                 st.rerun()
 
         if data.get("gpu_forced") and not is_locked:
@@ -430,22 +351,18 @@ if st.session_state.build_results:
         core_items = {k: v for k, v in parts.items() if k != 'Graphics Card'}
         gpu_item = parts.get('Graphics Card')
 
-        table_map = {
-            'CPU': 'processors', 'Motherboard': 'motherboards', 'RAM': 'rams',
-            'Storage': 'ssds', 'Graphics Card': 'gpus', 'Power Supply': 'psus', 'Casing': 'casings'
-        }
-
         for part_type, item in core_items.items():
             with st.container():
                 col_img, col_details, col_price, col_action = st.columns([1, 2, 1, 0.5])
                 with col_img:
-                    if item.get('image_url'): st.image(item['image_url'], width=80)
-                    else: st.write("📦")
+                    render_thumbnail(item)
                 with col_details:
                     st.markdown(f"**{part_type}**")
                     st.caption(item['name'])
+                    for caption in (perf_caption(item), offer_caption(item), buy_caption(part_type, item)):
+                        if caption: st.caption(caption)
                     if part_type == "Power Supply":
-                         watts = get_wattage(item['name'])
+                         watts = get_wattage(item)
                          if watts > 0: st.caption(f"⚡ Capacity: {watts}W")
                 with col_price:
                     st.markdown(f"**{item['price']} ৳**")
@@ -455,62 +372,29 @@ if st.session_state.build_results:
                         st.write("🔒") 
                     else:
                         constraint = None
-                        if part_type == 'CPU': 
-                            if "INTEL" in item['name'].upper(): constraint = "Intel"
-                            elif "AMD" in item['name'].upper() or "RYZEN" in item['name'].upper(): constraint = "AMD"
-                        elif part_type == 'Motherboard':
-                            cpu_name = parts['CPU']['name'].upper()
-                            if "INTEL" in cpu_name: constraint = "Intel"
-                            elif "AMD" in cpu_name or "RYZEN" in cpu_name: constraint = "AMD" 
-                        elif part_type == 'RAM':
-                            constraint = "DDR5" if "DDR5" in parts['Motherboard']['name'].upper() else "DDR4"
-                        
-                        with st.popover("🔄"):
-                            st.markdown(f"**Swap {part_type}**")
-                            table_name = table_map.get(part_type)
-                            if table_name:
-                                alts = get_alternatives(table_name, item['price'], constraint)
-                                alts.insert(0, item) 
-                                seen = set()
-                                unique_alts = []
-                                for a in alts:
-                                    if a['name'] not in seen: unique_alts.append(a); seen.add(a['name'])
-
-                                if unique_alts:
-                                    alt_map = {f"{a['name'][:40]}... ({a['price']} ৳)": a for a in unique_alts}
-                                    selected_name = st.selectbox("Choose:", list(alt_map.keys()), index=0, key=f"sel_{part_type}")
-                                    if st.button("Confirm", key=f"btn_{part_type}"):
-                                        st.session_state.build_results['parts'][part_type] = alt_map[selected_name]
-                                        st.rerun()
+                        if part_type == 'CPU': constraint = get_cpu_type(item)
+                        elif part_type == 'Motherboard' and 'CPU' in parts: constraint = get_cpu_type(parts['CPU'])
+                        elif part_type == 'RAM' and 'Motherboard' in parts: constraint = get_ram_type(parts['Motherboard'])
+                        if st.button("🔄", key=f"swap_{part_type}", help=f"Swap {part_type}"):
+                            show_swap_dialog(part_type, item, constraint)
 
         if gpu_item:
             st.subheader("🎮 Graphics & Expansion")
             with st.container():
                 col_img, col_details, col_price, col_action = st.columns([1, 2, 1, 0.5])
                 with col_img:
-                    if gpu_item.get('image_url'): st.image(gpu_item['image_url'], width=80)
-                    else: st.write("📦")
+                    render_thumbnail(gpu_item)
                 with col_details:
                     st.markdown("**Graphics Card**")
                     st.caption(gpu_item['name'])
+                    for caption in (perf_caption(gpu_item), offer_caption(gpu_item), buy_caption('Graphics Card', gpu_item)):
+                        if caption: st.caption(caption)
                 with col_price:
                     st.markdown(f"**{gpu_item['price']} ৳**")
                     if gpu_item.get('url'): st.link_button("🛒", f"{gpu_item['url']}?ref=YOUR_ID")
                 with col_action:
-                    with st.popover("🔄"):
-                        st.markdown("**Swap GPU**")
-                        alts = get_alternatives("gpus", gpu_item['price'])
-                        alts.insert(0, gpu_item)
-                        seen = set()
-                        unique_alts = []
-                        for a in alts:
-                            if a['name'] not in seen: unique_alts.append(a); seen.add(a['name'])
-                        
-                        alt_map = {f"{a['name'][:40]}... ({a['price']} ৳)": a for a in unique_alts}
-                        selected_name = st.selectbox("Choose:", list(alt_map.keys()), index=0, key="sel_gpu")
-                        if st.button("Confirm", key="btn_gpu"):
-                            st.session_state.build_results['parts']['Graphics Card'] = alt_map[selected_name]
-                            st.rerun()
+                    if st.button("🔄", key="swap_gpu", help="Swap GPU"):
+                        show_swap_dialog('Graphics Card', gpu_item, None)
 
                 st.divider()
 
@@ -520,4 +404,9 @@ if st.session_state.build_results:
         elif live_unused > 0:
             st.warning(f"💵 Unused Budget: {live_unused} BDT")
         elif live_unused < 0:
-            st.error(f"⚠️ Over Budget: {abs(live_unused)} BDT")
\ No newline at end of file
+            st.error(f"⚠️ Over Budget: {abs(live_unused)} BDT")
+
+# --- METRICS ---
+rerun_trace = metrics.end_trace()
+metrics.export_from_env()
+if debug_mode and rerun_trace: render_debug_panel(rerun_trace)
\ No newline at end of file